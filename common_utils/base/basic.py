@@ -1,24 +1,117 @@
 from __future__ import annotations
 from abc import abstractmethod
-from typing import TypeVar, Generic, List, cast, Dict, Any
-import json
+from typing import TypeVar, Generic, List, cast, Dict, Any, Union
+import typing
 import operator
 import inspect
+import itertools
 import random
 import numpy as np
-import yaml
 
 from logger import logger
 from ..check_utils import check_required_keys, check_type_from_list, \
-    check_type, check_file_exists, check_issubclass, check_issubclass_from_list
+    check_type, check_file_exists, check_issubclass, check_issubclass_from_list, \
+    check_value
 from ..file_utils import file_exists
 from ..path_utils import get_extension_from_path
 from ..constants.number_constants import jsonable_types, \
-    iterable_jsonable_types, noniterable_jsonable_types
+    iterable_jsonable_types, noniterable_jsonable_types, jsonable_scalar_types
+from .columnar import ColumnarList
+from .index import HandlerIndex, IndexKinds, index_classes, intersect_sorted, DistinctValues
+from .jsonl import JsonlWriter, iter_jsonl
+from .serialization import save_data, load_data
+from .binary import save_npz, load_npz
+from .groups import HandlerGroups
+from .sorting import get_sort_values, argsort_values
+from .view import ListView, positions_from_index, is_fancy_index, \
+    take_positions, assign_positions, delete_positions
 
 T = TypeVar('T')
 H = TypeVar('H')
 
+scalar_type_set = frozenset(jsonable_scalar_types)
+
+class ConstructorSchema:
+    """
+    Constructor layout of a class, computed once per class and reused by
+    to_dict, from_dict, copy, __hash__ and __eq__.
+
+    Attributes:
+        params: Constructor parameter names in signature order.
+        param_set: Same as params, for constant time membership checks.
+        dict_fields: Maps parameters annotated with a type that has a to_dict method to that type.
+        dict_list_fields: Maps parameters annotated with a type that has a to_dict_list method to that type.
+
+    Annotations are only used as hints. Values whose type doesn't match the
+    annotation fall back to the same duck-typed checks that were used before.
+    """
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.init = cls.__init__
+        self.params = [param for param in list(inspect.signature(cls.__init__).parameters.keys()) if param != 'self']
+        self.param_set = frozenset(self.params)
+        self.dict_fields = {}
+        self.dict_list_fields = {}
+        for key, hint in self._get_type_hints(cls).items():
+            if key not in self.param_set:
+                continue
+            hint = self._unwrap_optional(hint)
+            if isinstance(hint, type) and callable(getattr(hint, 'to_dict', None)):
+                self.dict_fields[key] = hint
+            elif isinstance(hint, type) and callable(getattr(hint, 'to_dict_list', None)):
+                self.dict_list_fields[key] = hint
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.cls.__name__}, params={self.params})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    @staticmethod
+    def _get_type_hints(cls: type) -> dict:
+        try:
+            return typing.get_type_hints(cls.__init__)
+        except Exception:
+            # Unresolvable forward references. Fall back to duck typing for every field.
+            return {}
+
+    @staticmethod
+    def _unwrap_optional(hint):
+        # typing.get_origin and typing.get_args require Python 3.8.
+        if getattr(hint, '__origin__', None) is Union:
+            args = [arg for arg in hint.__args__ if arg is not type(None)]
+            if len(args) == 1:
+                return args[0]
+        return hint
+
+    def is_valid_for(self, cls: type) -> bool:
+        return self.cls is cls and self.init is cls.__init__
+
+    def to_constructor_dict(self, obj) -> dict:
+        param_set = self.param_set
+        return {key: val for key, val in obj.__dict__.items() if key in param_set}
+
+    def to_dict(self, obj) -> dict:
+        result = {}
+        param_set = self.param_set
+        dict_fields, dict_list_fields = self.dict_fields, self.dict_list_fields
+        for key, val in obj.__dict__.items():
+            if key not in param_set:
+                continue
+            elif type(val) in scalar_type_set:
+                result[key] = val
+            elif key in dict_fields and isinstance(val, dict_fields[key]):
+                result[key] = val.to_dict()
+            elif key in dict_list_fields and isinstance(val, dict_list_fields[key]):
+                result[key] = val.to_dict_list()
+            elif hasattr(val, 'to_dict') and callable(val.to_dict):
+                result[key] = val.to_dict()
+            elif hasattr(val, 'to_dict_list') and callable(val.to_dict_list):
+                result[key] = val.to_dict_list()
+            else:
+                result[key] = val
+        return result
+
 class BasicObject(Generic[T]):
     @abstractmethod
     def __str__(self) -> str:
@@ -39,16 +132,25 @@ class BasicObject(Generic[T]):
             return self.__key() == other.__key()
         return NotImplemented
 
+    @classmethod
+    def get_schema(cls) -> ConstructorSchema:
+        """
+        Returns the ConstructorSchema of this class.
+        The schema is cached on the class itself, so every subclass gets its own,
+        and it is rebuilt if the class's __init__ is replaced.
+        """
+        schema = cls.__dict__.get('_constructor_schema', None)
+        if schema is None or not schema.is_valid_for(cls):
+            schema = ConstructorSchema(cls)
+            cls._constructor_schema = schema
+        return schema
+
     @classmethod
     def get_constructor_params(cls) -> list:
-        return [param for param in list(inspect.signature(cls.__init__).parameters.keys()) if param != 'self']
+        return list(cls.get_schema().params)
 
     def to_constructor_dict(self) -> dict:
-        constructor_dict = {}
-        for key, val in self.__dict__.items():
-            if key in self.get_constructor_params():
-                constructor_dict[key] = val
-        return constructor_dict
+        return self.get_schema().to_constructor_dict(self)
 
     @classmethod
     def buffer(cls: T, obj) -> T:
@@ -57,7 +159,7 @@ class BasicObject(Generic[T]):
     def copy(self: T) -> T:
         constructor_dict = self.to_constructor_dict()
         for key, val in constructor_dict.items():
-            if hasattr(val, 'copy'):
+            if type(val) not in scalar_type_set and hasattr(val, 'copy'):
                 constructor_dict[key] = val.copy()
         return type(self)(**constructor_dict)
 
@@ -86,20 +188,8 @@ class BasicLoadableObject(BasicObject[T]):
     def __str__(self) -> str:
         return f'{self.__class__.__name__}({self.to_dict()})'
 
-    @classmethod
-    def get_constructor_params(cls) -> list:
-        return [param for param in list(inspect.signature(cls.__init__).parameters.keys()) if param != 'self']
-
     def to_dict(self: T) -> dict:
-        result = {}
-        for key, val in self.to_constructor_dict().items():
-            if hasattr(val, 'to_dict') and callable(val.to_dict):
-                result[key] = val.to_dict()
-            elif hasattr(val, 'to_dict_list') and callable(val.to_dict_list):
-                result[key] = val.to_dict_list()
-            else:
-                result[key] = val
-        return result
+        return self.get_schema().to_dict(self)
     
     @classmethod
     def from_dict(cls: T, item_dict: dict) -> T:
@@ -107,11 +197,13 @@ class BasicLoadableObject(BasicObject[T]):
         Note: It is required that all class constructor parameters be of a JSON serializable datatype.
               If not, it is necessary to override this classmethod.
         """
+        schema = cls.get_schema()
+        constructor_params = schema.params
+        param_set = schema.param_set
         constructor_dict = {}
-        constructor_params = cls.get_constructor_params()
         unnecessary_params = []
         for key, value in item_dict.items():
-            if key in constructor_params:
+            if key in param_set:
                 constructor_dict[key] = value
             else:
                 unnecessary_params.append(key)
@@ -120,19 +212,18 @@ class BasicLoadableObject(BasicObject[T]):
             logger.warning(f'Received: {list(item_dict.keys())}')
             logger.warning(f'Expected: {constructor_params}')
             logger.warning(f'Extra: {unnecessary_params}')
-        check_required_keys(constructor_dict, required_keys=constructor_params)
+        if len(constructor_dict) != len(param_set):
+            check_required_keys(constructor_dict, required_keys=constructor_params)
         return cls(**constructor_dict)
 
-    def save_to_path(self: T, save_path: str, overwrite: bool=False):
+    def save_to_path(self: T, save_path: str, overwrite: bool=False, backend: str=None):
         if file_exists(save_path) and not overwrite:
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
 
         extension = get_extension_from_path(save_path)
-        if extension == 'json':
-            json.dump(self.to_dict(), open(save_path, 'w'), indent=2, ensure_ascii=False)
-        elif extension == 'yaml':
-            yaml.dump(self.to_dict(), open(save_path, 'w'), allow_unicode=True)
+        if extension in ['json', 'yaml']:
+            save_data(self.to_dict(), save_path=save_path, extension=extension, backend=backend)
         else:
             raise ValueError(
                 f"""
@@ -144,13 +235,11 @@ class BasicLoadableObject(BasicObject[T]):
             )
     
     @classmethod
-    def load_from_path(cls: T, json_path: str) -> T:
+    def load_from_path(cls: T, json_path: str, backend: str=None) -> T:
         check_file_exists(json_path)
         extension = get_extension_from_path(json_path)
-        if extension == 'json':
-            item_dict = json.load(open(json_path, 'r'))
-        elif extension == 'yaml':
-            item_dict = yaml.load(open(json_path, 'r'), Loader=yaml.FullLoader)
+        if extension in ['json', 'yaml']:
+            item_dict = load_data(json_path, extension=extension, backend=backend)
         else:
             raise ValueError(
                 f"""
@@ -226,15 +315,50 @@ class BasicHandler(Generic[H, T]):
         self.obj_list = obj_list if obj_list is not None else []
 
     def __key(self) -> tuple:
-        return tuple([self.__class__] + list(self.__dict__.values()))
+        # Private attributes only hold derived state, such as indexes, so they are excluded.
+        return tuple([self.__class__] + [val for key, val in self.__dict__.items() if not key.startswith('_')])
 
     def __hash__(self):
         return hash(self.__key())
 
-    def __add__(self, other: H) -> H:
+    def _set_obj_list(self: H, obj_list: List[T]):
+        """
+        Replaces the object list without validating it.
+        Subclasses often keep an alias of the object list (e.g. self.angles = self.obj_list),
+        so every attribute that refers to the old object list is redirected as well.
+        """
+        old_obj_list = self.obj_list
+        for key, val in list(self.__dict__.items()):
+            if val is old_obj_list:
+                self.__dict__[key] = obj_list
+
+    def _materialize(self: H):
+        """
+        Copies the objects of a view into a list of its own before the handler is mutated.
+        """
+        if isinstance(self.obj_list, ListView):
+            self._set_obj_list(self.obj_list.to_list())
+
+    def _new_from_obj_list(self: H, obj_list: List[T], trusted: bool=False) -> H:
+        """
+        Creates a handler of the same type around obj_list.
+        obj_list can be any storage that the handler supports, not only a list.
+        If trusted is True, the types of the objects in obj_list are not checked.
+        """
+        if type(obj_list) is list and not trusted:
+            return type(self)(obj_list)
+        result = type(self)([])
+        result._set_obj_list(obj_list)
+        return result
+
+    def _take(self: H, positions: np.ndarray) -> H:
+        """A handler of the same type with the objects at positions, in that order."""
+        return self._new_from_obj_list(take_positions(self.obj_list, positions), trusted=True)
+
+    def __add__(self: H, other: H) -> H:
         if isinstance(other, type(self)):
             if self.obj_type == other.obj_type:
-                return type(self)(self.obj_list + other.obj_list)
+                return self._new_from_obj_list(self.obj_list + other.obj_list, trusted=True)
             else:
                 raise TypeError(
                     f"""
@@ -263,6 +387,8 @@ class BasicHandler(Generic[H, T]):
         return len(self.obj_list)
 
     def __getitem__(self: H, idx: int) -> T:
+        if isinstance(idx, np.integer):
+            idx = int(idx)
         if type(idx) is int:
             if len(self.obj_list) == 0:
                 logger.error(f"{type(self).__name__} is empty.")
@@ -273,23 +399,35 @@ class BasicHandler(Generic[H, T]):
             else:
                 return self.obj_list[idx]
         elif type(idx) is slice:
-            return type(self)(self.obj_list[idx.start:idx.stop:idx.step])
+            return self._new_from_obj_list(self.obj_list[idx.start:idx.stop:idx.step], trusted=True)
+        elif is_fancy_index(idx):
+            return self._take(positions_from_index(idx, len(self.obj_list)))
         else:
-            logger.error(f'Expected int or slice. Got type(idx)={type(idx)}')
+            logger.error(f'Expected int, slice, list or np.ndarray. Got type(idx)={type(idx)}')
             raise TypeError
 
     def __setitem__(self: H, idx: int, value: T):
+        self._materialize()
+        if isinstance(idx, np.integer):
+            idx = int(idx)
         if type(idx) is int:
             check_type(value, valid_type_list=[self.obj_type])
             self.obj_list[idx] = value
         elif type(idx) is slice:
             check_type_from_list(value, valid_type_list=[self.obj_type])
             self.obj_list[idx.start:idx.stop:idx.step] = value
+        elif is_fancy_index(idx):
+            value = list(value)
+            check_type_from_list(value, valid_type_list=[self.obj_type])
+            assign_positions(self.obj_list, positions_from_index(idx, len(self.obj_list)), value)
         else:
-            logger.error(f'Expected int or slice. Got type(idx)={type(idx)}')
+            logger.error(f'Expected int, slice, list or np.ndarray. Got type(idx)={type(idx)}')
             raise TypeError
 
     def __delitem__(self: H, idx: int):
+        self._materialize()
+        if isinstance(idx, np.integer):
+            idx = int(idx)
         if type(idx) is int:
             if len(self.obj_list) == 0:
                 logger.error(f"{type(self).__name__} is empty.")
@@ -303,56 +441,147 @@ class BasicHandler(Generic[H, T]):
                 del self.obj_list[idx]
         elif type(idx) is slice:
             del self.obj_list[idx.start:idx.stop:idx.step]
+        elif is_fancy_index(idx):
+            delete_positions(self.obj_list, positions_from_index(idx, len(self.obj_list)))
         else:
-            logger.error(f'Expected int or slice. Got type(idx)={type(idx)}')
+            logger.error(f'Expected int, slice, list or np.ndarray. Got type(idx)={type(idx)}')
             raise TypeError
 
-    def __iter__(self: H) -> H:
-        self.n = 0
-        return self
-
-    def __next__(self: H) -> T:
-        if self.n < len(self.obj_list):
-            result = self.obj_list[self.n]
-            self.n += 1
-            return result
-        else:
-            raise StopIteration
+    def __iter__(self: H) -> typing.Iterator[T]:
+        # A separate iterator, so that nested loops and concurrent readers don't share a cursor.
+        return iter(self.obj_list)
 
     @classmethod
     def buffer(cls: H, obj) -> H:
         return obj
 
     def copy(self: H) -> H:
+        if isinstance(self.obj_list, ColumnarList):
+            return self._new_from_obj_list(self.obj_list.copy())
         return type(self)([obj.copy() for obj in self.obj_list])
 
     def append(self: H, item: T):
         check_type(item, valid_type_list=[self.obj_type])
+        self._materialize()
         self.obj_list.append(item)
 
-    def extend(self: H, item_list: List[T]):
-        for item in item_list:
-            self.append(item)
+    def extend(self: H, item_list: List[T], trusted: bool=False):
+        """
+        Appends every item in item_list.
+        The types of the items are checked once for the whole batch.
+        Pass trusted=True to skip the check when the items are known to be of type obj_type.
+        """
+        item_list = item_list if type(item_list) is list else list(item_list)
+        if not trusted:
+            check_type_from_list(item_list, valid_type_list=[self.obj_type])
+        self._materialize()
+        self.obj_list.extend(item_list)
+
+    @classmethod
+    def concat(cls: H, handler_list: List[H]) -> H:
+        """
+        Concatenates handlers into a new handler of type cls.
 
-    def sort(self: H, attr_name: str, reverse: bool=False):
-        if len(self) > 0:
+        Handlers of type cls are spliced in without checking their objects again.
+        Any other iterable of objects is checked once as a batch.
+        If the first handler is columnar, the result is columnar as well.
+        """
+        result = cls([])
+        obj_lists = []
+        for handler in handler_list:
+            if isinstance(handler, cls) and handler.obj_type == result.obj_type:
+                obj_lists.append(handler.obj_list)
+            else:
+                item_list = list(handler)
+                check_type_from_list(item_list, valid_type_list=[result.obj_type])
+                obj_lists.append(item_list)
+        if len(obj_lists) > 0 and isinstance(obj_lists[0], ColumnarList):
+            obj_list = obj_lists[0].copy()
+            for other_obj_list in obj_lists[1:]:
+                obj_list.extend(other_obj_list)
+        else:
+            obj_list = list(itertools.chain.from_iterable(obj_lists))
+        result._set_obj_list(obj_list)
+        return result
+
+    def _sort_values(self: H, attr_name: str) -> list:
+        try:
+            return get_sort_values(self.obj_list, attr_name)
+        except AttributeError:
             attr_list = list(self.obj_list[0].__dict__.keys())
             property_names = [p for p in dir(type(self.obj_list[0])) if isinstance(getattr(type(self.obj_list[0]), p), property)]
             attr_list.extend(property_names)
-            if attr_name not in attr_list:
-                logger.error(f"{self.obj_type.__name__} class has not attribute: '{attr_name}'")
-                logger.error(f'Possible attribute names:')
-                for name in attr_list:
-                    logger.error(f'\t{name}')
-                raise Exception
+            logger.error(f"{self.obj_type.__name__} class has not attribute: '{attr_name}'")
+            logger.error(f'Possible attribute names:')
+            for name in attr_list:
+                logger.error(f'\t{name}')
+            raise Exception
+
+    def argsort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False) -> np.ndarray:
+        """
+        Returns the order that sort(attr_name, reverse) would put the objects in, without reordering them.
 
-            self.obj_list.sort(key=operator.attrgetter(attr_name), reverse=reverse)
+        Args:
+            attr_name (Union[str, List[str]]): An attribute or property name, or a list of them.
+                    The first name is the primary key.
+            reverse (Union[bool, List[bool]], optional): Whether to sort in descending order.
+                    Can be given for each key. Defaults to False.
+        """
+        attr_names = [attr_name] if type(attr_name) is str else list(attr_name)
+        reverse_list = reverse if type(reverse) is list else [reverse] * len(attr_names)
+        if len(reverse_list) != len(attr_names):
+            logger.error(f'Got {len(reverse_list)} reverse flags for {len(attr_names)} keys.')
+            raise ValueError
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        return argsort_values([self._sort_values(name) for name in attr_names], reverse_list)
+
+    def _permute(self: H, order: np.ndarray):
+        if isinstance(self.obj_list, ColumnarList):
+            self.obj_list.permute(order)
+        else:
+            self.obj_list[:] = take_positions(self.obj_list, order)
+
+    def sort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False):
+        """
+        Sorts the objects by one or more attributes or properties. The sort is stable.
+        See argsort for the arguments.
+
+        handler.sort(['test_name', 'frame', 'score'], reverse=[False, False, True])
+        """
+        self._materialize()
+        if len(self) > 0:
+            if type(attr_name) is str and type(reverse) is bool and type(self.obj_list) is list:
+                # A single key is sorted fastest by list.sort, which doesn't need to gather the objects afterwards.
+                try:
+                    self.obj_list.sort(key=operator.attrgetter(attr_name), reverse=reverse)
+                    return
+                except AttributeError:
+                    self._sort_values(attr_name)
+            self._permute(self.argsort(attr_name, reverse=reverse))
         else:
             logger.error(f"Cannot sort. {type(self).__name__} is empty.")
             raise Exception
 
     def shuffle(self: H):
-        random.shuffle(self.obj_list)
+        self._materialize()
+        if isinstance(self.obj_list, ColumnarList):
+            self.obj_list.shuffle()
+        else:
+            random.shuffle(self.obj_list)
+
+    def view(self: H, idx) -> H:
+        """
+        Returns a handler that shares this handler's object list instead of copying it.
+
+        idx can be a slice, a list or array of positions, or a boolean mask.
+        Creating and reading the view is O(1) in memory. The view copies the selected objects
+        into a list of its own the first time it is mutated, so mutating it never changes this handler.
+        Changes made to this handler before that are visible through the view.
+        Use copy() on the view to get an independent handler.
+        """
+        positions = positions_from_index(idx, len(self.obj_list))
+        return self._new_from_obj_list(ListView(self.obj_list, positions), trusted=True)
 
 class BasicLoadableHandler(BasicHandler[H, T]):
     """
@@ -363,13 +592,228 @@ class BasicLoadableHandler(BasicHandler[H, T]):
     """
     def __init__(self: H, obj_type: type, obj_list: List[T]=None):
         super().__init__(obj_type=obj_type, obj_list=obj_list)
+        self._indexes = {}
+        self._distinct_values = {}
 
     def __str__(self) -> str:
         return f'{self.__class__.__name__}({self.to_dict_list()})'
 
+    def append(self: H, item: T):
+        super().append(item)
+        idx = len(self.obj_list) - 1
+        for index in self._indexes.values():
+            if index.valid and index.size == idx and hasattr(item, index.attr_name):
+                index.append(idx, getattr(item, index.attr_name))
+            else:
+                index.invalidate()
+        if len(self._distinct_values) > 0:
+            self._update_distinct_values(added=[item], removed=[])
+
+    def extend(self: H, item_list: List[T], trusted: bool=False):
+        item_list = item_list if type(item_list) is list else list(item_list)
+        start = len(self.obj_list)
+        super().extend(item_list, trusted=trusted)
+        if len(self._distinct_values) > 0:
+            self._update_distinct_values(added=item_list, removed=[])
+        for index in self._indexes.values():
+            if not index.valid or index.size != start:
+                index.invalidate()
+                continue
+            try:
+                values = [getattr(item, index.attr_name) for item in item_list]
+            except AttributeError:
+                index.invalidate()
+                continue
+            for i, value in enumerate(values):
+                index.append(start + i, value)
+
+    def __setitem__(self: H, idx: int, value: T):
+        track_distinct_values = len(self._distinct_values) > 0
+        if track_distinct_values:
+            if is_fancy_index(idx):
+                idx = positions_from_index(idx, len(self.obj_list))
+            if not isinstance(idx, (int, np.integer)):
+                value = list(value)
+            removed = self._selected_objects(idx)
+        if type(idx) is int and len(self._indexes) > 0:
+            idx = idx + len(self.obj_list) if idx < 0 else idx
+            old_value = self.obj_list[idx]
+            super().__setitem__(idx, value)
+            for index in self._indexes.values():
+                if index.valid and hasattr(old_value, index.attr_name) and hasattr(value, index.attr_name):
+                    index.replace(idx, getattr(old_value, index.attr_name), getattr(value, index.attr_name))
+                else:
+                    index.invalidate()
+        else:
+            super().__setitem__(idx, value)
+            self._invalidate_indexes()
+        if track_distinct_values:
+            self._update_distinct_values(added=[value] if isinstance(idx, (int, np.integer)) else value, removed=removed)
+
+    def __delitem__(self: H, idx: int):
+        removed = None
+        if len(self._distinct_values) > 0:
+            if is_fancy_index(idx):
+                idx = positions_from_index(idx, len(self.obj_list))
+            removed = self._selected_objects(idx)
+        super().__delitem__(idx)
+        self._invalidate_indexes()
+        if removed is not None:
+            self._update_distinct_values(added=[], removed=removed)
+        else:
+            self._invalidate_distinct_values()
+
+    def sort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False):
+        super().sort(attr_name=attr_name, reverse=reverse)
+        self._invalidate_indexes()
+
+    def shuffle(self: H):
+        super().shuffle()
+        self._invalidate_indexes()
+
+    def create_index(self: H, attr_name: str, kind: str=IndexKinds.HASH):
+        """
+        Creates a secondary index on attr_name that get and get_indices will use automatically.
+
+        Args:
+            attr_name (str): The attribute to index.
+            kind (str, optional):
+                'hash' for equality and list-membership queries.
+                'sorted' for range queries with get_in_range. Sorted indexes can also answer equality queries.
+                Defaults to 'hash'.
+        The index is built the first time it is used and is kept in sync with
+        append, extend and __setitem__. Other mutations cause it to be rebuilt on its next use.
+        """
+        check_value(kind, valid_value_list=IndexKinds.get_all())
+        self._indexes[attr_name] = index_classes[kind](attr_name=attr_name)
+
+    def drop_index(self: H, attr_name: str):
+        del self._indexes[attr_name]
+
+    @property
+    def index_names(self) -> List[str]:
+        return list(self._indexes.keys())
+
+    def _invalidate_indexes(self: H):
+        for index in self._indexes.values():
+            index.invalidate()
+
+    def _invalidate_distinct_values(self: H):
+        for distinct_values in self._distinct_values.values():
+            distinct_values.invalidate()
+
+    def _selected_objects(self: H, idx) -> list:
+        """
+        The objects that an int, a slice or an array of positions selects, or None if they can't be determined.
+        Repeated positions give None, since assigning to them doesn't replace every selected object.
+        """
+        if type(idx) is slice:
+            return list(self.obj_list[idx.start:idx.stop:idx.step])
+        elif isinstance(idx, (int, np.integer)):
+            try:
+                return [self.obj_list[int(idx)]]
+            except IndexError:
+                return None
+        elif len(np.unique(np.asarray(idx))) != len(idx):
+            return None
+        return list(take_positions(self.obj_list, idx))
+
+    def _update_distinct_values(self: H, added: List[T], removed: List[T]):
+        if removed is None:
+            self._invalidate_distinct_values()
+            return
+        expected_size = len(self.obj_list) - len(added) + len(removed)
+        for distinct_values in self._distinct_values.values():
+            if not distinct_values.valid:
+                continue
+            elif distinct_values.size != expected_size:
+                # The object list was modified directly.
+                distinct_values.invalidate()
+                continue
+            try:
+                removed_values = [getattr(obj, distinct_values.attr_name) for obj in removed]
+                added_values = [getattr(obj, distinct_values.attr_name) for obj in added]
+            except AttributeError:
+                distinct_values.invalidate()
+                continue
+            for value in removed_values:
+                distinct_values.remove(value)
+            for value in added_values:
+                distinct_values.add(value)
+
+    def distinct_values(self: H, attr_name: str, refresh: bool=False) -> list:
+        """
+        Returns the distinct values of attr_name in sorted order.
+
+        The values are counted on the first call and the counts are then kept up to date by
+        append, extend, __setitem__ and __delitem__, so later calls don't scan the handler.
+        The sorted list is cached until a value is added or removed.
+        Like indexes, the counts can't see objects that are modified in place
+        (e.g. for datum in handler: datum.frame = ...) or objects replaced through obj_list.
+        Pass refresh=True after such changes to count the values again.
+        """
+        distinct_values = self._distinct_values.get(attr_name, None)
+        if distinct_values is None:
+            distinct_values = DistinctValues(attr_name=attr_name)
+            self._distinct_values[attr_name] = distinct_values
+        if refresh or not distinct_values.valid or distinct_values.size != len(self.obj_list):
+            distinct_values.build(self._get_attr_values(attr_name))
+        return list(distinct_values.sorted_values())
+
+    def _get_index(self: H, attr_name: str) -> HandlerIndex:
+        index = self._indexes.get(attr_name, None)
+        if index is None:
+            return None
+        if not index.valid or index.size != len(self.obj_list):
+            try:
+                values = self._get_attr_values(attr_name)
+            except AttributeError:
+                index.invalidate()
+                return None
+            index.build(values)
+        return index if index.usable else None
+
     def to_dict_list(self: H) -> List[dict]:
         return [item.to_dict() if not isinstance(item, tuple(jsonable_types)) else item for item in self]
 
+    @property
+    def is_columnar(self) -> bool:
+        return isinstance(self.obj_list, ColumnarList)
+
+    def to_columnar(self: H) -> H:
+        """
+        Returns a copy of this handler that stores its objects column by column.
+        Numeric fields are kept in NumPy arrays and string fields are category encoded.
+        The columnar handler supports the same API, but objects are constructed on access
+        and their non-scalar fields are copied, so modifying an object that was read from it
+        (including appending to one of its list fields) does not modify the handler.
+        Use __setitem__ to write a modified object back.
+        """
+        if self.is_columnar:
+            return self.copy()
+        # Copied so that the stored values aren't shared with the objects of this handler.
+        return self._new_from_obj_list(ColumnarList.from_objects(self.obj_type, self.obj_list).copy())
+
+    def to_row_based(self: H) -> H:
+        """
+        Returns a copy of this handler that stores its objects in a regular list.
+        """
+        return type(self)(list(self.obj_list))
+
+    def get_column(self: H, attr_name: str) -> np.ndarray:
+        """
+        Returns the values of attr_name for every object in the handler as a NumPy array.
+        For a columnar handler this doesn't construct any objects.
+        """
+        if self.is_columnar and attr_name in self.obj_list.columns:
+            return self.obj_list.column(attr_name)
+        return np.array([getattr(obj, attr_name) for obj in self.obj_list])
+
+    def _get_attr_values(self: H, attr_name: str) -> list:
+        if self.is_columnar and attr_name in self.obj_list.columns:
+            return self.obj_list.columns[attr_name].to_list()
+        return list(map(operator.attrgetter(attr_name), self.obj_list))
+
     @classmethod
     @abstractmethod
     def from_dict_list(cls: H, dict_list: List[dict]) -> H:
@@ -378,51 +822,98 @@ class BasicLoadableHandler(BasicHandler[H, T]):
         """
         raise NotImplementedError
 
-    def save_to_path(self: H, save_path: str, overwrite: bool=False):
+    def save_to_path(self: H, save_path: str, overwrite: bool=False, backend: str=None):
         if file_exists(save_path) and not overwrite:
             logger.error(f'File already exists at save_path: {save_path}')
             raise Exception
 
         extension = get_extension_from_path(save_path)
-        if extension == 'json':
-            json.dump(self.to_dict_list(), open(save_path, 'w'), indent=2, ensure_ascii=False)
-        elif extension == 'yaml':
-            yaml.dump(self.to_dict_list(), open(save_path, 'w'), allow_unicode=True)
+        if extension in ['json', 'yaml']:
+            save_data(self.to_dict_list(), save_path=save_path, extension=extension, backend=backend)
+        elif extension == 'jsonl':
+            with JsonlWriter(save_path, overwrite=True) as writer:
+                writer.write_all(self)
+        elif extension == 'npz':
+            save_npz(self.to_dict_list(), save_path=save_path)
         else:
             raise ValueError(
                 f"""
                 Invalid file extension encountered: {extension}
                 save_path: {save_path}
 
-                Please use either a .json or a .yaml extension.
+                Please use either a .json, .yaml, .jsonl or .npz extension.
                 """
             )
     
     @classmethod
-    def load_from_path(cls: H, json_path: str) -> H:
+    def load_from_path(cls: H, json_path: str, backend: str=None) -> H:
         check_file_exists(json_path)
         extension = get_extension_from_path(json_path)
-        if extension == 'json':
-            item_dict_list = json.load(open(json_path, 'r'))
-        elif extension == 'yaml':
-            item_dict_list = yaml.load(open(json_path, 'r'), Loader=yaml.FullLoader)
+        if extension in ['json', 'yaml']:
+            item_dict_list = load_data(json_path, extension=extension, backend=backend)
+        elif extension == 'jsonl':
+            item_dict_list = list(iter_jsonl(json_path, backend=backend))
+        elif extension == 'npz':
+            item_dict_list = load_npz(json_path)
         else:
             raise ValueError(
                 f"""
                 Invalid file extension encountered: {extension}
                 json_path: {json_path}
 
-                Please use either a .json or a .yaml extension.
+                Please use either a .json, .yaml, .jsonl or .npz extension.
                 """
             )
         return cls.from_dict_list(item_dict_list)
 
+    @classmethod
+    def iter_from_path(cls: H, json_path: str, chunk_size: int=1000, backend: str=None) -> typing.Iterator[T]:
+        """
+        Yields the objects saved at json_path one at a time.
+
+        For .jsonl files, lines are parsed and converted with from_dict_list in chunks of chunk_size,
+        so memory usage doesn't depend on the size of the file.
+        Other formats have to be loaded in full before the first object is yielded.
+        """
+        check_file_exists(json_path)
+        extension = get_extension_from_path(json_path)
+        if extension != 'jsonl':
+            for obj in cls.load_from_path(json_path, backend=backend):
+                yield obj
+            return
+        chunk = []
+        for item_dict in iter_jsonl(json_path, backend=backend):
+            chunk.append(item_dict)
+            if len(chunk) >= chunk_size:
+                for obj in cls.from_dict_list(chunk):
+                    yield obj
+                chunk = []
+        if len(chunk) > 0:
+            for obj in cls.from_dict_list(chunk):
+                yield obj
+
+    @classmethod
+    def get_writer(cls: H, save_path: str, overwrite: bool=False, append: bool=False) -> JsonlWriter:
+        """
+        Returns a writer that saves objects to a .jsonl file one record at a time.
+        The file can be read back with load_from_path or iter_from_path.
+        """
+        extension = get_extension_from_path(save_path)
+        if extension != 'jsonl':
+            logger.error(f'Only .jsonl files can be written incrementally. save_path: {save_path}')
+            raise ValueError
+        return JsonlWriter(save_path, overwrite=overwrite, append=append)
+
     def verify_jsonable(self):
         for item in self:
             assert hasattr(item, 'verify_jsonable')
             item.verify_jsonable()
 
-    def split(self, ratio: List[int], shuffle: bool=True) -> List[H]:
+    def split(self, ratio: List[int], shuffle: bool=True, copy: bool=True) -> List[H]:
+        """
+        Splits the handler into len(ratio) parts whose sizes are proportional to ratio.
+        If copy is False, the parts are views of this handler (see view) instead of copies.
+        """
         assert len(self) % sum(ratio) == 0, f'sum(ratio)={sum(ratio)} does not evenly divide into len(self)={len(self)}'
         locations = np.cumsum([val*int(len(self)/sum(ratio)) for val in ratio])
         start_location = None
@@ -435,30 +926,133 @@ class BasicLoadableHandler(BasicHandler[H, T]):
             start_location = end_location
             end_location = locations[count]
             count += 1
-            samples.append(self[start_location:end_location].copy())
+            if copy:
+                samples.append(self[start_location:end_location].copy())
+            else:
+                samples.append(self.view(slice(start_location, end_location)))
         return samples
     
-    def get(self, **kwargs) -> H:
-        def condition(obj) -> bool:
-            for key, val in kwargs.items():
-                if not hasattr(obj, key):
+    @staticmethod
+    def _condition(obj, kwargs: dict) -> bool:
+        for key, val in kwargs.items():
+            if not hasattr(obj, key):
+                return False
+            elif val is None or (val is not None and getattr(obj, key) == val):
+                pass
+            elif isinstance(val, (list, tuple)) and not isinstance(getattr(obj, key), (list, tuple)):
+                found = False
+                for val_part in val:
+                    if getattr(obj, key) == val_part:
+                        found = True
+                        break
+                if not found:
                     return False
-                elif val is None or (val is not None and getattr(obj, key) == val):
+                else:
                     pass
-                elif isinstance(val, (list, tuple)) and not isinstance(getattr(obj, key), (list, tuple)):
-                    found = False
-                    for val_part in val:
-                        if getattr(obj, key) == val_part:
-                            found = True
-                            break
-                    if not found:
-                        return False
-                    else:
-                        pass
+            else:
+                return False
+        return True
+
+    def _lookup_condition(self: H, index: HandlerIndex, val) -> np.ndarray:
+        """
+        Answers a single get condition with an index.
+        Returns None if the index can't answer it.
+        """
+        if val is None:
+            return np.arange(len(self.obj_list))
+        elif isinstance(val, (list, tuple)):
+            positions = index.lookup(val)
+            if positions is None:
+                if index.kind == IndexKinds.HASH and isinstance(val, list):
+                    # Only a list can be equal to a list, and a usable hash index can't contain lists.
+                    positions = np.empty(0, dtype=np.int64)
                 else:
-                    return False
-            return True
-        return type(self)([obj for obj in self if condition(obj)])
+                    return None
+            positions_list = [positions]
+            for val_part in val:
+                if isinstance(val_part, (list, tuple)):
+                    # Attributes that are equal to a list or tuple are excluded from list-membership.
+                    continue
+                part_positions = index.lookup(val_part)
+                if part_positions is None:
+                    return None
+                positions_list.append(part_positions)
+            return np.unique(np.concatenate(positions_list))
+        else:
+            return index.lookup(val)
+
+    def get_indices(self: H, **kwargs) -> np.ndarray:
+        """
+        Returns the positions of the objects that get(**kwargs) would return, without creating a new handler.
+        Conditions on indexed attributes are answered by the index. The remaining conditions are
+        only checked for the objects that satisfy the indexed ones.
+        """
+        candidates = None
+        remaining = {}
+        for key, val in kwargs.items():
+            index = self._get_index(key) if len(self._indexes) > 0 else None
+            positions = self._lookup_condition(index, val) if index is not None else None
+            if positions is None:
+                remaining[key] = val
+            elif candidates is None:
+                candidates = positions
+            else:
+                candidates = intersect_sorted(candidates, positions)
+        if len(remaining) == 0:
+            return candidates if candidates is not None else np.arange(len(self.obj_list))
+        if self.is_columnar:
+            positions = self.obj_list.where(**remaining)
+            if positions is not None:
+                return positions if candidates is None else intersect_sorted(candidates, positions)
+        obj_list = self.obj_list
+        candidates = candidates.tolist() if candidates is not None else range(len(obj_list))
+        return np.array([idx for idx in candidates if self._condition(obj_list[idx], remaining)], dtype=np.int64)
+
+    def get(self, **kwargs) -> H:
+        if len(self._indexes) == 0 and not self.is_columnar:
+            return type(self)([obj for obj in self if self._condition(obj, kwargs)])
+        return self._take(self.get_indices(**kwargs))
+
+    def get_indices_in_range(self: H, attr_name: str, min_val=None, max_val=None) -> np.ndarray:
+        """
+        Returns the positions of the objects whose attr_name is between min_val and max_val (inclusive).
+        Objects whose attr_name is None are never included.
+        A sorted index on attr_name is used if there is one.
+        """
+        index = self._get_index(attr_name)
+        positions = index.lookup_range(min_val=min_val, max_val=max_val) if index is not None else None
+        if positions is None:
+            values = self._get_attr_values(attr_name)
+            positions = np.array([
+                idx for idx, value in enumerate(values)
+                if value is not None and (min_val is None or value >= min_val) and (max_val is None or value <= max_val)
+            ], dtype=np.int64)
+        return positions
+
+    def get_in_range(self: H, attr_name: str, min_val=None, max_val=None) -> H:
+        return self._take(self.get_indices_in_range(attr_name=attr_name, min_val=min_val, max_val=max_val))
+
+    def group_by(self: H, *attr_names: str) -> HandlerGroups[H]:
+        """
+        Groups the objects by the values of one or more attributes in a single pass.
+
+        Returns a mapping from key tuples (one value per attribute) to views of the objects in each group,
+        which also computes aggregations for every group at once. See HandlerGroups.
+
+        for (test_name, frame), frame_data in predictions.group_by('test_name', 'frame').items():
+            ...
+        """
+        if len(attr_names) == 0:
+            logger.error(f'At least one attribute name is required.')
+            raise ValueError
+        value_lists = []
+        for attr_name in attr_names:
+            try:
+                value_lists.append(self._get_attr_values(attr_name))
+            except AttributeError:
+                logger.error(f"{self.obj_type.__name__} class has not attribute: '{attr_name}'")
+                raise
+        return HandlerGroups(self, attr_names=list(attr_names), value_lists=value_lists)
 
 class BasicLoadableIdHandler(BasicLoadableHandler[H, T], BasicHandler[H, T]):
     """
@@ -472,22 +1066,138 @@ class BasicLoadableIdHandler(BasicLoadableHandler[H, T], BasicHandler[H, T]):
     """
     def __init__(self: H, obj_type: type, obj_list: List[T]=None):
         super().__init__(obj_type=obj_type, obj_list=obj_list)
-    
-    def get_obj_from_id(self: H, id: int) -> T:
-        id_list = []
-        for obj in self:
-            if id == obj.id:
-                return obj
-            else:
-                id_list.append(obj.id)
+        self._id_index = None
+        self._id_index_size = 0
+        self._id_index_unique = True
+
+    def _invalidate_id_index(self: H):
+        self._id_index = None
+
+    def _build_id_index(self: H):
+        id_index = {}
+        for i, id in enumerate(self._get_attr_values('id')):
+            id_index.setdefault(id, i)
+        self._id_index = id_index
+        self._id_index_size = len(self.obj_list)
+        self._id_index_unique = len(id_index) == len(self.obj_list)
+
+    def _get_id_index(self: H) -> Dict[int, int]:
+        """
+        Returns a dictionary that maps each id to the position of the first object with that id.
+        The index is built lazily and is rebuilt if the object list was resized without
+        going through the handler (e.g. handler.obj_list.append(...)).
+        """
+        if self._id_index is None or self._id_index_size != len(self.obj_list):
+            self._build_id_index()
+        return self._id_index
+
+    def _lookup_id(self: H, id: int) -> int:
+        idx = self._get_id_index().get(id, None)
+        if idx is None or self.obj_list[idx].id != id:
+            # The index may be stale if the object list was reordered directly.
+            self._build_id_index()
+            idx = self._id_index.get(id, None)
+        return idx
+
+    def _log_missing_ids(self: H, ids: list):
+        id_list = self.ids
         id_list.sort()
-        logger.error(f"Couldn't find {self.obj_type.__name__} with id={id}")
+        for id in ids:
+            logger.error(f"Couldn't find {self.obj_type.__name__} with id={id}")
         logger.error(f"Possible ids: {id_list}")
-        raise Exception
+
+    def append(self: H, item: T):
+        super().append(item)
+        if self._id_index is not None and self._id_index_size == len(self.obj_list) - 1:
+            if item.id in self._id_index:
+                self._id_index_unique = False
+            else:
+                self._id_index[item.id] = len(self.obj_list) - 1
+            self._id_index_size += 1
+        else:
+            self._invalidate_id_index()
+
+    def extend(self: H, item_list: List[T], trusted: bool=False):
+        item_list = item_list if type(item_list) is list else list(item_list)
+        start = len(self.obj_list)
+        super().extend(item_list, trusted=trusted)
+        if self._id_index is not None and self._id_index_size == start:
+            id_index = self._id_index
+            for i, item in enumerate(item_list):
+                if item.id in id_index:
+                    self._id_index_unique = False
+                else:
+                    id_index[item.id] = start + i
+            self._id_index_size += len(item_list)
+        else:
+            self._invalidate_id_index()
+
+    def __setitem__(self: H, idx: int, value: T):
+        if type(idx) is int and self._id_index is not None and self._id_index_unique:
+            idx = idx + len(self.obj_list) if idx < 0 else idx
+            old_id = self.obj_list[idx].id
+            super().__setitem__(idx, value)
+            if self._id_index.get(old_id, None) == idx:
+                del self._id_index[old_id]
+            if value.id in self._id_index:
+                self._invalidate_id_index()
+            else:
+                self._id_index[value.id] = idx
+        else:
+            super().__setitem__(idx, value)
+            self._invalidate_id_index()
+
+    def __delitem__(self: H, idx: int):
+        is_last = type(idx) is int and idx in [-1, len(self.obj_list) - 1]
+        if is_last and self._id_index is not None and self._id_index_unique and len(self.obj_list) > 0:
+            last_id = self.obj_list[-1].id
+            super().__delitem__(idx)
+            self._id_index.pop(last_id, None)
+            self._id_index_size -= 1
+        else:
+            super().__delitem__(idx)
+            self._invalidate_id_index()
+
+    def sort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False):
+        super().sort(attr_name=attr_name, reverse=reverse)
+        self._invalidate_id_index()
+
+    def shuffle(self: H):
+        super().shuffle()
+        self._invalidate_id_index()
+
+    def get_obj_from_id(self: H, id: int) -> T:
+        idx = self._lookup_id(id)
+        if idx is None:
+            self._log_missing_ids([id])
+            raise Exception
+        return self.obj_list[idx]
+
+    def get_positions_from_ids(self: H, ids: List[int]) -> np.ndarray:
+        """
+        Returns the position of the first object with each id, in the same order as ids.
+        """
+        id_index = self._get_id_index()
+        positions = list(map(id_index.get, ids))
+        if None in positions:
+            # The index may be stale if the object list was reordered directly.
+            self._build_id_index()
+            positions = list(map(self._id_index.get, ids))
+            if None in positions:
+                self._log_missing_ids([id for id, idx in zip(ids, positions) if idx is None])
+                raise Exception
+        return np.array(positions, dtype=np.int64)
+
+    def get_objs_from_ids(self: H, ids: List[int]) -> H:
+        """
+        Bulk version of get_obj_from_id.
+        Returns a handler containing the object for each id, in the same order as ids.
+        """
+        return self._take(self.get_positions_from_ids(ids))
 
     @property
     def ids(self) -> List[int]:
-        return [obj.id for obj in self]
+        return self._get_attr_values('id')
 
 class BasicSubclassHandler(Generic[H, T]):
     """
@@ -567,17 +1277,8 @@ class BasicSubclassHandler(Generic[H, T]):
             logger.error(f'Expected int or slice. Got type(idx)={type(idx)}')
             raise TypeError
 
-    def __iter__(self: H) -> H:
-        self.n = 0
-        return self
-
-    def __next__(self: H) -> T:
-        if self.n < len(self.obj_list):
-            result = self.obj_list[self.n]
-            self.n += 1
-            return result
-        else:
-            raise StopIteration
+    def __iter__(self: H) -> typing.Iterator[T]:
+        return iter(self.obj_list)
 
     @classmethod
     def buffer(cls: H, obj) -> H:
@@ -590,9 +1291,10 @@ class BasicSubclassHandler(Generic[H, T]):
         check_issubclass(item, valid_parent_class_list=[self.obj_parent_class])
         self.obj_list.append(item)
 
-    def sort(self: H, attr_name: str, reverse: bool=False):
-        # TODO: Test that this works.
-        if len(self) > 0:
+    def _sort_values(self: H, attr_name: str) -> list:
+        try:
+            return get_sort_values(self.obj_list, attr_name)
+        except AttributeError:
             attr_list = None
             class_list = []
             for obj in self.obj_list:
@@ -605,15 +1307,28 @@ class BasicSubclassHandler(Generic[H, T]):
                     for i in list(range(len(attr_list)))[::-1]:
                         if attr_list[i] not in list(obj.__dict__.keys()):
                             del attr_list[i]
+            logger.error(f"'{attr_name}' is not an attribute shared by every class in this handler: {class_list}")
+            logger.error(f'Shared attribute names:')
+            for name in attr_list:
+                logger.error(f'\t{name}')
+            raise Exception
 
-            if attr_name not in attr_list:
-                logger.error(f"'{attr_name}' is not an attribute shared by every class in this handler: {class_list}")
-                logger.error(f'Shared attribute names:')
-                for name in attr_list:
-                    logger.error(f'\t{name}')
-                raise Exception
-
-            self.obj_list.sort(key=operator.attrgetter(attr_name), reverse=reverse)
+    def argsort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False) -> np.ndarray:
+        """
+        Same as BasicHandler.argsort.
+        """
+        attr_names = [attr_name] if type(attr_name) is str else list(attr_name)
+        reverse_list = reverse if type(reverse) is list else [reverse] * len(attr_names)
+        if len(reverse_list) != len(attr_names):
+            logger.error(f'Got {len(reverse_list)} reverse flags for {len(attr_names)} keys.')
+            raise ValueError
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        return argsort_values([self._sort_values(name) for name in attr_names], reverse_list)
+
+    def sort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False):
+        if len(self) > 0:
+            self.obj_list[:] = take_positions(self.obj_list, self.argsort(attr_name, reverse=reverse))
         else:
             logger.error(f"Cannot sort. {type(self).__name__} is empty.")
             raise Exception
@@ -639,15 +1354,49 @@ class MultiParameterHandler(Generic[H, T]):
         return [param for param in list(inspect.signature(cls.__init__).parameters.keys()) if param != 'self']
 
     def to_constructor_dict(self) -> dict:
+        constructor_params = self.get_constructor_params()
         constructor_dict = {}
         for key, val in self.__dict__.items():
-            if key in self.get_constructor_params():
+            if key in constructor_params:
                 constructor_dict[key] = val
         return constructor_dict
 
     def __key(self) -> tuple:
         return tuple([self.__class__] + list(self.__dict__.values()))
 
+    def _set_obj_list(self: H, obj_list: List[T]):
+        # Same as BasicHandler._set_obj_list
+        old_obj_list = self.obj_list
+        for key, val in list(self.__dict__.items()):
+            if val is old_obj_list:
+                self.__dict__[key] = obj_list
+
+    def _materialize(self: H):
+        if isinstance(self.obj_list, ListView):
+            self._set_obj_list(self.obj_list.to_list())
+
+    def _new_from_obj_list(self: H, obj_list: List[T], trusted: bool=False) -> H:
+        """
+        Creates a handler with the same parameters as this one around obj_list,
+        without copying the rest of this handler.
+        """
+        constructor_params = self.get_constructor_params()
+        constructor_dict = {}
+        for key, val in self.__dict__.items():
+            if key in constructor_params and val is not self.obj_list:
+                constructor_dict[key] = val
+        result = type(self)(**constructor_dict)
+        for key, val in self.__dict__.items():
+            if key not in constructor_params and key not in result.__dict__:
+                result.__dict__[key] = val
+        if not trusted:
+            check_type_from_list(obj_list, valid_type_list=[self.obj_type])
+        result._set_obj_list(obj_list)
+        return result
+
+    def _take(self: H, positions: np.ndarray) -> H:
+        return self._new_from_obj_list(take_positions(self.obj_list, positions), trusted=True)
+
     def __hash__(self):
         return hash(self.__key())
 
@@ -666,6 +1415,8 @@ class MultiParameterHandler(Generic[H, T]):
         return len(self.obj_list)
 
     def __getitem__(self: H, idx: int) -> T:
+        if isinstance(idx, np.integer):
+            idx = int(idx)
         if type(idx) is int:
             if len(self.obj_list) == 0:
                 logger.error(f"{type(self).__name__} is empty.")
@@ -676,26 +1427,35 @@ class MultiParameterHandler(Generic[H, T]):
             else:
                 return self.obj_list[idx]
         elif type(idx) is slice:
-            # TODO: Test Functionality
-            new_instance = self.copy()
-            new_instance.obj_list = new_instance.obj_list[idx.start:idx.stop:idx.step]
-            return new_instance
+            return self._new_from_obj_list(self.obj_list[idx.start:idx.stop:idx.step])
+        elif is_fancy_index(idx):
+            return self._take(positions_from_index(idx, len(self.obj_list)))
         else:
-            logger.error(f'Expected int or slice. Got type(idx)={type(idx)}')
+            logger.error(f'Expected int, slice, list or np.ndarray. Got type(idx)={type(idx)}')
             raise TypeError
 
     def __setitem__(self: H, idx: int, value: T):
+        self._materialize()
+        if isinstance(idx, np.integer):
+            idx = int(idx)
         if type(idx) is int:
             check_type(value, valid_type_list=[self.obj_type])
             self.obj_list[idx] = value
         elif type(idx) is slice:
             check_type_from_list(value, valid_type_list=[self.obj_type])
             self.obj_list[idx.start:idx.stop:idx.step] = value
+        elif is_fancy_index(idx):
+            value = list(value)
+            check_type_from_list(value, valid_type_list=[self.obj_type])
+            assign_positions(self.obj_list, positions_from_index(idx, len(self.obj_list)), value)
         else:
-            logger.error(f'Expected int or slice. Got type(idx)={type(idx)}')
+            logger.error(f'Expected int, slice, list or np.ndarray. Got type(idx)={type(idx)}')
             raise TypeError
 
     def __delitem__(self: H, idx: int):
+        self._materialize()
+        if isinstance(idx, np.integer):
+            idx = int(idx)
         if type(idx) is int:
             if len(self.obj_list) == 0:
                 logger.error(f"{type(self).__name__} is empty.")
@@ -707,21 +1467,14 @@ class MultiParameterHandler(Generic[H, T]):
                 del self.obj_list[idx]
         elif type(idx) is slice:
             del self.obj_list[idx.start:idx.stop:idx.step]
+        elif is_fancy_index(idx):
+            delete_positions(self.obj_list, positions_from_index(idx, len(self.obj_list)))
         else:
-            logger.error(f'Expected int or slice. Got type(idx)={type(idx)}')
+            logger.error(f'Expected int, slice, list or np.ndarray. Got type(idx)={type(idx)}')
             raise TypeError
 
-    def __iter__(self: H) -> H:
-        self.n = 0
-        return self
-
-    def __next__(self: H) -> T:
-        if self.n < len(self.obj_list):
-            result = self.obj_list[self.n]
-            self.n += 1
-            return result
-        else:
-            raise StopIteration
+    def __iter__(self: H) -> typing.Iterator[T]:
+        return iter(self.obj_list)
 
     @classmethod
     def buffer(cls: H, obj) -> H:
@@ -737,22 +1490,49 @@ class MultiParameterHandler(Generic[H, T]):
 
     def append(self: H, item: T):
         check_type(item, valid_type_list=[self.obj_type])
+        self._materialize()
         self.obj_list.append(item)
 
-    def sort(self: H, attr_name: str, reverse: bool=False):
-        if len(self) > 0:
-            attr_list = list(self.obj_list[0].__dict__.keys())    
-            if attr_name not in attr_list:
-                logger.error(f"{self.obj_type.__name__} class has not attribute: '{attr_name}'")
-                logger.error(f'Possible attribute names:')
-                for name in attr_list:
-                    logger.error(f'\t{name}')
-                raise Exception
+    def _sort_values(self: H, attr_name: str) -> list:
+        try:
+            return get_sort_values(self.obj_list, attr_name)
+        except AttributeError:
+            attr_list = list(self.obj_list[0].__dict__.keys())
+            logger.error(f"{self.obj_type.__name__} class has not attribute: '{attr_name}'")
+            logger.error(f'Possible attribute names:')
+            for name in attr_list:
+                logger.error(f'\t{name}')
+            raise Exception
 
-            self.obj_list.sort(key=operator.attrgetter(attr_name), reverse=reverse)
+    def argsort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False) -> np.ndarray:
+        """
+        Same as BasicHandler.argsort.
+        """
+        attr_names = [attr_name] if type(attr_name) is str else list(attr_name)
+        reverse_list = reverse if type(reverse) is list else [reverse] * len(attr_names)
+        if len(reverse_list) != len(attr_names):
+            logger.error(f'Got {len(reverse_list)} reverse flags for {len(attr_names)} keys.')
+            raise ValueError
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        return argsort_values([self._sort_values(name) for name in attr_names], reverse_list)
+
+    def sort(self: H, attr_name: Union[str, List[str]], reverse: Union[bool, List[bool]]=False):
+        self._materialize()
+        if len(self) > 0:
+            self.obj_list[:] = take_positions(self.obj_list, self.argsort(attr_name, reverse=reverse))
         else:
             logger.error(f"Cannot sort. {type(self).__name__} is empty.")
             raise Exception
 
     def shuffle(self: H):
-        random.shuffle(self.obj_list)
\ No newline at end of file
+        self._materialize()
+        random.shuffle(self.obj_list)
+
+    def view(self: H, idx) -> H:
+        """
+        Returns a handler with the same parameters that shares this handler's object list.
+        See BasicHandler.view.
+        """
+        positions = positions_from_index(idx, len(self.obj_list))
+        return self._new_from_obj_list(ListView(self.obj_list, positions), trusted=True)
\ No newline at end of file
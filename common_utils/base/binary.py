@@ -0,0 +1,185 @@
+from __future__ import annotations
+from typing import List
+import json
+import numpy as np
+
+from logger import logger
+from ..check_utils import check_file_exists
+from .columnar import Column, ColumnKinds
+
+format_version = 1
+
+class FieldTypes:
+    DICT = 'dict'
+    COLUMN = 'column'
+    ARRAY = 'array'
+    JSON = 'json'
+
+def _text_to_array(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+
+def _array_to_text(arr: np.ndarray) -> str:
+    return arr.tobytes().decode('utf-8')
+
+def _same_keys(values: list) -> bool:
+    if len(values) == 0 or type(values[0]) is not dict:
+        return False
+    keys = list(values[0].keys())
+    for value in values:
+        if type(value) is not dict or len(value) != len(keys) or list(value.keys()) != keys:
+            return False
+    return True
+
+_numeric_kinds = {bool: ColumnKinds.BOOL, int: ColumnKinds.INT, float: ColumnKinds.FLOAT}
+
+def _signature(value):
+    # Nested tuple of element kinds. None marks a non-numeric element.
+    if type(value) in (list, tuple):
+        return tuple([_signature(element) for element in value])
+    return _numeric_kinds.get(type(value), None)
+
+def _flatten(signature) -> list:
+    if type(signature) is tuple:
+        return [kind for element in signature for kind in _flatten(element)]
+    return [signature]
+
+def _as_array(values: list):
+    """
+    values as an array with one row per value, if every value is a (nested) list with the same shape
+    and the same element type at each position. Otherwise None.
+
+    When ints and floats are mixed (e.g. keypoints with an int visibility flag),
+    a float array is returned along with a mask of the int positions.
+    """
+    if any([type(value) not in (list, tuple) for value in values]):
+        return None
+    signature = _signature(values[0])
+    for value in values:
+        if _signature(value) != signature:
+            return None
+    kinds = _flatten(signature)
+    kind_set = set(kinds)
+    if len(kinds) == 0 or None in kind_set:
+        return None
+    if len(kind_set) == 1:
+        dtype, mixed = ColumnKinds.dtypes[kinds[0]], False
+    elif kind_set == {ColumnKinds.INT, ColumnKinds.FLOAT}:
+        dtype, mixed = np.float64, True
+    else:
+        return None
+    try:
+        arr = np.array(values, dtype=dtype)
+    except (ValueError, OverflowError):
+        # Ragged lists or integers that don't fit in 64 bits
+        return None
+    if arr.ndim < 2 or arr.shape[0] != len(values):
+        return None
+    if not mixed:
+        return arr, None
+    int_mask = np.array(kinds, dtype=object).reshape(arr.shape[1:]) == ColumnKinds.INT
+    if np.abs(arr[:, int_mask]).max(initial=0) > 2**53:
+        # Integers that can't be represented exactly as floats
+        return None
+    return arr, int_mask
+
+class _Encoder:
+    def __init__(self):
+        self.arrays = {}
+
+    def add(self, arr: np.ndarray) -> str:
+        name = f'a{len(self.arrays)}'
+        self.arrays[name] = arr
+        return name
+
+    def encode(self, values: list) -> dict:
+        if _same_keys(values):
+            keys = list(values[0].keys())
+            return {
+                'type': FieldTypes.DICT,
+                'keys': keys,
+                'fields': [self.encode([value[key] for value in values]) for key in keys]
+            }
+        result = _as_array(values)
+        if result is not None:
+            arr, int_mask = result
+            field = {'type': FieldTypes.ARRAY, 'data': self.add(arr)}
+            if int_mask is not None:
+                field['int_mask'] = self.add(int_mask)
+            return field
+        kind = ColumnKinds.infer(values)
+        column = None
+        if kind != ColumnKinds.OBJECT:
+            try:
+                column = Column.from_values(values, kind=kind)
+            except OverflowError:
+                # Integers that don't fit in 64 bits
+                column = None
+        if column is None:
+            return {'type': FieldTypes.JSON, 'data': self.add(_text_to_array(json.dumps(values, ensure_ascii=False)))}
+        field = {'type': FieldTypes.COLUMN, 'kind': kind, 'data': self.add(column.data)}
+        if column.null is not None and column.has_nulls:
+            field['null'] = self.add(column.null)
+        if kind == ColumnKinds.CATEGORY:
+            field['categories'] = self.add(_text_to_array(json.dumps(column.categories, ensure_ascii=False)))
+        return field
+
+def _decode(field: dict, arrays, size: int) -> list:
+    field_type = field['type']
+    if field_type == FieldTypes.DICT:
+        keys = field['keys']
+        field_values = [_decode(child, arrays, size) for child in field['fields']]
+        if len(keys) == 0:
+            return [{} for i in range(size)]
+        return [dict(zip(keys, values)) for values in zip(*field_values)]
+    elif field_type == FieldTypes.ARRAY:
+        arr = arrays[field['data']]
+        if 'int_mask' not in field:
+            return arr.tolist()
+        int_mask = arrays[field['int_mask']]
+        result = arr.astype(object)
+        result[:, int_mask] = arr[:, int_mask].astype(np.int64).astype(object)
+        return result.tolist()
+    elif field_type == FieldTypes.JSON:
+        return json.loads(_array_to_text(arrays[field['data']]))
+    elif field_type == FieldTypes.COLUMN:
+        categories = json.loads(_array_to_text(arrays[field['categories']])) if 'categories' in field else None
+        null = arrays[field['null']] if 'null' in field else None
+        column = Column(kind=field['kind'], data=arrays[field['data']], size=size, null=null, categories=categories)
+        return column.to_list()
+    else:
+        logger.error(f'Invalid field type: {field_type}')
+        raise ValueError
+
+def save_npz(item_list: list, save_path: str, compressed: bool=False):
+    """
+    Saves a list of JSON-serializable items (e.g. the result of to_dict_list) as a .npz file.
+
+    Each field is stored as a typed array:
+    * Nested dictionaries with the same keys are split into their fields.
+    * Numbers and booleans become NumPy arrays, with a null mask if there are None values.
+    * Lists of numbers with the same shape become a 2D (or higher) NumPy array.
+    * Strings are stored as int32 codes into a dictionary of the distinct strings.
+    * Anything else (e.g. mixed types or ragged lists) is stored as JSON text.
+    Loading the file with load_npz returns the same values as a JSON round trip.
+    """
+    encoder = _Encoder()
+    root = encoder.encode(item_list) if len(item_list) > 0 else None
+    header = {'version': format_version, 'size': len(item_list), 'root': root}
+    arrays = encoder.arrays
+    arrays['header'] = _text_to_array(json.dumps(header))
+    with open(save_path, 'wb') as f:
+        if compressed:
+            np.savez_compressed(f, **arrays)
+        else:
+            np.savez(f, **arrays)
+
+def load_npz(path: str) -> list:
+    check_file_exists(path)
+    with np.load(path, allow_pickle=False) as arrays:
+        header = json.loads(_array_to_text(arrays['header']))
+        if header['version'] > format_version:
+            logger.error(f"{path} was saved with format version {header['version']}, which is newer than {format_version}")
+            raise ValueError
+        if header['root'] is None:
+            return []
+        return _decode(header['root'], arrays, size=header['size'])
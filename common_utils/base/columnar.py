@@ -0,0 +1,549 @@
+from __future__ import annotations
+from typing import List, Dict, Any, Iterator
+from collections.abc import MutableSequence, Sequence
+import random
+import numpy as np
+
+from logger import logger
+from ..constants.number_constants import int_types, float_types
+
+int_type_set = frozenset(int_types)
+float_type_set = frozenset(float_types)
+bool_type_set = frozenset([bool, np.bool_])
+
+class ColumnKinds:
+    BOOL = 'bool'
+    INT = 'int'
+    FLOAT = 'float'
+    CATEGORY = 'category'
+    OBJECT = 'object'
+
+    dtypes = {
+        BOOL: np.bool_,
+        INT: np.int64,
+        FLOAT: np.float64,
+        CATEGORY: np.int32,
+        OBJECT: object
+    }
+
+    @classmethod
+    def of_value(cls, value) -> str:
+        value_type = type(value)
+        if value_type in bool_type_set:
+            return cls.BOOL
+        elif value_type in int_type_set:
+            return cls.INT
+        elif value_type in float_type_set:
+            return cls.FLOAT
+        elif value_type is str:
+            return cls.CATEGORY
+        else:
+            return cls.OBJECT
+
+    @classmethod
+    def infer(cls, values: list) -> str:
+        """
+        Infers the narrowest kind that can hold every value losslessly.
+        None is allowed in every kind. A column of only None values is treated as FLOAT.
+        Mixing ints and floats results in OBJECT so that ints don't come back as floats.
+        """
+        kind = None
+        for value in values:
+            if value is None:
+                continue
+            value_kind = cls.of_value(value)
+            if value_kind == cls.OBJECT:
+                return cls.OBJECT
+            elif kind is None:
+                kind = value_kind
+            elif kind != value_kind:
+                return cls.OBJECT
+        return kind if kind is not None else cls.FLOAT
+
+def copy_object(value):
+    # The same rule that BasicObject.copy uses for its fields.
+    if ColumnKinds.of_value(value) == ColumnKinds.OBJECT and hasattr(value, 'copy'):
+        return value.copy()
+    return value
+
+def object_array(values: list) -> np.ndarray:
+    # np.array would turn nested lists into extra dimensions.
+    arr = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        arr[i] = value
+    return arr
+
+class Column:
+    """
+    A single field of a ColumnarList.
+
+    Numbers and booleans are stored in a typed NumPy array with an optional null mask for None.
+    Strings are stored as int32 codes into a list of categories, with -1 representing None.
+    Anything else is stored in an object array, and is copied when it is read so that
+    modifying a value that was read from the column doesn't modify the column.
+    The underlying arrays are over-allocated so that appending is amortized O(1).
+    """
+    def __init__(self, kind: str, data: np.ndarray, size: int, null: np.ndarray=None, categories: List[str]=None):
+        self.kind = kind
+        self._data = data
+        self._null = null
+        self.size = size
+        self.categories = categories if categories is not None else []
+        self._category_codes = {category: code for code, category in enumerate(self.categories)}
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}(kind={self.kind}, size={self.size})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @classmethod
+    def from_values(cls, values: list, kind: str=None) -> Column:
+        kind = kind if kind is not None else ColumnKinds.infer(values)
+        result = cls(kind=kind, data=np.empty(0, dtype=ColumnKinds.dtypes[kind]), size=0)
+        result.extend(values)
+        return result
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    @property
+    def null(self) -> np.ndarray:
+        if self._null is None:
+            return None
+        return self._null[:self.size]
+
+    @property
+    def has_nulls(self) -> bool:
+        if self.kind == ColumnKinds.CATEGORY:
+            return bool((self.data < 0).any())
+        elif self._null is not None:
+            return bool(self.null.any())
+        else:
+            return False
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = self._data.nbytes
+        if self._null is not None:
+            nbytes += self._null.nbytes
+        return nbytes
+
+    def accepts(self, value) -> bool:
+        if value is None:
+            return True
+        value_kind = ColumnKinds.of_value(value)
+        return self.kind == ColumnKinds.OBJECT or value_kind == self.kind
+
+    def encode(self, values: list):
+        """
+        Encodes values into (data, null) arrays of this column's kind.
+        All values must be accepted by this column.
+        """
+        if self.kind == ColumnKinds.OBJECT:
+            return object_array(values), None
+        elif self.kind == ColumnKinds.CATEGORY:
+            codes = np.empty(len(values), dtype=np.int32)
+            for i, value in enumerate(values):
+                if value is None:
+                    codes[i] = -1
+                else:
+                    code = self._category_codes.get(value, None)
+                    if code is None:
+                        code = len(self.categories)
+                        self.categories.append(value)
+                        self._category_codes[value] = code
+                    codes[i] = code
+            return codes, None
+        else:
+            null = np.fromiter((value is None for value in values), dtype=np.bool_, count=len(values))
+            if null.any():
+                values = [value if value is not None else 0 for value in values]
+            else:
+                null = None
+            return np.array(values, dtype=ColumnKinds.dtypes[self.kind]).reshape(-1), null
+
+    def _reserve(self, size: int):
+        capacity = len(self._data)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 8)
+        data = np.empty(capacity, dtype=self._data.dtype)
+        data[:self.size] = self._data[:self.size]
+        self._data = data
+        if self._null is not None:
+            null = np.zeros(capacity, dtype=np.bool_)
+            null[:self.size] = self._null[:self.size]
+            self._null = null
+
+    def _write(self, start: int, data: np.ndarray, null: np.ndarray):
+        end = start + len(data)
+        self._data[start:end] = data
+        if null is not None and self._null is None:
+            self._null = np.zeros(len(self._data), dtype=np.bool_)
+        if self._null is not None:
+            self._null[start:end] = null if null is not None else False
+
+    def _reinfer(self, values: list):
+        # Called when a value doesn't fit the current kind.
+        other = Column.from_values(values)
+        self.__dict__.update(other.__dict__)
+
+    def get(self, idx: int) -> Any:
+        if self.kind == ColumnKinds.CATEGORY:
+            code = self._data[idx]
+            return self.categories[code] if code >= 0 else None
+        elif self.kind == ColumnKinds.OBJECT:
+            return copy_object(self._data[idx])
+        elif self._null is not None and self._null[idx]:
+            return None
+        else:
+            return self._data[idx].item()
+
+    def to_list(self, start: int=0, stop: int=None) -> list:
+        stop = stop if stop is not None else self.size
+        if self.kind == ColumnKinds.CATEGORY:
+            categories = self.categories
+            return [categories[code] if code >= 0 else None for code in self._data[start:stop].tolist()]
+        elif self.kind == ColumnKinds.OBJECT:
+            return [copy_object(value) for value in self._data[start:stop]]
+        values = self._data[start:stop].tolist()
+        if self._null is not None:
+            for i in np.flatnonzero(self._null[start:stop]).tolist():
+                values[i] = None
+        return values
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Numeric columns without None values are returned as a read-only view.
+        Numeric columns with None values are returned as float arrays with NaN in place of None.
+        Category columns are decoded into object arrays.
+        """
+        if self.kind == ColumnKinds.CATEGORY:
+            categories = object_array(self.categories + [None])
+            return categories[self.data]
+        elif self.kind != ColumnKinds.OBJECT and self.has_nulls:
+            result = self.data.astype(np.float64)
+            result[self.null] = np.nan
+            return result
+        result = self.data.view()
+        result.flags.writeable = False
+        return result
+
+    def set(self, idx: int, value):
+        if not self.accepts(value):
+            values = self.to_list()
+            values[idx] = value
+            self._reinfer(values)
+            return
+        data, null = self.encode([value])
+        self._write(idx, data, null)
+
+    def extend(self, values: list):
+        if not all(self.accepts(value) for value in values):
+            self._reinfer(self.to_list() + list(values))
+            return
+        data, null = self.encode(values)
+        self._reserve(self.size + len(data))
+        self._write(self.size, data, null)
+        self.size += len(data)
+
+    def append(self, value):
+        self.extend([value])
+
+    def insert(self, idx: int, values: list):
+        if idx == self.size:
+            self.extend(values)
+            return
+        tail = self.take(np.arange(idx, self.size))
+        self.size = idx
+        self.extend(values)
+        self.extend(tail.to_list())
+
+    def take(self, indices: np.ndarray) -> Column:
+        indices = np.asarray(indices, dtype=np.int64)
+        null = self.null[indices] if self._null is not None else None
+        return Column(
+            kind=self.kind, data=self.data[indices], size=len(indices),
+            null=null, categories=self.categories.copy()
+        )
+
+    def permute(self, order: np.ndarray):
+        result = self.take(order)
+        self._data, self._null = result._data, result._null
+
+    def delete(self, indices: np.ndarray):
+        keep = np.ones(self.size, dtype=np.bool_)
+        keep[indices] = False
+        result = self.take(np.flatnonzero(keep))
+        self._data, self._null, self.size = result._data, result._null, result.size
+
+    def copy(self) -> Column:
+        result = self.take(np.arange(self.size))
+        if self.kind == ColumnKinds.OBJECT:
+            result._data = object_array(self.to_list())
+        return result
+
+    def concat(self, other: Column) -> Column:
+        result = self.copy()
+        result.extend(other.to_list())
+        return result
+
+    def sort_keys(self) -> np.ndarray:
+        """
+        Returns an array that sorts the same way as the values in this column,
+        or None if the column can't be sorted without Python comparisons.
+        """
+        if self.has_nulls or self.kind == ColumnKinds.OBJECT:
+            return None
+        elif self.kind == ColumnKinds.CATEGORY:
+            ranks = np.empty(len(self.categories), dtype=np.int64)
+            ranks[np.argsort(object_array(self.categories))] = np.arange(len(self.categories))
+            return ranks[self.data]
+        else:
+            return self.data
+
+    def match(self, value) -> np.ndarray:
+        """
+        Vectorized equivalent of [val == value for val in self.to_list()].
+        Returns None when the comparison can't be done without Python-level equality.
+        """
+        if value is None:
+            if self.kind == ColumnKinds.CATEGORY:
+                return self.data < 0
+            elif self.kind == ColumnKinds.OBJECT:
+                return None
+            elif self._null is not None:
+                return self.null.copy()
+            else:
+                return np.zeros(self.size, dtype=np.bool_)
+        elif self.kind == ColumnKinds.CATEGORY:
+            if type(value) is not str:
+                return np.zeros(self.size, dtype=np.bool_)
+            code = self._category_codes.get(value, None)
+            if code is None:
+                return np.zeros(self.size, dtype=np.bool_)
+            return self.data == code
+        elif self.kind == ColumnKinds.OBJECT:
+            return None
+        elif ColumnKinds.of_value(value) in [ColumnKinds.BOOL, ColumnKinds.INT, ColumnKinds.FLOAT]:
+            result = self.data == value
+            if self._null is not None:
+                result &= ~self.null
+            return result
+        elif ColumnKinds.of_value(value) == ColumnKinds.CATEGORY:
+            return np.zeros(self.size, dtype=np.bool_)
+        else:
+            return None
+
+class ColumnarList(MutableSequence):
+    """
+    A list-like container that stores the constructor parameters of obj_type objects as columns.
+    Objects are only constructed when they are accessed, so a ColumnarList can be used anywhere
+    that a handler uses its obj_list.
+
+    Note that the objects returned by __getitem__ and __iter__ are new instances every time,
+    and that their non-scalar fields are copies of the stored values.
+    Modifying them does not modify the ColumnarList. Use __setitem__ to write changes back.
+    """
+    iter_chunk_size = 1024
+
+    def __init__(self, obj_type: type, columns: Dict[str, Column]=None):
+        self.obj_type = obj_type
+        self.params = obj_type.get_constructor_params()
+        if columns is None:
+            columns = {param: Column.from_values([]) for param in self.params}
+        self.columns = columns
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({list(self)})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.columns[self.params[0]]) if len(self.params) > 0 else 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    @classmethod
+    def from_objects(cls, obj_type: type, obj_list: list) -> ColumnarList:
+        params = obj_type.get_constructor_params()
+        columns = {
+            param: Column.from_values([getattr(obj, param) for obj in obj_list])
+            for param in params
+        }
+        return cls(obj_type=obj_type, columns=columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum([column.nbytes for column in self.columns.values()])
+
+    def _normalize_index(self, idx: int) -> int:
+        size = len(self)
+        if idx < 0:
+            idx += size
+        if idx < 0 or idx >= size:
+            logger.error(f'Index out of range: {idx}')
+            raise IndexError
+        return idx
+
+    def _build(self, idx: int):
+        return self.obj_type(**{param: column.get(idx) for param, column in self.columns.items()})
+
+    def _values_of(self, obj) -> list:
+        return [getattr(obj, param) for param in self.params]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self.take(np.arange(*idx.indices(len(self))))
+        return self._build(self._normalize_index(idx))
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            indices = range(*idx.indices(len(self)))
+            value = list(value)
+            if len(indices) == len(value):
+                for i, obj in zip(indices, value):
+                    self[i] = obj
+            elif idx.step is None or idx.step == 1:
+                del self[idx]
+                for param in self.params:
+                    self.columns[param].insert(indices.start, [getattr(obj, param) for obj in value])
+            else:
+                raise ValueError(f'attempt to assign sequence of size {len(value)} to extended slice of size {len(indices)}')
+        else:
+            idx = self._normalize_index(idx)
+            for param, val in zip(self.params, self._values_of(value)):
+                self.columns[param].set(idx, val)
+
+    def __delitem__(self, idx):
+        if isinstance(idx, slice):
+            indices = np.arange(*idx.indices(len(self)))
+        else:
+            indices = np.array([self._normalize_index(idx)])
+        for column in self.columns.values():
+            column.delete(indices)
+
+    def __iter__(self) -> Iterator:
+        obj_type, params = self.obj_type, self.params
+        for start in range(0, len(self), self.iter_chunk_size):
+            stop = min(start + self.iter_chunk_size, len(self))
+            chunk = [self.columns[param].to_list(start, stop) for param in params]
+            for values in zip(*chunk):
+                yield obj_type(**dict(zip(params, values)))
+
+    def __add__(self, other) -> ColumnarList:
+        result = self.copy()
+        result.extend(other)
+        return result
+
+    def __radd__(self, other) -> ColumnarList:
+        result = ColumnarList.from_objects(self.obj_type, list(other))
+        result.extend(self)
+        return result
+
+    def insert(self, idx: int, value):
+        idx = min(max(idx + len(self) if idx < 0 else idx, 0), len(self))
+        for param, val in zip(self.params, self._values_of(value)):
+            self.columns[param].insert(idx, [val])
+
+    def append(self, value):
+        for param, val in zip(self.params, self._values_of(value)):
+            self.columns[param].append(val)
+
+    def extend(self, values):
+        if isinstance(values, ColumnarList):
+            for param in self.params:
+                self.columns[param].extend(values.columns[param].to_list())
+        else:
+            values = list(values)
+            for param in self.params:
+                self.columns[param].extend([getattr(obj, param) for obj in values])
+
+    def take(self, indices) -> ColumnarList:
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        return ColumnarList(
+            obj_type=self.obj_type,
+            columns={param: column.take(indices) for param, column in self.columns.items()}
+        )
+
+    def copy(self) -> ColumnarList:
+        return ColumnarList(
+            obj_type=self.obj_type,
+            columns={param: column.copy() for param, column in self.columns.items()}
+        )
+
+    def permute(self, order):
+        order = np.asarray(order, dtype=np.int64)
+        for column in self.columns.values():
+            column.permute(order)
+
+    def reverse(self):
+        self.permute(np.arange(len(self))[::-1])
+
+    def shuffle(self):
+        order = list(range(len(self)))
+        random.shuffle(order)
+        self.permute(order)
+
+    def argsort_by(self, attr_name: str, reverse: bool=False) -> np.ndarray:
+        """
+        Stable argsort by a constructor parameter.
+        Equivalent to sorting with key=operator.attrgetter(attr_name).
+        """
+        column = self.columns[attr_name]
+        keys = column.sort_keys()
+        if keys is None:
+            values = column.to_list()
+            return np.array(sorted(range(len(values)), key=values.__getitem__, reverse=reverse), dtype=np.int64)
+        if not reverse:
+            return np.argsort(keys, kind='stable')
+        # Sort the reversed keys and reverse the result, so that ties keep their original order.
+        n = len(keys)
+        return (n - 1 - np.argsort(keys[::-1], kind='stable'))[::-1]
+
+    def sort(self, key=None, reverse: bool=False):
+        objs = list(self)
+        keys = [key(obj) for obj in objs] if key is not None else objs
+        self.permute(sorted(range(len(objs)), key=keys.__getitem__, reverse=reverse))
+
+    def column(self, attr_name: str) -> np.ndarray:
+        return self.columns[attr_name].to_numpy()
+
+    def where(self, **kwargs) -> np.ndarray:
+        """
+        Vectorized equivalent of the condition used by BasicLoadableHandler.get.
+        Returns the matching indices, or None if one of the conditions can't be vectorized.
+        """
+        mask = np.ones(len(self), dtype=np.bool_)
+        for key, val in kwargs.items():
+            if key not in self.columns:
+                return None
+            elif val is None:
+                continue
+            column = self.columns[key]
+            if isinstance(val, (list, tuple)):
+                if column.kind == ColumnKinds.OBJECT:
+                    return None
+                key_mask = np.zeros(len(self), dtype=np.bool_)
+                for val_part in val:
+                    part_mask = column.match(val_part)
+                    if part_mask is None:
+                        return None
+                    key_mask |= part_mask
+            else:
+                key_mask = column.match(val)
+                if key_mask is None:
+                    return None
+            mask &= key_mask
+        return np.flatnonzero(mask)
@@ -0,0 +1,283 @@
+from __future__ import annotations
+from typing import TypeVar, Generic, List, Dict, Tuple, Iterator
+from collections.abc import Mapping
+import numpy as np
+
+from logger import logger
+
+H = TypeVar('H')
+
+def _value_codes(values: list):
+    """
+    Codes of the distinct values in values, numbered in sorted order when the values can be sorted
+    and in order of first appearance otherwise.
+    """
+    try:
+        codes_of = dict.fromkeys(values)
+    except TypeError:
+        logger.error(f'Cannot group by unhashable values.')
+        raise
+    distinct_values = list(codes_of.keys())
+    for code, value in enumerate(distinct_values):
+        codes_of[value] = code
+    codes = np.fromiter(map(codes_of.__getitem__, values), dtype=np.int64, count=len(values))
+    try:
+        sorted_codes = sorted(range(len(distinct_values)), key=distinct_values.__getitem__)
+    except TypeError:
+        # e.g. None mixed with strings
+        return codes, len(distinct_values)
+    ranks = np.empty(len(distinct_values), dtype=np.int64)
+    ranks[sorted_codes] = np.arange(len(distinct_values))
+    return ranks[codes], len(distinct_values)
+
+def group_ids(value_lists: List[list]):
+    """
+    Assigns a group id to every position, so that positions with equal values in every list share a group.
+    Returns the group ids and the number of groups. Groups are numbered in the order of their keys.
+    """
+    # Codes are already dense group ids for the first list.
+    ids, num_groups = _value_codes(value_lists[0])
+    for values in value_lists[1:]:
+        codes, num_codes = _value_codes(values)
+        unique_ids, ids = np.unique(ids * num_codes + codes, return_inverse=True)
+        ids, num_groups = ids.reshape(-1), len(unique_ids)
+    return ids, num_groups
+
+def group_moments(ids: np.ndarray, values: np.ndarray, num_groups: int):
+    """
+    Count, mean, sum of squared deviations from the mean and sum of squares of values in every group.
+    Groups without values have a NaN mean.
+    """
+    counts = np.bincount(ids, minlength=num_groups)
+    sums = np.bincount(ids, weights=values, minlength=num_groups)
+    means = np.divide(sums, counts, out=np.full(num_groups, np.nan), where=counts > 0)
+    deviations = (values - means[ids])**2
+    m2 = np.bincount(ids, weights=deviations, minlength=num_groups)
+    sum_squares = np.bincount(ids, weights=values**2, minlength=num_groups)
+    return counts, means, m2, sum_squares
+
+def group_quantiles(ids: np.ndarray, values: np.ndarray, num_groups: int, q_list: List[float]) -> List[np.ndarray]:
+    """
+    The quantiles q_list (0 to 1) of values in every group, interpolated linearly as with np.percentile.
+    Returns one array per quantile. Groups without values get NaN.
+    """
+    # Sort by group then value once, and interpolate within each group.
+    # The order of equal values doesn't matter, so values are sorted with the faster unstable sort,
+    # and the stable sort by group can use a radix sort on small integers.
+    order = np.argsort(values)
+    group_keys = ids[order].astype(np.uint16) if num_groups <= np.iinfo(np.uint16).max else ids[order]
+    order = order[np.argsort(group_keys, kind='stable')]
+    sorted_values = values[order]
+    counts = np.bincount(ids, minlength=num_groups)
+    starts = np.cumsum(counts) - counts
+    has_values = counts > 0
+    results = []
+    for q in q_list:
+        rank = q * (counts[has_values] - 1)
+        lower = np.floor(rank).astype(np.int64)
+        upper = np.minimum(lower + 1, counts[has_values] - 1)
+        lower_values = sorted_values[starts[has_values] + lower]
+        upper_values = sorted_values[starts[has_values] + upper]
+        result = np.full(num_groups, np.nan)
+        result[has_values] = lower_values + (upper_values - lower_values) * (rank - lower)
+        results.append(result)
+    return results
+
+def histogram_edges(values: np.ndarray, bins=10, range: tuple=None) -> np.ndarray:
+    """Bin edges as with np.histogram. bins is either a number of bins or the edges themselves."""
+    if np.ndim(bins) == 1:
+        edges = np.asarray(bins, dtype=np.float64)
+        if len(edges) < 2 or np.any(np.diff(edges) < 0):
+            logger.error(f'Bin edges must be increasing and have at least 2 values. Got {bins}')
+            raise ValueError
+        return edges
+    return np.histogram_bin_edges(values, bins=bins, range=range)
+
+def group_histograms(ids: np.ndarray, values: np.ndarray, num_groups: int, edges: np.ndarray) -> np.ndarray:
+    """
+    Histogram of values in every group, as a (num_groups, len(edges) - 1) array of counts.
+    As with np.histogram, the last bin includes its right edge and values outside of the edges are ignored.
+    """
+    num_bins = len(edges) - 1
+    bin_ids = np.searchsorted(edges, values, side='right') - 1
+    bin_ids[values == edges[-1]] = num_bins - 1
+    inside = (bin_ids >= 0) & (bin_ids < num_bins)
+    counts = np.bincount(ids[inside] * num_bins + bin_ids[inside], minlength=num_groups * num_bins)
+    return counts.reshape(num_groups, num_bins)
+
+def percentile_name(q: float) -> str:
+    return f'p{q:g}'
+
+def check_percentiles(percentiles: List[float]):
+    for q in percentiles:
+        if q < 0 or q > 100:
+            logger.error(f'Percentiles must be between 0 and 100. Got {q}')
+            raise ValueError
+
+def summary_dicts(
+    counts: np.ndarray, means: np.ndarray, m2: np.ndarray, sum_squares: np.ndarray,
+    mins: np.ndarray, maxs: np.ndarray, quantiles: Dict[str, np.ndarray]=None
+) -> List[dict]:
+    """
+    One summary per group from the results of group_moments and the per-group minimums and maximums.
+    quantiles maps extra summary names (e.g. 'median' or 'p95') to their per-group values.
+    """
+    has_values = counts > 0
+    columns = {
+        'count': counts,
+        'mean': means,
+        'std': np.sqrt(np.divide(m2, counts, out=np.full(len(counts), np.nan), where=has_values)),
+        'rmse': np.sqrt(np.divide(sum_squares, counts, out=np.full(len(counts), np.nan), where=has_values)),
+        'min': np.where(has_values, mins, np.nan),
+        'max': np.where(has_values, maxs, np.nan)
+    }
+    columns.update(quantiles if quantiles is not None else {})
+    column_lists = {name: column.tolist() for name, column in columns.items()}
+    return [{name: column_lists[name][group] for name in columns} for group in range(len(counts))]
+
+class HandlerGroups(Mapping, Generic[H]):
+    """
+    The result of group_by: a mapping from key tuples to views of the objects that have that key.
+
+    Groups are computed in a single pass and only their positions are stored.
+    The views share the handler's objects (see BasicHandler.view).
+    Aggregations over a numeric attribute (count, sum, mean, std, min, max, median, percentile)
+    are computed for every group at once and returned as a dictionary with the same keys.
+    None values are skipped by the aggregations.
+
+    groups = predictions.group_by('model_name', 'frame')
+    for (model_name, frame), frame_predictions in groups.items():
+        ...
+    mean_scores = groups.mean('score')
+    """
+    def __init__(self, handler: H, attr_names: List[str], value_lists: List[list]):
+        self.handler = handler
+        self.attr_names = attr_names
+        if len(value_lists) > 0:
+            self._ids, num_groups = group_ids(value_lists)
+        else:
+            # A single group with the key () that contains every object.
+            self._ids, num_groups = np.zeros(len(handler), dtype=np.int64), min(len(handler), 1)
+        self._order = np.argsort(self._ids, kind='stable')
+        self._counts = np.bincount(self._ids, minlength=num_groups)
+        self._starts = np.cumsum(self._counts) - self._counts
+        first_positions = self._order[self._starts].tolist()
+        self._keys = [tuple([values[position] for values in value_lists]) for position in first_positions]
+        self._key_to_group = {key: group for group, key in enumerate(self._keys)}
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.attr_names}, num_groups={len(self)})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._key_to_group
+
+    def _group_of(self, key: tuple) -> int:
+        if key not in self._key_to_group:
+            logger.error(f'No group with key {key} for {self.attr_names}')
+            raise KeyError(key)
+        return self._key_to_group[key]
+
+    def positions(self, key: tuple) -> np.ndarray:
+        """Positions of the objects in the group, in their original order."""
+        group = self._group_of(key)
+        return self._order[self._starts[group]:self._starts[group] + self._counts[group]]
+
+    def __getitem__(self, key: tuple) -> H:
+        return self.handler.view(self.positions(key))
+
+    def _values(self, attr_name: str) -> np.ndarray:
+        # None is converted to NaN.
+        return np.array(self.handler._get_attr_values(attr_name), dtype=np.float64)
+
+    def _to_dict(self, result: np.ndarray) -> Dict[tuple, float]:
+        return dict(zip(self._keys, result.tolist()))
+
+    def count(self) -> Dict[tuple, int]:
+        return self._to_dict(self._counts)
+
+    def _sums(self, attr_name: str):
+        values = self._values(attr_name)
+        valid = ~np.isnan(values)
+        counts = np.bincount(self._ids[valid], minlength=len(self))
+        sums = np.bincount(self._ids[valid], weights=values[valid], minlength=len(self))
+        return values, valid, counts, sums
+
+    def sum(self, attr_name: str) -> Dict[tuple, float]:
+        return self._to_dict(self._sums(attr_name)[3])
+
+    def mean(self, attr_name: str) -> Dict[tuple, float]:
+        values, valid, counts, sums = self._sums(attr_name)
+        return self._to_dict(np.divide(sums, counts, out=np.full(len(self), np.nan), where=counts > 0))
+
+    def std(self, attr_name: str) -> Dict[tuple, float]:
+        """Population standard deviation, as with np.std."""
+        values, valid, counts, sums = self._sums(attr_name)
+        means = np.divide(sums, counts, out=np.full(len(self), np.nan), where=counts > 0)
+        deviations = (values[valid] - means[self._ids[valid]])**2
+        variances = np.bincount(self._ids[valid], weights=deviations, minlength=len(self))
+        return self._to_dict(np.sqrt(np.divide(variances, counts, out=np.full(len(self), np.nan), where=counts > 0)))
+
+    def _quantiles(self, attr_name: str, q: float) -> np.ndarray:
+        values = self._values(attr_name)
+        valid = ~np.isnan(values)
+        return group_quantiles(self._ids[valid], values[valid], len(self), [q])[0]
+
+    def percentile(self, attr_name: str, q: float) -> Dict[tuple, float]:
+        """The q-th percentile (0 to 100) of attr_name in every group."""
+        check_percentiles([q])
+        return self._to_dict(self._quantiles(attr_name, q / 100))
+
+    def median(self, attr_name: str) -> Dict[tuple, float]:
+        return self._to_dict(self._quantiles(attr_name, 0.5))
+
+    def min(self, attr_name: str) -> Dict[tuple, float]:
+        return self._to_dict(self._quantiles(attr_name, 0.0))
+
+    def max(self, attr_name: str) -> Dict[tuple, float]:
+        return self._to_dict(self._quantiles(attr_name, 1.0))
+
+    def rmse(self, attr_name: str) -> Dict[tuple, float]:
+        """Root mean square of attr_name in every group, e.g. the RMSE of signed errors."""
+        values, valid, counts, sums = self._sums(attr_name)
+        sum_squares = np.bincount(self._ids[valid], weights=values[valid]**2, minlength=len(self))
+        return self._to_dict(np.sqrt(np.divide(sum_squares, counts, out=np.full(len(self), np.nan), where=counts > 0)))
+
+    def histogram(self, attr_name: str, bins=10, range: tuple=None) -> Tuple[Dict[tuple, np.ndarray], np.ndarray]:
+        """
+        Histogram of attr_name in every group, with bin edges shared by all groups.
+        bins and range are interpreted as in np.histogram, over the values of every group.
+
+        Returns:
+            Tuple[Dict[tuple, np.ndarray], np.ndarray]: The counts of every group and the bin edges.
+        """
+        values = self._values(attr_name)
+        valid = ~np.isnan(values)
+        edges = histogram_edges(values[valid], bins=bins, range=range)
+        counts = group_histograms(self._ids[valid], values[valid], len(self), edges)
+        return dict(zip(self._keys, counts)), edges
+
+    def summary(self, attr_name: str, percentiles: List[float]=None) -> Dict[tuple, dict]:
+        """
+        count, mean, std, rmse, min, max and median of attr_name in every group, computed together.
+        Each percentile (0 to 100) in percentiles is added as 'p<q>', e.g. 'p95'.
+        """
+        percentiles = percentiles if percentiles is not None else []
+        check_percentiles(percentiles)
+        values = self._values(attr_name)
+        valid = ~np.isnan(values)
+        ids, values = self._ids[valid], values[valid]
+        counts, means, m2, sum_squares = group_moments(ids, values, len(self))
+        q_list = [0.0, 1.0, 0.5] + [q / 100 for q in percentiles]
+        mins, maxs, medians, *percentile_values = group_quantiles(ids, values, len(self), q_list)
+        quantiles = {'median': medians}
+        quantiles.update({percentile_name(q): result for q, result in zip(percentiles, percentile_values)})
+        return dict(zip(self._keys, summary_dicts(counts, means, m2, sum_squares, mins, maxs, quantiles)))
@@ -0,0 +1,286 @@
+from __future__ import annotations
+from typing import List, Dict
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+from collections import Counter
+import heapq
+import numpy as np
+
+class IndexKinds:
+    HASH = 'hash'
+    SORTED = 'sorted'
+
+    @classmethod
+    def get_all(cls) -> List[str]:
+        return [cls.HASH, cls.SORTED]
+
+def intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Intersection of two sorted arrays of unique positions.
+    Costs O(len(small) * log(len(large))), so it is cheap when one side is small.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return a
+    idx = np.searchsorted(b, a).clip(max=len(b) - 1)
+    return a[b[idx] == a]
+
+class HandlerIndex:
+    """
+    Base class for secondary indexes over one attribute of the objects in a handler.
+    An index maps attribute values to object positions in the handler.
+
+    An index is either valid or invalid. Invalid indexes are rebuilt from the handler
+    the next time they are queried. Mutations that shift positions simply invalidate the index.
+    If the attribute values can't be indexed (e.g. unhashable values in a hash index),
+    the index is marked as unusable and queries fall back to scanning the handler.
+    """
+    kind = None
+
+    def __init__(self, attr_name: str):
+        self.attr_name = attr_name
+        self.size = 0
+        self.valid = False
+        self.usable = True
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.attr_name})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def build(self, values: list):
+        raise NotImplementedError
+
+    def invalidate(self):
+        self.valid = False
+
+    def append(self, idx: int, value):
+        raise NotImplementedError
+
+    def replace(self, idx: int, old_value, new_value):
+        raise NotImplementedError
+
+    def lookup(self, value) -> np.ndarray:
+        """Sorted positions whose value is equal to value, or None if value can't be looked up."""
+        raise NotImplementedError
+
+    def lookup_range(self, min_val=None, max_val=None) -> np.ndarray:
+        """Sorted positions whose value v satisfies min_val <= v <= max_val, or None if not supported."""
+        return None
+
+class HashIndex(HandlerIndex):
+    """
+    Hash index for equality and list-membership queries.
+    """
+    kind = IndexKinds.HASH
+
+    def __init__(self, attr_name: str):
+        super().__init__(attr_name=attr_name)
+        self.positions = {}
+        self._arrays = {}
+
+    def build(self, values: list):
+        self.usable = True
+        self._arrays = {}
+        positions = {}
+        try:
+            for i, value in enumerate(values):
+                if value in positions:
+                    positions[value].append(i)
+                else:
+                    positions[value] = [i]
+        except TypeError:
+            # Unhashable value
+            self.usable = False
+            positions = {}
+        self.positions = positions
+        self.size = len(values)
+        self.valid = True
+
+    def append(self, idx: int, value):
+        try:
+            if value in self.positions:
+                self.positions[value].append(idx)
+            else:
+                self.positions[value] = [idx]
+            self._arrays.pop(value, None)
+            self.size += 1
+        except TypeError:
+            self.invalidate()
+
+    def replace(self, idx: int, old_value, new_value):
+        try:
+            self._arrays.pop(old_value, None)
+            self._arrays.pop(new_value, None)
+            old_positions = self.positions[old_value]
+            old_positions.remove(idx)
+            if len(old_positions) == 0:
+                del self.positions[old_value]
+            if new_value in self.positions:
+                insort(self.positions[new_value], idx)
+            else:
+                self.positions[new_value] = [idx]
+        except (TypeError, KeyError, ValueError):
+            self.invalidate()
+
+    def lookup(self, value) -> np.ndarray:
+        try:
+            positions = self._arrays.get(value, None)
+            if positions is None:
+                positions = np.array(self.positions.get(value, []), dtype=np.int64)
+                if value in self.positions:
+                    positions.flags.writeable = False
+                    self._arrays[value] = positions
+        except TypeError:
+            return None
+        return positions
+
+class SortedIndex(HandlerIndex):
+    """
+    Sorted index for range queries. It can also answer equality queries.
+    None values are left out of the index, since they can't be compared.
+    Appended values are buffered and merged into the index on the next query.
+    """
+    kind = IndexKinds.SORTED
+
+    def __init__(self, attr_name: str):
+        super().__init__(attr_name=attr_name)
+        self.keys = []
+        self.order = []
+        self.pending = []
+
+    def build(self, values: list):
+        self.usable = True
+        order = [i for i, value in enumerate(values) if value is not None]
+        try:
+            order.sort(key=values.__getitem__)
+        except TypeError:
+            # Values that can't be compared with each other
+            self.usable = False
+            order = []
+        self.keys = [values[i] for i in order]
+        self.order = order
+        self.pending = []
+        self.size = len(values)
+        self.valid = True
+
+    def append(self, idx: int, value):
+        self.pending.append((idx, value))
+        self.size += 1
+
+    def replace(self, idx: int, old_value, new_value):
+        self.invalidate()
+
+    def _merge_pending(self) -> bool:
+        if len(self.pending) == 0:
+            return True
+        try:
+            pending = sorted([(value, idx) for idx, value in self.pending if value is not None], key=itemgetter(0))
+            merged = list(heapq.merge(zip(self.keys, self.order), pending, key=itemgetter(0)))
+        except TypeError:
+            self.usable = False
+            return False
+        self.keys = [value for value, idx in merged]
+        self.order = [idx for value, idx in merged]
+        self.pending = []
+        return True
+
+    def _positions(self, lo: int, hi: int) -> np.ndarray:
+        return np.sort(np.array(self.order[lo:hi], dtype=np.int64))
+
+    def lookup(self, value) -> np.ndarray:
+        if value is None or not self._merge_pending():
+            return None
+        try:
+            return self._positions(bisect_left(self.keys, value), bisect_right(self.keys, value))
+        except TypeError:
+            return None
+
+    def lookup_range(self, min_val=None, max_val=None) -> np.ndarray:
+        if not self._merge_pending():
+            return None
+        try:
+            lo = bisect_left(self.keys, min_val) if min_val is not None else 0
+            hi = bisect_right(self.keys, max_val) if max_val is not None else len(self.keys)
+        except TypeError:
+            return None
+        return self._positions(lo, max(lo, hi))
+
+class DistinctValues:
+    """
+    Reference-counted set of the distinct values of one attribute of the objects in a handler.
+
+    Unlike a HandlerIndex, it doesn't store positions, so reordering the handler doesn't affect it
+    and deleting an object only decrements the count of its value.
+    The sorted list of values is cached until a value is added or its count drops to zero.
+    """
+    def __init__(self, attr_name: str):
+        self.attr_name = attr_name
+        self.counts = Counter()
+        self.size = 0
+        self.valid = False
+        self._sorted_values = None
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.attr_name})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, value) -> bool:
+        return value in self.counts
+
+    def build(self, values: list):
+        # Unhashable values raise a TypeError and leave the set invalid.
+        self.valid = False
+        self.counts = Counter(values)
+        self.size = len(values)
+        self.valid = True
+        self._sorted_values = None
+
+    def invalidate(self):
+        self.valid = False
+        self._sorted_values = None
+
+    def add(self, value):
+        try:
+            count = self.counts.get(value, 0)
+        except TypeError:
+            self.invalidate()
+            return
+        if count == 0:
+            self._sorted_values = None
+        self.counts[value] = count + 1
+        self.size += 1
+
+    def remove(self, value):
+        try:
+            count = self.counts[value]
+        except TypeError:
+            self.invalidate()
+            return
+        if count <= 1:
+            if count == 0:
+                self.invalidate()
+                return
+            del self.counts[value]
+            self._sorted_values = None
+        else:
+            self.counts[value] = count - 1
+        self.size -= 1
+
+    def sorted_values(self) -> list:
+        """The distinct values in sorted order. The returned list is cached and must not be modified."""
+        if self._sorted_values is None:
+            self._sorted_values = sorted(self.counts.keys())
+        return self._sorted_values
+
+index_classes: Dict[str, type] = {
+    IndexKinds.HASH: HashIndex,
+    IndexKinds.SORTED: SortedIndex
+}
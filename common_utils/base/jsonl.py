@@ -0,0 +1,75 @@
+from __future__ import annotations
+from typing import Iterator, Iterable
+import json
+
+from logger import logger
+from ..check_utils import check_file_exists
+from ..file_utils import file_exists
+from ..constants.number_constants import jsonable_types
+from .serialization import json_loads
+
+def iter_jsonl(path: str, backend: str=None) -> Iterator[dict]:
+    """
+    Yields the item of each non-empty line of a JSON Lines file.
+    Only one line is held in memory at a time.
+    """
+    check_file_exists(path)
+    with open(path, 'r') as f:
+        for line_num, line in enumerate(f):
+            if line.strip() == '':
+                continue
+            try:
+                item = json_loads(line, backend=backend)
+            except json.JSONDecodeError:
+                logger.error(f'Failed to parse line {line_num} of {path}')
+                raise
+            yield item
+
+class JsonlWriter:
+    """
+    Writes items to a JSON Lines file one record at a time.
+
+    Items can be dictionaries or objects with a to_dict method (e.g. BasicLoadableObject).
+    Use it as a context manager so that the file is closed when writing is done.
+
+    with JsonlWriter('predictions.jsonl') as writer:
+        for datum in data:
+            writer.write(datum)
+    """
+    def __init__(self, path: str, overwrite: bool=False, append: bool=False):
+        if file_exists(path) and not overwrite and not append:
+            logger.error(f'File already exists at path: {path}')
+            raise Exception
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'a' if append else 'w')
+
+    def __enter__(self) -> JsonlWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    @staticmethod
+    def to_line(item) -> str:
+        item_dict = item if isinstance(item, tuple(jsonable_types)) else item.to_dict()
+        return json.dumps(item_dict, ensure_ascii=False) + '\n'
+
+    def write(self, item):
+        self._file.write(self.to_line(item))
+        self.count += 1
+
+    def write_all(self, items: Iterable):
+        for item in items:
+            self.write(item)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
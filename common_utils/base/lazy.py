@@ -0,0 +1,187 @@
+from __future__ import annotations
+from typing import TypeVar, Generic, List, Iterator
+import os
+import mmap
+import numpy as np
+
+from logger import logger
+from ..check_utils import check_file_exists, check_issubclass
+from ..path_utils import get_extension_from_path
+from .basic import BasicLoadableHandler
+from .serialization import json_loads
+
+T = TypeVar('T')
+H = TypeVar('H')
+
+whitespace_bytes = np.array([ord(char) for char in ' \t\r\x0b\x0c'], dtype=np.uint8)
+
+class LazyHandler(Generic[H, T]):
+    """
+    Read-only view of a .jsonl file saved by a BasicLoadableHandler.
+
+    The file is memory-mapped and only an index of line offsets is read when the view is opened.
+    Records are parsed and converted with handler_cls.from_dict_list when they are accessed,
+    so memory usage depends on what is accessed rather than on the size of the file.
+
+    The offset index is cached next to the file (path + '.idx.npy') and reused as long as the file's
+    size and modification time don't change. Without a cached index, the file is scanned for line breaks.
+
+    with LazyHandler('predictions.jsonl', handler_cls=PredictionList) as lazy:
+        first = lazy[0]
+        subset = lazy.get(model_name='model_0')
+    """
+    def __init__(
+        self, path: str, handler_cls: type, cache_index: bool=True,
+        chunk_size: int=1000, backend: str=None
+    ):
+        check_file_exists(path)
+        check_issubclass(handler_cls, valid_parent_class_list=[BasicLoadableHandler])
+        extension = get_extension_from_path(path)
+        if extension != 'jsonl':
+            logger.error(f'LazyHandler only supports .jsonl files. path: {path}')
+            raise ValueError
+        self.path = path
+        self.handler_cls = handler_cls
+        self.chunk_size = chunk_size
+        self.backend = backend
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size > 0 else None
+        self.starts, self.ends = self._load_index(stat, cache_index=cache_index)
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.handler_cls.__name__}, path={self.path}, len={len(self)})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __enter__(self) -> LazyHandler[H, T]:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    @property
+    def index_path(self) -> str:
+        return f'{self.path}.idx.npy'
+
+    def _scan_lines(self, size: int, chunk_bytes: int=1 << 26):
+        """Start and end offsets of every non-blank line."""
+        if self._mmap is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        newlines = []
+        for offset in range(0, size, chunk_bytes):
+            chunk = np.frombuffer(self._mmap, dtype=np.uint8, count=min(chunk_bytes, size - offset), offset=offset)
+            newlines.append(np.flatnonzero(chunk == ord('\n')).astype(np.int64) + offset)
+            del chunk
+        newlines = np.concatenate(newlines)
+        starts = np.concatenate([np.zeros(1, dtype=np.int64), newlines + 1])
+        ends = np.concatenate([newlines, np.array([size], dtype=np.int64)])
+        keep = ends > starts
+        # Lines that start with whitespace may be blank.
+        data = np.frombuffer(self._mmap, dtype=np.uint8)
+        first_bytes = data[np.minimum(starts, size - 1)]
+        del data
+        for i in np.flatnonzero(keep & np.isin(first_bytes, whitespace_bytes)).tolist():
+            if self._mmap[starts[i]:ends[i]].strip() == b'':
+                keep[i] = False
+        return starts[keep], ends[keep]
+
+    def _load_index(self, stat: os.stat_result, cache_index: bool):
+        if cache_index and os.path.isfile(self.index_path):
+            index = np.load(self.index_path, mmap_mode='r')
+            if len(index) >= 2 and index[0] == stat.st_size and index[1] == stat.st_mtime_ns:
+                num_lines = (len(index) - 2) // 2
+                return index[2:2 + num_lines], index[2 + num_lines:]
+        starts, ends = self._scan_lines(stat.st_size)
+        if cache_index:
+            index = np.concatenate([np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64), starts, ends])
+            try:
+                np.save(self.index_path, index)
+            except OSError:
+                logger.warning(f'Failed to save the offset index to {self.index_path}')
+        return starts, ends
+
+    def _normalize_index(self, idx: int) -> int:
+        if idx < -len(self) or idx >= len(self):
+            logger.error(f'Index out of range: {idx}')
+            raise IndexError
+        return idx if idx >= 0 else idx + len(self)
+
+    def get_dict(self, idx: int) -> dict:
+        """The parsed record at idx, without converting it into an object."""
+        idx = self._normalize_index(idx)
+        return json_loads(self._mmap[self.starts[idx]:self.ends[idx]].decode('utf-8'), backend=self.backend)
+
+    def _load(self, indices: List[int]) -> H:
+        return self.handler_cls.from_dict_list([self.get_dict(idx) for idx in indices])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (int, np.integer)):
+            return self._load([int(idx)])[0]
+        elif isinstance(idx, slice):
+            return self._load(range(len(self))[idx])
+        elif isinstance(idx, (list, np.ndarray)):
+            indices = np.asarray(idx)
+            if indices.dtype == np.bool_:
+                if len(indices) != len(self):
+                    logger.error(f'Boolean mask has length {len(indices)}, but {len(self)} was expected.')
+                    raise IndexError
+                indices = np.flatnonzero(indices)
+            return self._load(indices.tolist())
+        else:
+            logger.error(f'Expected int, slice, list or np.ndarray. Got {type(idx)}')
+            raise TypeError
+
+    def iter_dicts(self) -> Iterator[dict]:
+        for idx in range(len(self)):
+            yield self.get_dict(idx)
+
+    def iter_chunks(self) -> Iterator[H]:
+        """Yields consecutive records as handlers of at most chunk_size objects."""
+        for start in range(0, len(self), self.chunk_size):
+            yield self._load(range(start, min(start + self.chunk_size, len(self))))
+
+    def __iter__(self) -> Iterator[T]:
+        for chunk in self.iter_chunks():
+            for obj in chunk:
+                yield obj
+
+    def get_indices(self, **kwargs) -> np.ndarray:
+        """Positions of the records that BasicLoadableHandler.get would return."""
+        indices = [np.empty(0, dtype=np.int64)]
+        for i, chunk in enumerate(self.iter_chunks()):
+            indices.append(np.asarray(chunk.get_indices(**kwargs), dtype=np.int64) + i * self.chunk_size)
+        return np.concatenate(indices)
+
+    def get(self, **kwargs) -> H:
+        """
+        Same as BasicLoadableHandler.get, but records are loaded chunk by chunk
+        and only the matching objects are kept.
+        """
+        result = self.handler_cls()
+        for chunk in self.iter_chunks():
+            matches = chunk.get(**kwargs)
+            if len(matches) > 0:
+                result.extend(list(matches))
+        return result
+
+    def column(self, key: str) -> list:
+        """
+        The values of one field of every record, read from the parsed records without constructing objects.
+        Records that don't have the field give None.
+        """
+        return [item_dict.get(key, None) for item_dict in self.iter_dicts()]
+
+    def to_handler(self) -> H:
+        """Loads every record."""
+        return self._load(range(len(self)))
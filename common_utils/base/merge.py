@@ -0,0 +1,144 @@
+from __future__ import annotations
+from typing import List, Iterator, Iterable
+import os
+import heapq
+import tempfile
+from itertools import islice, count
+
+from logger import logger
+from ..check_utils import check_file_exists, check_value
+from ..path_utils import get_extension_from_path
+from .jsonl import JsonlWriter, iter_jsonl
+from .serialization import load_data
+from .binary import load_npz
+
+default_key_attrs = ['test_name', 'frame', 'model_name']
+
+def iter_records(path: str, backend: str=None) -> Iterator[dict]:
+    """
+    Yields the records of a file saved with save_to_path.
+    .jsonl files are streamed. Other formats have to be loaded in full.
+    """
+    check_file_exists(path)
+    extension = get_extension_from_path(path)
+    if extension == 'jsonl':
+        yield from iter_jsonl(path, backend=backend)
+    elif extension in ['json', 'yaml']:
+        yield from load_data(path, extension=extension, backend=backend)
+    elif extension == 'npz':
+        yield from load_npz(path)
+    else:
+        logger.error(f'Invalid extension: {extension}. Expected .json, .yaml, .jsonl or .npz.')
+        raise ValueError
+
+def _sort_key(key_attrs: List[str]):
+    # None sorts before every other value instead of raising a TypeError.
+    def key(item: dict) -> tuple:
+        return tuple([(item.get(attr_name) is not None, item.get(attr_name)) for attr_name in key_attrs])
+    return key
+
+def _write_run(items: List[dict], tmp_dir: str, run_idx: int) -> str:
+    path = os.path.join(tmp_dir, f'run-{run_idx:06d}.jsonl')
+    with JsonlWriter(path) as writer:
+        writer.write_all(items)
+    return path
+
+def _merge_runs(run_iters: List[Iterable[dict]], key) -> Iterator[dict]:
+    # heapq.merge is stable, so records with equal keys keep the order of run_iters.
+    return heapq.merge(*run_iters, key=key)
+
+def merge_prediction_dumps(
+    input_paths: List[str], output_path: str, key_attrs: List[str]=None,
+    presorted: bool=False, keep: str='first', chunk_size: int=100000,
+    max_open_files: int=256, overwrite: bool=False, backend: str=None, tmp_dir: str=None
+) -> int:
+    """
+    Merges prediction dumps (e.g. one per inference worker) into a single .jsonl file,
+    keeping one record per (test_name, frame, model_name).
+
+    The records are merged without loading the inputs into memory: each input is read in chunks of
+    chunk_size records, every chunk is sorted and written to a temporary file, and the sorted files
+    are merged one record at a time. Inputs that are already sorted by key_attrs can be merged
+    directly with presorted=True. Only .jsonl inputs are streamed. Other formats are loaded one file at a time.
+
+    The output is sorted by key_attrs, with None before any other value.
+    It can be loaded with load_from_path or iter_from_path of the matching handler.
+
+    Args:
+        input_paths (List[str]): The files to merge.
+        output_path (str): The .jsonl file to write.
+        key_attrs (List[str], optional): The fields that identify a record.
+                Defaults to ['test_name', 'frame', 'model_name'].
+        presorted (bool, optional): Whether every input is already sorted by key_attrs. Defaults to False.
+        keep (str, optional): 'first' keeps the first record of each key, in the order of input_paths
+                and then of the records in each file. 'last' keeps the last one. Defaults to 'first'.
+        chunk_size (int, optional): The number of records that are sorted in memory at a time. Defaults to 100000.
+        max_open_files (int, optional): The number of sorted files that are merged at once. Defaults to 256.
+
+    Returns:
+        int: The number of records that were written.
+    """
+    check_value(keep, valid_value_list=['first', 'last'])
+    if max_open_files < 2:
+        logger.error(f'max_open_files must be at least 2. Got {max_open_files}')
+        raise ValueError
+    if get_extension_from_path(output_path) != 'jsonl':
+        logger.error(f'The output of a merge must be a .jsonl file. output_path: {output_path}')
+        raise ValueError
+    if os.path.abspath(output_path) in [os.path.abspath(path) for path in input_paths]:
+        logger.error(f'output_path is also an input: {output_path}')
+        raise ValueError
+    key_attrs = key_attrs if key_attrs is not None else default_key_attrs
+    key = _sort_key(key_attrs)
+    for path in input_paths:
+        check_file_exists(path)
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        if presorted:
+            run_iters = [iter_records(path, backend=backend) for path in input_paths]
+        else:
+            run_paths = []
+            run_ids = count()
+            for path in input_paths:
+                records = iter_records(path, backend=backend)
+                while True:
+                    chunk = list(islice(records, chunk_size))
+                    if len(chunk) == 0:
+                        break
+                    try:
+                        chunk.sort(key=key)
+                    except TypeError:
+                        logger.error(f'The values of {key_attrs} in {path} can not be compared with each other.')
+                        raise
+                    run_paths.append(_write_run(chunk, run_dir, next(run_ids)))
+            # Merge groups of runs until they can all be opened at once.
+            while len(run_paths) > max_open_files:
+                merged_paths = []
+                for start in range(0, len(run_paths), max_open_files):
+                    group = [iter_jsonl(run_path) for run_path in run_paths[start:start + max_open_files]]
+                    merged_paths.append(_write_run(_merge_runs(group, key), run_dir, next(run_ids)))
+                for run_path in run_paths:
+                    os.remove(run_path)
+                run_paths = merged_paths
+            run_iters = [iter_jsonl(run_path) for run_path in run_paths]
+
+        num_written = 0
+        with JsonlWriter(output_path, overwrite=overwrite) as writer:
+            pending, pending_key = None, None
+            for item in _merge_runs(run_iters, key):
+                item_key = key(item)
+                if pending is not None and item_key == pending_key:
+                    if keep == 'last':
+                        pending = item
+                    continue
+                elif pending is not None:
+                    if presorted and item_key < pending_key:
+                        logger.error(f'The inputs are not sorted by {key_attrs}. Use presorted=False.')
+                        raise ValueError
+                    writer.write(pending)
+                    num_written += 1
+                pending, pending_key = item, item_key
+            if pending is not None:
+                writer.write(pending)
+                num_written += 1
+    return num_written
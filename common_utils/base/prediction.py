@@ -1,6 +1,20 @@
 from __future__ import annotations
-from typing import TypeVar, List
+from typing import TypeVar, List, Dict, Set, Tuple, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import os
+import time
+import queue
+import threading
+import numpy as np
+
+from logger import logger
+from ..file_utils import file_exists
+from ..path_utils import get_extension_from_path
 from .basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from .jsonl import JsonlWriter, iter_jsonl
+from .groups import HandlerGroups
+from .stats import StreamingGroupStats
 
 T = TypeVar('T')
 H = TypeVar('H')
@@ -47,22 +61,209 @@ class PredictionData(
     
     @property
     def frames(self) -> List[str]:
-        frames = list(set([datum.frame for datum in self]))
+        # Counted on every read, since the objects can be modified in place. See distinct_values.
+        frames = list(set(self._get_attr_values('frame')))
         frames.sort()
         return frames
 
     @property
     def test_names(self) -> List[str]:
-        test_names = list(set([datum.test_name for datum in self]))
+        test_names = list(set(self._get_attr_values('test_name')))
         test_names.sort()
         return test_names
 
     @property
     def model_names(self) -> List[str]:
-        model_names = list(set([datum.model_name for datum in self]))
+        model_names = list(set(self._get_attr_values('model_name')))
         model_names.sort()
         return model_names
 
+class PredictionWriter:
+    """
+    Append-only .jsonl log of PredictionDatum records for long inference runs.
+
+    Records are written as they arrive instead of being kept in memory until the end,
+    and the file can be read with PredictionData.load_from_path (or iter_from_path) at any time.
+    Records are buffered in batches of batch_size lines, and the file is flushed after every batch.
+    It is fsynced at most every fsync_interval seconds, and on flush and close.
+    With background=True, batches are written by a separate thread, so write only serializes the record.
+
+    Every record is a single line, so a crash can only leave an incomplete last line.
+    Records that were still buffered are lost and have to be predicted again.
+    With resume=True, the incomplete line is removed and the (test_name, frame, model_name) keys
+    of the records that were written are loaded, so that the run can skip them.
+
+    with PredictionWriter('predictions.jsonl', resume=True) as writer:
+        for frame in frames:
+            if writer.is_processed(test_name=test_name, frame=frame, model_name=model_name):
+                continue
+            writer.write(predict(frame))
+    """
+    key_attrs = ['test_name', 'frame', 'model_name']
+
+    def __init__(
+        self, path: str, resume: bool=False, overwrite: bool=False,
+        batch_size: int=1000, fsync_interval: float=1.0, background: bool=True
+    ):
+        if get_extension_from_path(path) != 'jsonl':
+            logger.error(f'PredictionWriter only supports .jsonl files. path: {path}')
+            raise ValueError
+        if file_exists(path) and not resume and not overwrite:
+            logger.error(f'File already exists at path: {path}')
+            raise Exception
+        self.path = path
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self.processed: Set[Tuple[str, str, str]] = set()
+        self.num_resumed = 0
+        if resume and file_exists(path):
+            self._recover()
+        self._file = open(path, 'a' if resume else 'w')
+        self._last_fsync = time.monotonic()
+        self._buffer = []
+        self._error = None
+        self._closed = False
+        if background:
+            self._queue = queue.Queue(maxsize=4)
+            self._thread = threading.Thread(target=self._run, name=f'PredictionWriter({path})', daemon=True)
+            self._thread.start()
+        else:
+            self._queue = None
+            self._thread = None
+
+    def __enter__(self) -> PredictionWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @classmethod
+    def _key_of(cls, item) -> Tuple[str, str, str]:
+        if isinstance(item, dict):
+            return tuple([item.get(attr_name, None) for attr_name in cls.key_attrs])
+        return tuple([getattr(item, attr_name, None) for attr_name in cls.key_attrs])
+
+    def _recover(self):
+        """Removes an incomplete last line and loads the keys of the records that were already written."""
+        with open(self.path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            valid_size, end = 0, size
+            while end > 0:
+                start = max(0, end - (1 << 16))
+                f.seek(start)
+                last_newline = f.read(end - start).rfind(b'\n')
+                if last_newline != -1:
+                    valid_size = start + last_newline + 1
+                    break
+                end = start
+            if valid_size < size:
+                logger.warning(f'Removing an incomplete record ({size - valid_size} bytes) at the end of {self.path}')
+                f.truncate(valid_size)
+        for item_dict in iter_jsonl(self.path):
+            self.processed.add(self._key_of(item_dict))
+            self.num_resumed += 1
+        logger.info(f'Resuming {self.path}: {self.num_resumed} records were already written.')
+
+    def is_processed(self, test_name: str=None, frame: str=None, model_name: str=None) -> bool:
+        """Whether a record with this test_name, frame and model_name was written, in this run or a previous one."""
+        return (test_name, frame, model_name) in self.processed
+
+    def processed_frames(self, test_name: str=None, model_name: str=None) -> List[str]:
+        """The sorted frames that have a record for test_name and model_name."""
+        return sorted(set([
+            key[1] for key in self.processed
+            if key[0] == test_name and key[2] == model_name
+        ]))
+
+    def _raise_error(self):
+        if self._error is not None:
+            logger.error(f'Failed to write to {self.path}')
+            raise self._error
+
+    def _write_lines(self, lines: List[str]):
+        self._file.write(''.join(lines))
+        self._file.flush()
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _run(self):
+        dirty = False
+        while True:
+            try:
+                lines = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                if dirty and self._error is None:
+                    self._fsync()
+                    dirty = False
+                continue
+            try:
+                if lines is not None and self._error is None:
+                    self._write_lines(lines)
+                    dirty = True
+            except Exception as e:
+                # Reported by the next call to write, flush or close.
+                self._error = e
+            finally:
+                self._queue.task_done()
+            if lines is None:
+                break
+
+    def _write_buffer(self):
+        if len(self._buffer) == 0:
+            return
+        if self._queue is not None:
+            self._queue.put(self._buffer)
+        else:
+            self._write_lines(self._buffer)
+        self._buffer = []
+
+    def write(self, item):
+        """Writes a PredictionDatum (or any object with to_dict, or a dictionary)."""
+        if self._closed:
+            logger.error(f'PredictionWriter for {self.path} is closed.')
+            raise ValueError
+        self._raise_error()
+        self._buffer.append(JsonlWriter.to_line(item))
+        if len(self._buffer) >= self.batch_size:
+            self._write_buffer()
+        self.processed.add(self._key_of(item))
+        self.count += 1
+
+    def write_all(self, items: Iterable):
+        for item in items:
+            self.write(item)
+
+    def flush(self):
+        """Waits until every record has been written and fsyncs the file."""
+        self._write_buffer()
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_error()
+        self._fsync()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._write_buffer()
+            if self._queue is not None:
+                self._queue.put(None)
+                self._thread.join()
+            self._raise_error()
+            self._fsync()
+        finally:
+            self._file.close()
+
 class GTDatum(BasicLoadableObject[T]):
     def __init__(self, test_name: str=None, frame: str=None):
         """Base class representing the data of a single GT.
@@ -94,13 +295,13 @@ class GTData(
     
     @property
     def frames(self) -> List[str]:
-        frames = list(set([datum.frame for datum in self]))
+        frames = list(set(self._get_attr_values('frame')))
         frames.sort()
         return frames
 
     @property
     def test_names(self) -> List[str]:
-        test_names = list(set([datum.test_name for datum in self]))
+        test_names = list(set(self._get_attr_values('test_name')))
         test_names.sort()
         return test_names
 
@@ -116,6 +317,14 @@ class GTData(
 #         self.dt = dt
 #         self.gt = gt
 
+def from_gtdt_job(obj_type: type, job: tuple, kwargs: dict):
+    # Module level so that it can be sent to worker processes.
+    gt_datum, dt_datum, fallback_model_name = job
+    if dt_datum is not None:
+        return obj_type.from_gtdt(gt=gt_datum, dt=dt_datum, **kwargs)
+    else:
+        return obj_type.from_gtdt(gt=gt_datum, dt=None, fallback_model_name=fallback_model_name, **kwargs)
+
 class HybridDatum(BasicLoadableObject[T]):
     """TODO: Write docstring"""
     def __init__(self, frame: str=None, test_name: str=None, model_name: str=None):
@@ -138,28 +347,73 @@ class HybridData(
     
     @property
     def frames(self) -> List[str]:
-        frames = list(set([datum.frame for datum in self]))
+        frames = list(set(self._get_attr_values('frame')))
         frames.sort()
         return frames
 
     @property
     def test_names(self) -> List[str]:
-        test_names = list(set([datum.test_name for datum in self]))
+        test_names = list(set(self._get_attr_values('test_name')))
         test_names.sort()
         return test_names
 
     @property
     def model_names(self) -> List[str]:
-        model_names = list(set([datum.model_name for datum in self]))
+        model_names = list(set(self._get_attr_values('model_name')))
         model_names.sort()
         return model_names
 
+    def _groups(self: H, by: List[str]) -> HandlerGroups[H]:
+        by = list(by) if by is not None else []
+        return self.group_by(*by) if len(by) > 0 else HandlerGroups(self, attr_names=[], value_lists=[])
+
+    def summarize(self: H, attr_name: str, by: List[str]=['model_name'], percentiles: List[float]=None) -> Dict[tuple, dict]:
+        """
+        count, mean, std, rmse, min, max, median and the given percentiles of a numeric attribute
+        (e.g. an error), grouped by some of model_name, test_name and frame.
+        None values (e.g. frames without a prediction) are skipped. Groups with only None values get a count of 0 and NaN statistics.
+
+        error.summarize('error', by=['model_name'], percentiles=[95])
+        -> {('model_0',): {'count': 30, 'mean': ..., 'std': ..., 'rmse': ..., 'min': ..., 'max': ..., 'median': ..., 'p95': ...}, ...}
+
+        Args:
+            attr_name (str): The numeric attribute to summarize.
+            by (List[str], optional): The attributes to group by. None or [] gives a single group with the key ().
+                    Defaults to ['model_name'].
+            percentiles (List[float], optional): Percentiles (0 to 100) to add as 'p<q>'. Defaults to None.
+        """
+        return self._groups(by).summary(attr_name, percentiles=percentiles)
+
+    def histogram(self: H, attr_name: str, by: List[str]=['model_name'], bins=10, range: tuple=None) -> Tuple[Dict[tuple, np.ndarray], np.ndarray]:
+        """Histograms of a numeric attribute per group, with shared bin edges. See HandlerGroups.histogram."""
+        return self._groups(by).histogram(attr_name, bins=bins, range=range)
+
     @classmethod
-    def from_gtdt(cls, gt: GTData, dt: PredictionData, obj_type: type, **kwargs) -> H:
-        assert hasattr(obj_type, 'from_gtdt')
+    def stats_from_path(
+        cls, path: str, attr_name: str, by: List[str]=['model_name'], percentiles: List[float]=None,
+        exact_quantiles: bool=True, bins=None, range: tuple=None, chunk_size: int=10000, backend: str=None
+    ) -> StreamingGroupStats:
+        """
+        Same statistics as summarize and histogram, computed while streaming the objects saved at path
+        with iter_from_path, so that the objects are never all held in memory.
+        See StreamingGroupStats for the arguments.
+
+        stats = DistanceErrorList.stats_from_path('errors.jsonl', 'error', by=['model_name'], bins=20, range=(0, 10))
+        summaries, histograms = stats.summary(), stats.histogram()
+        """
+        stats = StreamingGroupStats(
+            attr_name, by=by, percentiles=percentiles, exact_quantiles=exact_quantiles, bins=bins, range=range
+        )
+        stats.update_all(cls.iter_from_path(path, chunk_size=chunk_size, backend=backend), chunk_size=chunk_size)
+        return stats
+
+    @classmethod
+    def _from_gtdt_nested(cls, gt: GTData, dt: PredictionData, obj_type: type, **kwargs) -> H:
+        """
+        Reference implementation of from_gtdt that filters with get().
+        It is used when a test_name, frame or model_name is None, since get() treats None as a wildcard.
+        """
         result = cls()
-        assert isinstance(gt, GTData)
-        assert isinstance(dt, PredictionData)
         model_names = dt.model_names
         for test_name in gt.test_names:
             gt_test, dt_test = gt.get(test_name=test_name), dt.get(test_name=test_name)
@@ -177,4 +431,73 @@ class HybridData(
                     else:
                         result_datum = obj_type.from_gtdt(gt=gt_datum, dt=None, fallback_model_name=model_name, **kwargs)
                         result.append(result_datum)
-        return result
\ No newline at end of file
+        return result
+
+    @classmethod
+    def from_gtdt(cls, gt: GTData, dt: PredictionData, obj_type: type, num_workers: int=None, **kwargs) -> H:
+        """Pairs every GT datum with the prediction of every model for the same test_name and frame.
+
+        GT and predictions are grouped by (test_name, frame) and (test_name, frame, model_name)
+        in a single pass, so each pair is found with a dictionary lookup.
+        Results are ordered by test_name, then frame, then model_name.
+
+        Args:
+            gt (GTData): The GT data.
+            dt (PredictionData): The prediction data.
+            obj_type (type): The HybridDatum class whose from_gtdt is called for each pair.
+            num_workers (int, optional):
+                When greater than 1, obj_type.from_gtdt is called in a process pool of this size.
+                obj_type and kwargs must be picklable in that case.
+                Defaults to None.
+            **kwargs: Passed to obj_type.from_gtdt.
+
+        Returns:
+            H: A handler containing one obj_type datum per GT datum and model_name.
+                When a model has no prediction for a frame, obj_type.from_gtdt is called with
+                dt=None and fallback_model_name=model_name.
+        """
+        assert hasattr(obj_type, 'from_gtdt')
+        assert isinstance(gt, GTData)
+        assert isinstance(dt, PredictionData)
+        model_names = dt.model_names
+        gt_groups = {}
+        dt_groups = {}
+        try:
+            for gt_datum in gt:
+                gt_groups.setdefault(gt_datum.test_name, {}).setdefault(gt_datum.frame, []).append(gt_datum)
+            for dt_datum in dt:
+                dt_groups.setdefault((dt_datum.test_name, dt_datum.frame, dt_datum.model_name), []).append(dt_datum)
+        except TypeError:
+            # Unhashable test_name, frame or model_name
+            return cls._from_gtdt_nested(gt=gt, dt=dt, obj_type=obj_type, **kwargs)
+        if None in model_names or None in gt_groups or any(None in frames for frames in gt_groups.values()):
+            return cls._from_gtdt_nested(gt=gt, dt=dt, obj_type=obj_type, **kwargs)
+
+        jobs = []
+        for test_name in sorted(gt_groups.keys()):
+            frame_groups = gt_groups[test_name]
+            for frame in sorted(frame_groups.keys()):
+                gt_frame = frame_groups[frame]
+                assert len(gt_frame) == 1
+                gt_datum = gt_frame[0]
+                for model_name in model_names:
+                    dt_model = dt_groups.get((test_name, frame, model_name), [])
+                    if len(dt_model) > 0:
+                        assert len(dt_model) == 1, f'len(dt_model): {len(dt_model)}, test_name: {test_name}, frame: {frame}, model_name: {model_name}'
+                        jobs.append((gt_datum, dt_model[0], None))
+                    else:
+                        jobs.append((gt_datum, None, model_name))
+
+        if num_workers is not None and num_workers > 1:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                result_data = list(
+                    executor.map(
+                        from_gtdt_job, repeat(obj_type), jobs, repeat(kwargs),
+                        chunksize=max(1, len(jobs) // (4 * num_workers))
+                    )
+                )
+        else:
+            result_data = [from_gtdt_job(obj_type, job, kwargs) for job in jobs]
+        result = cls()
+        result.extend(result_data)
+        return result
@@ -0,0 +1,213 @@
+from __future__ import annotations
+from typing import List
+import re
+import json
+from uuid import UUID
+from enum import Enum
+import yaml
+
+from logger import logger
+from ..check_utils import check_value
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+class JsonBackends:
+    AUTO = 'auto'
+    STDLIB = 'json'
+    ORJSON = 'orjson'
+    UJSON = 'ujson'
+
+    @classmethod
+    def get_all(cls) -> List[str]:
+        return [cls.AUTO, cls.STDLIB, cls.ORJSON, cls.UJSON]
+
+    @classmethod
+    def get_available(cls) -> List[str]:
+        available = [cls.STDLIB]
+        if orjson is not None:
+            available.append(cls.ORJSON)
+        if ujson is not None:
+            available.append(cls.UJSON)
+        return available
+
+class YamlBackends:
+    AUTO = 'auto'
+    PYYAML = 'pyyaml'
+    LIBYAML = 'libyaml'
+
+    @classmethod
+    def get_all(cls) -> List[str]:
+        return [cls.AUTO, cls.PYYAML, cls.LIBYAML]
+
+    @classmethod
+    def get_available(cls) -> List[str]:
+        available = [cls.PYYAML]
+        if hasattr(yaml, 'CFullLoader'):
+            available.append(cls.LIBYAML)
+        return available
+
+_default_backends = {
+    'json': JsonBackends.AUTO,
+    'yaml': YamlBackends.AUTO
+}
+
+def set_json_backend(backend: str):
+    """
+    Sets the JSON backend used when no backend is specified.
+    'auto' uses orjson if it is installed, then ujson, then the json module.
+    """
+    check_value(backend, valid_value_list=JsonBackends.get_all())
+    _default_backends['json'] = backend
+
+def set_yaml_backend(backend: str):
+    """
+    Sets the YAML backend used when no backend is specified.
+    'auto' uses the libyaml bindings of PyYAML for loading if they were built, otherwise the pure Python implementation.
+    Saving always uses the pure Python implementation. See yaml_dumps.
+    """
+    check_value(backend, valid_value_list=YamlBackends.get_all())
+    _default_backends['yaml'] = backend
+
+def get_json_backend(backend: str=None) -> str:
+    backend = backend if backend is not None else _default_backends['json']
+    check_value(backend, valid_value_list=JsonBackends.get_all())
+    available = JsonBackends.get_available()
+    if backend == JsonBackends.AUTO:
+        return available[1] if len(available) > 1 else JsonBackends.STDLIB
+    elif backend not in available:
+        logger.error(f'JSON backend {backend} is not installed. Available backends: {available}')
+        raise ImportError
+    return backend
+
+def get_yaml_backend(backend: str=None) -> str:
+    backend = backend if backend is not None else _default_backends['yaml']
+    check_value(backend, valid_value_list=YamlBackends.get_all())
+    available = YamlBackends.get_available()
+    if backend == YamlBackends.AUTO:
+        return available[-1]
+    elif backend not in available:
+        logger.error(f'YAML backend {backend} is not available. Available backends: {available}')
+        raise ImportError
+    return backend
+
+# Float formats that orjson writes differently from repr(), e.g. 1e16 vs 1e+16 and 0.00001 vs 1e-05.
+_orjson_float_mismatch = re.compile(rb'[0-9][eE]|0\.0000')
+
+_plain_json_types = frozenset([str, int, float, bool, type(None)])
+
+def _orjson_raise(obj):
+    raise TypeError
+
+def _has_orjson_only_values(obj) -> bool:
+    """Whether obj contains UUID or Enum values, which orjson always serializes and json.dumps may reject."""
+    stack = [obj]
+    while len(stack) > 0:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type in _plain_json_types:
+            continue
+        elif value_type is dict:
+            stack.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            stack.extend(value)
+        elif isinstance(value, (UUID, Enum)):
+            return True
+    return False
+
+def _orjson_dumps(obj) -> str:
+    """
+    Formats obj with orjson, or returns None when the result wouldn't match json.dumps(indent=2, ensure_ascii=False),
+    including when json.dumps would raise a TypeError.
+    """
+    # Types that orjson serializes natively but json.dumps doesn't (datetime, dataclasses)
+    # and subclasses of str, int, dict, etc. are passed to _orjson_raise, so they fall back to json.dumps.
+    option = orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS
+    try:
+        data = orjson.dumps(obj, option=option, default=_orjson_raise)
+    except (TypeError, orjson.JSONEncodeError):
+        # Non-string keys, integers that don't fit in 64 bits, unsupported types, etc.
+        return None
+    if _has_orjson_only_values(obj):
+        return None
+    if _orjson_float_mismatch.search(data) is not None:
+        return None
+    if b'null' in data:
+        # orjson writes NaN and Infinity as null.
+        try:
+            json.dumps(obj, allow_nan=False, check_circular=False)
+        except ValueError:
+            return None
+    return data.decode('utf-8')
+
+def json_dumps(obj, backend: str=None) -> str:
+    """
+    Formats obj the same way as json.dumps(obj, indent=2, ensure_ascii=False).
+    The fast backends are only used when their output is identical.
+    ujson's indented output differs from the json module's, so it is only used for loading.
+    """
+    backend = get_json_backend(backend)
+    if backend == JsonBackends.ORJSON:
+        result = _orjson_dumps(obj)
+        if result is not None:
+            return result
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def json_loads(text: str, backend: str=None):
+    backend = get_json_backend(backend)
+    if backend == JsonBackends.ORJSON:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # NaN, Infinity and integers that don't fit in 64 bits are only accepted by the json module.
+            pass
+    elif backend == JsonBackends.UJSON:
+        try:
+            return ujson.loads(text)
+        except (ValueError, OverflowError):
+            pass
+    return json.loads(text)
+
+def yaml_dumps(obj, backend: str=None) -> str:
+    """
+    Formats obj the same way as yaml.dump(obj, allow_unicode=True).
+    libyaml's emitter writes some documents differently (e.g. empty keys and line breaks in long quoted strings),
+    so, like ujson, it is only used for loading, and the output doesn't depend on how PyYAML was built.
+    """
+    get_yaml_backend(backend)
+    return yaml.dump(obj, allow_unicode=True)
+
+def yaml_loads(text: str, backend: str=None):
+    """
+    Parses text the same way as yaml.load(text, Loader=yaml.FullLoader).
+    """
+    if get_yaml_backend(backend) == YamlBackends.LIBYAML:
+        return yaml.load(text, Loader=yaml.CFullLoader)
+    return yaml.load(text, Loader=yaml.FullLoader)
+
+def save_data(obj, save_path: str, extension: str, backend: str=None):
+    if extension == 'json':
+        text = json_dumps(obj, backend=backend)
+    elif extension == 'yaml':
+        text = yaml_dumps(obj, backend=backend)
+    else:
+        raise ValueError(f'Unsupported extension: {extension}')
+    with open(save_path, 'w') as f:
+        f.write(text)
+
+def load_data(path: str, extension: str, backend: str=None):
+    with open(path, 'r') as f:
+        text = f.read()
+    if extension == 'json':
+        return json_loads(text, backend=backend)
+    elif extension == 'yaml':
+        return yaml_loads(text, backend=backend)
+    else:
+        raise ValueError(f'Unsupported extension: {extension}')
@@ -0,0 +1,213 @@
+from __future__ import annotations
+from typing import TypeVar, Generic, List, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import os
+import math
+import json
+
+from logger import logger
+from ..check_utils import check_file_exists, check_issubclass
+from ..file_utils import file_exists
+from .basic import BasicLoadableHandler
+
+H = TypeVar('H')
+
+format_version = 1
+manifest_filename = 'manifest.json'
+range_types = (str, int, float, bool)
+
+def _key_range(values: list) -> list:
+    """
+    [min, max] of the values that aren't None, or None if they can't be compared
+    or can't be stored in the manifest.
+    """
+    values = [value for value in values if value is not None]
+    if len(values) == 0:
+        return None
+    try:
+        if any([type(value) not in range_types or (type(value) is float and math.isnan(value)) for value in values]):
+            return None
+        return [min(values), max(values)]
+    except TypeError:
+        return None
+
+def _may_contain(key_range: list, val) -> bool:
+    """Whether a shard with key_range may contain an object that matches val in BasicLoadableHandler.get."""
+    if val is None or key_range is None:
+        return True
+    if isinstance(val, (list, tuple)):
+        # Ranges only hold scalars, so a list can only match through its elements.
+        return any([_may_contain(key_range, val_part) for val_part in val])
+    min_val, max_val = key_range
+    try:
+        return min_val <= val <= max_val
+    except TypeError:
+        return True
+
+def _load_shard(handler_cls: type, path: str, backend: str, kwargs: dict):
+    # Module level so that it can be sent to worker processes.
+    handler = handler_cls.load_from_path(path, backend=backend)
+    if len(kwargs) > 0:
+        return len(handler), handler.get(**kwargs)
+    return len(handler), handler
+
+class ShardedDataset(Generic[H]):
+    """
+    A handler saved as several shard files in a directory, along with a manifest.json that lists
+    the shards, their record counts and the [min, max] range of a few key attributes in each shard.
+
+    Shards are loaded in parallel with a process pool when num_workers is greater than 1.
+    get only loads the shards whose key ranges can contain the requested values,
+    so sorting the handler by the key attributes before saving makes it much more selective.
+
+    ShardedDataset.save(predictions, 'predictions', shard_size=100000)
+    dataset = ShardedDataset('predictions', handler_cls=PredictionList, num_workers=8)
+    all_predictions = dataset.load()
+    test_predictions = dataset.get(test_name='test0')
+    """
+    def __init__(self, path: str, handler_cls: type, num_workers: int=None, backend: str=None):
+        check_issubclass(handler_cls, valid_parent_class_list=[BasicLoadableHandler])
+        manifest_path = os.path.join(path, manifest_filename)
+        check_file_exists(manifest_path)
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest['version'] > format_version:
+            logger.error(f"{path} was saved with format version {manifest['version']}, which is newer than {format_version}")
+            raise ValueError
+        self.path = path
+        self.handler_cls = handler_cls
+        self.num_workers = num_workers
+        self.backend = backend
+        self.manifest = manifest
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.handler_cls.__name__}, path={self.path}, num_shards={self.num_shards})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return self.manifest['num_records']
+
+    @property
+    def num_shards(self) -> int:
+        return len(self.manifest['shards'])
+
+    @property
+    def key_attrs(self) -> List[str]:
+        return self.manifest['key_attrs']
+
+    @property
+    def shard_paths(self) -> List[str]:
+        return [os.path.join(self.path, shard['filename']) for shard in self.manifest['shards']]
+
+    @classmethod
+    def save(
+        cls, handler: H, path: str, shard_size: int=100000, extension: str='jsonl',
+        key_attrs: List[str]=None, overwrite: bool=False, backend: str=None
+    ) -> ShardedDataset[H]:
+        """
+        Saves handler in shards of shard_size objects and returns the dataset.
+
+        Args:
+            handler (H): The handler to save.
+            path (str): The directory to save the shards and the manifest in. It is created if needed.
+            shard_size (int, optional): The number of objects in each shard. Defaults to 100000.
+            extension (str, optional): The format of the shards. Any format supported by save_to_path. Defaults to 'jsonl'.
+            key_attrs (List[str], optional): The attributes whose ranges are recorded for pruning.
+                    Defaults to frame and test_name.
+            overwrite (bool, optional): Whether to replace a dataset that was already saved at path. Defaults to False.
+        """
+        check_issubclass(type(handler), valid_parent_class_list=[BasicLoadableHandler])
+        if shard_size < 1:
+            logger.error(f'shard_size must be at least 1. Got {shard_size}')
+            raise ValueError
+        key_attrs = key_attrs if key_attrs is not None else ['frame', 'test_name']
+        manifest_path = os.path.join(path, manifest_filename)
+        if file_exists(manifest_path):
+            if not overwrite:
+                logger.error(f'A sharded dataset already exists at path: {path}')
+                raise Exception
+            # Remove the old manifest first, so that it never points to a mix of old and new shards.
+            with open(manifest_path, 'r') as f:
+                old_manifest = json.load(f)
+            os.remove(manifest_path)
+            for shard in old_manifest['shards']:
+                shard_path = os.path.join(path, shard['filename'])
+                if file_exists(shard_path):
+                    os.remove(shard_path)
+        os.makedirs(path, exist_ok=True)
+
+        shards = []
+        for shard_idx, start in enumerate(range(0, len(handler), shard_size)):
+            shard = handler[start:start + shard_size]
+            filename = f'shard-{shard_idx:05d}.{extension}'
+            shard.save_to_path(os.path.join(path, filename), overwrite=True, backend=backend)
+            ranges = {}
+            for attr_name in key_attrs:
+                try:
+                    ranges[attr_name] = _key_range(shard._get_attr_values(attr_name))
+                except AttributeError:
+                    ranges[attr_name] = None
+            shards.append({'filename': filename, 'count': len(shard), 'ranges': ranges})
+        manifest = {
+            'version': format_version,
+            'handler': type(handler).__name__,
+            'num_records': len(handler),
+            'key_attrs': key_attrs,
+            'shards': shards
+        }
+        tmp_path = f'{manifest_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+        return cls(path, handler_cls=type(handler), backend=backend)
+
+    def prune(self, **kwargs) -> List[int]:
+        """The indices of the shards that may contain objects that match get(**kwargs)."""
+        shard_indices = []
+        for shard_idx, shard in enumerate(self.manifest['shards']):
+            if shard['count'] == 0:
+                continue
+            ranges = shard['ranges']
+            if all([_may_contain(ranges[key], val) for key, val in kwargs.items() if key in ranges]):
+                shard_indices.append(shard_idx)
+        return shard_indices
+
+    def _load_shards(self, shard_indices: List[int], kwargs: dict, num_workers: int=None) -> List[H]:
+        num_workers = num_workers if num_workers is not None else self.num_workers
+        paths = [self.shard_paths[shard_idx] for shard_idx in shard_indices]
+        if num_workers is not None and num_workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(num_workers, len(paths))) as executor:
+                results = list(executor.map(_load_shard, repeat(self.handler_cls), paths, repeat(self.backend), repeat(kwargs)))
+        else:
+            results = [_load_shard(self.handler_cls, path, self.backend, kwargs) for path in paths]
+        handlers = []
+        for shard_idx, (count, handler) in zip(shard_indices, results):
+            expected_count = self.manifest['shards'][shard_idx]['count']
+            if count != expected_count:
+                logger.error(f'{self.shard_paths[shard_idx]} has {count} records, but the manifest lists {expected_count}')
+                raise ValueError
+            handlers.append(handler)
+        return handlers
+
+    def load_shard(self, shard_idx: int) -> H:
+        return self._load_shards([shard_idx], kwargs={}, num_workers=1)[0]
+
+    def iter_shards(self) -> Iterator[H]:
+        """Yields the shards one at a time, so that only one shard is held in memory."""
+        for shard_idx in range(self.num_shards):
+            yield self.load_shard(shard_idx)
+
+    def load(self, num_workers: int=None) -> H:
+        """Loads every shard and concatenates them in order."""
+        return self.handler_cls.concat(self._load_shards(list(range(self.num_shards)), kwargs={}, num_workers=num_workers))
+
+    def get(self, num_workers: int=None, **kwargs) -> H:
+        """
+        Same as BasicLoadableHandler.get, but only the shards whose key ranges allow a match are loaded,
+        and each shard is filtered by the process that loads it.
+        """
+        shard_indices = self.prune(**kwargs)
+        return self.handler_cls.concat(self._load_shards(shard_indices, kwargs=kwargs, num_workers=num_workers))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import List, Union
+import operator
+import numpy as np
+
+from ..constants.number_constants import int_types, float_types
+from .columnar import ColumnarList
+
+SortValues = Union[list, np.ndarray]
+
+def sort_keys(values: list) -> np.ndarray:
+    """
+    Returns a numeric array that sorts the same way as values,
+    or None if values can't be compared without Python comparisons.
+
+    Numbers are used as they are. Other hashable values (e.g. strings) are replaced with
+    their rank among the distinct values, so only the distinct values are compared in Python.
+    """
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+    value_types = set(map(type, values))
+    if value_types <= {bool}:
+        return np.array(values, dtype=np.int64)
+    elif value_types <= set(int_types) | {bool}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    elif value_types <= set(int_types) | set(float_types) | {bool}:
+        keys = np.array(values, dtype=np.float64)
+        if not np.isnan(keys).any():
+            # NaN doesn't have a consistent order in Python.
+            return keys
+        return None
+    try:
+        distinct_values = sorted(set(values))
+    except TypeError:
+        # Unhashable values or values that can't be compared with each other
+        return None
+    ranks = {value: rank for rank, value in enumerate(distinct_values)}
+    return np.fromiter(map(ranks.__getitem__, values), dtype=np.int64, count=len(values))
+
+def get_sort_values(obj_list: list, attr_name: str) -> SortValues:
+    """
+    The values of attr_name (an attribute or a property) of every object in obj_list.
+    Columns of a ColumnarList are converted into sort keys directly when possible.
+    Raises AttributeError if an object doesn't have attr_name.
+    """
+    if isinstance(obj_list, ColumnarList) and attr_name in obj_list.columns:
+        column = obj_list.columns[attr_name]
+        keys = column.sort_keys()
+        return keys if keys is not None else column.to_list()
+    return list(map(operator.attrgetter(attr_name), obj_list))
+
+def _reversed_keys(keys: np.ndarray) -> np.ndarray:
+    if keys.dtype.kind == 'f':
+        return -keys
+    # ~k is -k - 1, which reverses the order without overflowing at the minimum value.
+    return ~keys.astype(np.int64)
+
+def argsort_values(value_lists: List[SortValues], reverse_list: List[bool]) -> np.ndarray:
+    """
+    Stable argsort by several keys. value_lists[0] is the primary key.
+    Each key is sorted in descending order if the corresponding reverse flag is True.
+    Items with equal keys keep their original order, as with list.sort.
+
+    Each entry of value_lists is either a list of values or an array returned by sort_keys.
+    The keys are compared with np.lexsort when every key can be converted with sort_keys.
+    """
+    size = len(value_lists[0])
+    key_list = []
+    for values, reverse in zip(value_lists, reverse_list):
+        keys = values if isinstance(values, np.ndarray) else sort_keys(values)
+        if keys is None:
+            key_list = None
+            break
+        key_list.append(_reversed_keys(keys) if reverse else keys)
+    if key_list is not None:
+        if len(key_list) == 1:
+            return np.argsort(key_list[0], kind='stable')
+        # np.lexsort treats the last key as the primary key.
+        return np.lexsort(key_list[::-1])
+
+    # Stable sorts from the least significant key to the most significant one.
+    order = list(range(size))
+    for values, reverse in list(zip(value_lists, reverse_list))[::-1]:
+        values = values.tolist() if isinstance(values, np.ndarray) else values
+        order.sort(key=values.__getitem__, reverse=reverse)
+    return np.array(order, dtype=np.int64)
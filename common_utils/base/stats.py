@@ -0,0 +1,169 @@
+from __future__ import annotations
+from typing import List, Dict, Iterable
+import operator
+import numpy as np
+
+from logger import logger
+from .groups import group_moments, group_quantiles, histogram_edges, group_histograms, \
+    check_percentiles, percentile_name, summary_dicts
+
+class StreamingGroupStats:
+    """
+    Summary statistics of a numeric attribute, grouped by other attributes,
+    computed from objects that are seen one chunk at a time (e.g. from iter_from_path).
+
+    Counts, means, standard deviations, RMSE, minimums, maximums and histograms are accumulated
+    per group, so their memory usage only depends on the number of groups.
+    Chunks are reduced with NumPy and merged into the running statistics with Chan's parallel update.
+    Medians and percentiles are exact, so they need every value: when exact_quantiles is True,
+    the values of attr_name are kept as float64 arrays (8 bytes per object) instead of the objects.
+    None values are skipped.
+
+    stats = StreamingGroupStats('error', by=['model_name'], percentiles=[95])
+    for chunk in chunks:
+        stats.update(chunk)
+    summaries = stats.summary()
+    """
+    def __init__(
+        self, attr_name: str, by: List[str]=None, percentiles: List[float]=None,
+        exact_quantiles: bool=True, bins=None, range: tuple=None
+    ):
+        """
+        Args:
+            attr_name (str): The numeric attribute to summarize.
+            by (List[str], optional): The attributes to group by. Defaults to a single group with the key ().
+            percentiles (List[float], optional): Percentiles (0 to 100) to add to the summaries. Defaults to None.
+            exact_quantiles (bool, optional): Whether to keep the values for median and percentiles.
+                    Defaults to True.
+            bins (optional): Either the bin edges or a number of bins over range.
+                    Since values are seen one chunk at a time, the edges can't depend on the data.
+                    Defaults to None, which disables histograms.
+            range (tuple, optional): The (min, max) range of the bins when bins is a number of bins.
+        """
+        self.attr_name = attr_name
+        self.by = list(by) if by is not None else []
+        self.percentiles = list(percentiles) if percentiles is not None else []
+        check_percentiles(self.percentiles)
+        if len(self.percentiles) > 0 and not exact_quantiles:
+            logger.error(f'percentiles require exact_quantiles=True')
+            raise ValueError
+        self.exact_quantiles = exact_quantiles
+        if bins is not None and np.ndim(bins) == 0 and range is None:
+            logger.error(f'A range is required when bins is a number of bins.')
+            raise ValueError
+        self.edges = histogram_edges(np.empty(0), bins=bins, range=range) if bins is not None else None
+
+        self._key_to_group = {}
+        self._keys = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._means = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._sum_squares = np.zeros(0)
+        self._mins = np.zeros(0)
+        self._maxs = np.zeros(0)
+        self._histograms = np.zeros((0, len(self.edges) - 1), dtype=np.int64) if self.edges is not None else None
+        self._value_chunks = []
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.attr_name}, by={self.by}, num_groups={len(self._keys)})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def keys(self) -> List[tuple]:
+        return list(self._keys)
+
+    def _add_groups(self, num_groups: int):
+        num_new = num_groups - len(self._counts)
+        self._counts = np.concatenate([self._counts, np.zeros(num_new, dtype=np.int64)])
+        self._means = np.concatenate([self._means, np.zeros(num_new)])
+        self._m2 = np.concatenate([self._m2, np.zeros(num_new)])
+        self._sum_squares = np.concatenate([self._sum_squares, np.zeros(num_new)])
+        self._mins = np.concatenate([self._mins, np.full(num_new, np.inf)])
+        self._maxs = np.concatenate([self._maxs, np.full(num_new, -np.inf)])
+        if self._histograms is not None:
+            self._histograms = np.concatenate([self._histograms, np.zeros((num_new, self._histograms.shape[1]), dtype=np.int64)])
+
+    def update(self, objects: Iterable):
+        """Adds a chunk of objects to the statistics."""
+        objects = list(objects)
+        if len(objects) == 0:
+            return
+        try:
+            values = list(map(operator.attrgetter(self.attr_name), objects))
+            key_lists = [list(map(operator.attrgetter(attr_name), objects)) for attr_name in self.by]
+        except AttributeError:
+            logger.error(f'{type(objects[0]).__name__} object is missing {self.attr_name} or one of {self.by}')
+            raise
+        # None is converted to NaN.
+        values = np.array(values, dtype=np.float64)
+        keys = list(zip(*key_lists)) if len(self.by) > 0 else [()] * len(objects)
+        key_to_group = self._key_to_group
+        for key in dict.fromkeys(keys):
+            if key not in key_to_group:
+                key_to_group[key] = len(self._keys)
+                self._keys.append(key)
+        if len(self._keys) > len(self._counts):
+            self._add_groups(len(self._keys))
+        ids = np.fromiter(map(key_to_group.__getitem__, keys), dtype=np.int64, count=len(keys))
+        valid = ~np.isnan(values)
+        ids, values = ids[valid], values[valid]
+        num_groups = len(self._keys)
+
+        counts, means, m2, sum_squares = group_moments(ids, values, num_groups)
+        has_values = counts > 0
+        total_counts = self._counts + counts
+        # Chan et al.: merge the moments of the chunk into the running moments.
+        delta = np.where(has_values, means, 0.0) - self._means
+        weight = np.divide(counts, total_counts, out=np.zeros(num_groups), where=total_counts > 0)
+        self._means = np.where(has_values, self._means + delta * weight, self._means)
+        self._m2 = self._m2 + np.where(has_values, m2 + delta**2 * self._counts * weight, 0.0)
+        self._counts = total_counts
+        self._sum_squares += sum_squares
+        np.minimum.at(self._mins, ids, values)
+        np.maximum.at(self._maxs, ids, values)
+        if self._histograms is not None:
+            self._histograms += group_histograms(ids, values, num_groups, self.edges)
+        if self.exact_quantiles:
+            self._value_chunks.append((ids, values))
+
+    def update_all(self, objects: Iterable, chunk_size: int=10000):
+        """Adds objects from an iterable in chunks of chunk_size, so that the iterable is never held in memory."""
+        chunk = []
+        for obj in objects:
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                self.update(chunk)
+                chunk = []
+        self.update(chunk)
+
+    def summary(self) -> Dict[tuple, dict]:
+        """
+        count, mean, std, rmse, min and max of every group, as with HandlerGroups.summary.
+        median and 'p<q>' for every percentile are included when exact_quantiles is True.
+        """
+        num_groups = len(self._keys)
+        quantiles = None
+        if self.exact_quantiles:
+            if len(self._value_chunks) > 0:
+                ids = np.concatenate([chunk_ids for chunk_ids, chunk_values in self._value_chunks])
+                values = np.concatenate([chunk_values for chunk_ids, chunk_values in self._value_chunks])
+                # Keep a single chunk from now on.
+                self._value_chunks = [(ids, values)]
+            else:
+                ids, values = np.empty(0, dtype=np.int64), np.empty(0)
+            q_list = [0.5] + [q / 100 for q in self.percentiles]
+            medians, *percentile_values = group_quantiles(ids, values, num_groups, q_list)
+            quantiles = {'median': medians}
+            quantiles.update({percentile_name(q): result for q, result in zip(self.percentiles, percentile_values)})
+        means = np.where(self._counts > 0, self._means, np.nan)
+        summaries = summary_dicts(self._counts, means, self._m2, self._sum_squares, self._mins, self._maxs, quantiles)
+        return dict(zip(self._keys, summaries))
+
+    def histogram(self) -> Dict[tuple, np.ndarray]:
+        """The histogram counts of every group over the bin edges in self.edges."""
+        if self._histograms is None:
+            logger.error(f'Histograms are disabled. Pass bins to {self.__class__.__name__}.')
+            raise ValueError
+        return dict(zip(self._keys, self._histograms.copy()))
@@ -0,0 +1,185 @@
+from __future__ import annotations
+from typing import Union, Iterator
+from collections.abc import MutableSequence, Sequence
+import numpy as np
+
+from logger import logger
+from .columnar import ColumnarList
+
+Positions = Union[range, np.ndarray]
+
+def positions_from_index(idx, length: int) -> Positions:
+    """
+    Converts a slice, a sequence of (possibly negative) positions or a boolean mask
+    into the positions that it selects from a sequence of the given length.
+    Slices are converted into a range so that nothing is allocated.
+    """
+    if isinstance(idx, slice):
+        return range(length)[idx]
+    elif isinstance(idx, range):
+        idx = np.arange(idx.start, idx.stop, idx.step, dtype=np.int64)
+    positions = np.asarray(idx)
+    if positions.ndim != 1:
+        logger.error(f'Expected a 1D index. Got shape {positions.shape}')
+        raise IndexError
+    if positions.dtype == np.bool_:
+        if len(positions) != length:
+            logger.error(f'Boolean mask has length {len(positions)}, but {length} was expected.')
+            raise IndexError
+        return np.flatnonzero(positions)
+    elif len(positions) == 0:
+        return np.empty(0, dtype=np.int64)
+    elif positions.dtype.kind not in 'iu':
+        logger.error(f'Expected integer positions or a boolean mask. Got dtype {positions.dtype}')
+        raise IndexError
+    positions = positions.astype(np.int64)
+    if positions.min() < -length or positions.max() >= length:
+        logger.error(f'Index out of range for length {length}')
+        raise IndexError
+    return np.where(positions < 0, positions + length, positions)
+
+def is_fancy_index(idx) -> bool:
+    """Whether idx selects several positions at once: a list or array of positions, or a boolean mask."""
+    return isinstance(idx, (list, np.ndarray, range))
+
+def take_positions(seq: Sequence, positions: Positions) -> Sequence:
+    """A new sequence with the items of seq at positions."""
+    if isinstance(seq, ColumnarList):
+        return seq.take(np.asarray(positions, dtype=np.int64))
+    positions = positions if isinstance(positions, range) else positions.tolist()
+    return [seq[position] for position in positions]
+
+def assign_positions(seq: MutableSequence, positions: Positions, values: Sequence):
+    """Sets seq[positions[i]] to values[i]. When a position is repeated, the last value wins."""
+    values = list(values)
+    if len(values) != len(positions):
+        logger.error(f'Cannot assign {len(values)} values to {len(positions)} positions.')
+        raise ValueError
+    positions = positions if isinstance(positions, range) else positions.tolist()
+    for position, value in zip(positions, values):
+        seq[position] = value
+
+def delete_positions(seq: MutableSequence, positions: Positions):
+    """Deletes the items of seq at positions in a single pass."""
+    positions = np.asarray(positions, dtype=np.int64)
+    if isinstance(seq, ColumnarList):
+        for column in seq.columns.values():
+            column.delete(positions)
+    else:
+        keep = np.ones(len(seq), dtype=np.bool_)
+        keep[positions] = False
+        seq[:] = [item for item, is_kept in zip(seq, keep.tolist()) if is_kept]
+
+def compose_positions(outer: Positions, inner: Positions) -> Positions:
+    """Positions in the original sequence of outer[inner]."""
+    if isinstance(outer, range) and isinstance(inner, range):
+        if len(inner) == 0:
+            return range(0)
+        start, step = outer[inner.start], outer.step * inner.step
+        return range(start, start + step * len(inner), step)
+    return np.asarray(outer, dtype=np.int64)[np.asarray(inner, dtype=np.int64)]
+
+class ListView(MutableSequence):
+    """
+    List-like view of some positions of another sequence, such as a handler's object list.
+
+    Reading from a view doesn't copy anything.
+    The first mutation copies the viewed items into a private list (copy-on-write),
+    so mutating a view never changes its parent.
+    Until then, the view reads the parent's current contents, so changes made to the parent
+    after the view was created are visible through the view, as with NumPy views.
+    """
+    def __init__(self, parent: Sequence, positions: Positions=None):
+        positions = positions if positions is not None else range(len(parent))
+        if isinstance(parent, ListView) and parent._items is None:
+            # Views of views refer directly to the original sequence.
+            positions = compose_positions(parent._positions, positions)
+            parent = parent._parent
+        self._parent = parent
+        self._positions = positions
+        self._items = None
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({list(self)})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._items is not None
+
+    def to_list(self) -> list:
+        if self._items is not None:
+            return list(self._items)
+        if isinstance(self._positions, range) and self._positions.step == 1 and type(self._parent) is list:
+            return self._parent[self._positions.start:self._positions.stop]
+        parent = self._parent
+        return [parent[position] for position in self._positions_list()]
+
+    def _positions_list(self) -> list:
+        if isinstance(self._positions, range):
+            return self._positions
+        return self._positions.tolist()
+
+    def materialize(self) -> list:
+        if self._items is None:
+            self._items = self.to_list()
+            self._parent = None
+            self._positions = None
+        return self._items
+
+    def __len__(self) -> int:
+        if self._items is not None:
+            return len(self._items)
+        return len(self._positions)
+
+    def __getitem__(self, idx):
+        if self._items is not None:
+            return self._items[idx]
+        elif isinstance(idx, slice):
+            return ListView(self._parent, self._positions[idx])
+        return self._parent[int(self._positions[idx])]
+
+    def __iter__(self) -> Iterator:
+        if self._items is not None:
+            return iter(self._items)
+        return map(self._parent.__getitem__, self._positions_list())
+
+    def __setitem__(self, idx, value):
+        self.materialize()[idx] = value
+
+    def __delitem__(self, idx):
+        del self.materialize()[idx]
+
+    def insert(self, idx: int, value):
+        self.materialize().insert(idx, value)
+
+    def append(self, value):
+        self.materialize().append(value)
+
+    def extend(self, values):
+        values = list(values)
+        self.materialize().extend(values)
+
+    def sort(self, key=None, reverse: bool=False):
+        self.materialize().sort(key=key, reverse=reverse)
+
+    def reverse(self):
+        self.materialize().reverse()
+
+    def copy(self) -> list:
+        return self.to_list()
+
+    def __add__(self, other) -> list:
+        return self.to_list() + list(other)
+
+    def __radd__(self, other) -> list:
+        return list(other) + self.to_list()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all([a == b for a, b in zip(self, other)])
+        return NotImplemented
+
+    __hash__ = None
@@ -17,6 +17,9 @@ def check_type_from_list(item_list: list, valid_type_list: list, var_names: List
         for item, var_name in zip(item_list, var_names):
             check_type(item=item, valid_type_list=valid_type_list, var_name=var_name)
     else:
+        # Each distinct type only needs to be checked once. Fall back to checking item by item to report the invalid one.
+        if all([item_type in valid_type_list for item_type in set(map(type, item_list))]):
+            return
         for item in item_list:
             check_type(item=item, valid_type_list=valid_type_list)
 
@@ -35,6 +38,9 @@ def check_issubclass_from_list(item_list: list, valid_parent_class_list: list, v
         for item, var_name in zip(item_list, var_names):
             check_issubclass(item=item, valid_parent_class_list=valid_parent_class_list, var_name=var_name)
     else:
+        item_types = set(map(type, item_list))
+        if type not in item_types and all([issubclass(item_type, tuple(valid_parent_class_list)) for item_type in item_types]):
+            return
         for item in item_list:
             check_issubclass(item=item, valid_parent_class_list=valid_parent_class_list)
 
@@ -1,3 +1,5 @@
 from .common import Keypoint, BoundingBox, Size, Point, Rectangle, Polygon, \
     Circle, Ellipse, Resize, Interval
-from .bbox import BBox, ConstantAR_BBox
\ No newline at end of file
+from .bbox import BBox, ConstantAR_BBox, BBoxArray
+from .bbox_index import BBoxIndex
+from .matching import BoxMatches
\ No newline at end of file
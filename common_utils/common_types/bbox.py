@@ -1,4 +1,6 @@
 from __future__ import annotations
+from typing import List
+from itertools import chain
 import numpy as np
 import cv2
 from math import floor, ceil
@@ -866,4 +868,373 @@ class ConstantAR_BBox(BBox):
             result = result.crop_scale(frame_shape=frame_shape, target_aspect_ratio=target_aspect_ratio)
         else:
             raise Exception
-        return result
\ No newline at end of file
+        return result
+
+class BBoxArray:
+    """
+    A batch of N bounding boxes stored as an (N, 4) float64 array of [xmin, ymin, xmax, ymax] rows.
+
+    Provides vectorized versions of the BBox methods that are applied to many boxes at once.
+    Methods return arrays with one value (or row) per box, or a new BBoxArray,
+    and give the same results as calling the BBox method on each box.
+    Indexing with an integer returns a BBox. Slices, index arrays and boolean masks return a BBoxArray.
+
+    boxes = BBoxArray.from_bbox_list(bbox_list)
+    areas = boxes.clip_at_bounds(frame_shape=img.shape).area()
+    """
+    def __init__(self, boxes: np.ndarray=None):
+        boxes = np.asarray(boxes if boxes is not None else np.empty((0, 4)), dtype=np.float64)
+        if boxes.ndim == 1 and len(boxes) == 0:
+            boxes = boxes.reshape(0, 4)
+        if boxes.ndim != 2 or boxes.shape[1] != 4:
+            logger.error(f'Expected an array of shape (N, 4). Got {boxes.shape}')
+            raise ValueError
+        self.boxes = boxes
+
+    def __str__(self):
+        return f"{get_class_string(self)}: (xmin, ymin, xmax, ymax)={self.boxes.tolist()}"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (int, np.integer)):
+            xmin, ymin, xmax, ymax = self.boxes[idx].tolist()
+            return BBox(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+        return BBoxArray(self.boxes[idx])
+
+    def __iter__(self):
+        return iter(self.to_bbox_list())
+
+    def __eq__(self, other: BBoxArray) -> bool:
+        if isinstance(other, BBoxArray):
+            return np.array_equal(self.boxes, other.boxes)
+        else:
+            return NotImplemented
+
+    def _offsets(self, other) -> np.ndarray:
+        if isinstance(other, (int, float)):
+            return np.full(4, other, dtype=np.float64)
+        elif isinstance(other, Point2D):
+            return np.array([other.x, other.y, other.x, other.y], dtype=np.float64)
+        elif isinstance(other, Keypoint2D):
+            return np.array([other.point.x, other.point.y, other.point.x, other.point.y], dtype=np.float64)
+        else:
+            logger.error(f'Cannot offset BBoxArray by {type(other)}')
+            raise TypeError
+
+    def __add__(self, other) -> BBoxArray:
+        return BBoxArray(self.boxes + self._offsets(other))
+
+    def __sub__(self, other) -> BBoxArray:
+        return BBoxArray(self.boxes - self._offsets(other))
+
+    def __mul__(self, other) -> BBoxArray:
+        if isinstance(other, (int, float)):
+            return BBoxArray(self.boxes * other)
+        else:
+            logger.error(f'Cannot multiply {type(other)} with BBoxArray')
+            raise TypeError
+
+    def __truediv__(self, other) -> BBoxArray:
+        if isinstance(other, (int, float)):
+            return BBoxArray(self.boxes / other)
+        else:
+            logger.error(f'Cannot divide {type(other)} from BBoxArray')
+            raise TypeError
+
+    def copy(self) -> BBoxArray:
+        return BBoxArray(self.boxes.copy())
+
+    @classmethod
+    def from_bbox_list(cls, bbox_list: List[BBox]) -> BBoxArray:
+        coords = np.fromiter(
+            chain.from_iterable([(bbox.xmin, bbox.ymin, bbox.xmax, bbox.ymax) for bbox in bbox_list]),
+            dtype=np.float64, count=4 * len(bbox_list)
+        )
+        return BBoxArray(coords.reshape(-1, 4))
+
+    def to_bbox_list(self) -> List[BBox]:
+        return [BBox(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax) for xmin, ymin, xmax, ymax in self.boxes.tolist()]
+
+    def to_numpy(self, output_format: str='pminpmax') -> np.ndarray:
+        """
+        output_format options:
+            'pminpmax': [xmin, ymin, xmax, ymax] rows
+            'pminsize': [xmin, ymin, width, height] rows
+        """
+        check_value(output_format, valid_value_list=['pminpmax', 'pminsize'])
+        if output_format == 'pminpmax':
+            return self.boxes.copy()
+        elif output_format == 'pminsize':
+            return np.concatenate([self.boxes[:, :2], self.boxes[:, 2:] - self.boxes[:, :2]], axis=1)
+        else:
+            raise Exception
+
+    @classmethod
+    def from_numpy(cls, arr: np.ndarray, input_format: str='pminpmax') -> BBoxArray:
+        """
+        input_format options:
+            'pminpmax': [xmin, ymin, xmax, ymax] rows
+            'pminsize': [xmin, ymin, width, height] rows
+        """
+        check_value(input_format, valid_value_list=['pminpmax', 'pminsize'])
+        arr = BBoxArray(arr).boxes
+        if input_format == 'pminpmax':
+            return BBoxArray(arr.copy())
+        elif input_format == 'pminsize':
+            return BBoxArray(np.concatenate([arr[:, :2], arr[:, :2] + arr[:, 2:]], axis=1))
+        else:
+            raise Exception
+
+    def to_list(self, output_format: str='pminpmax') -> List[list]:
+        return self.to_numpy(output_format=output_format).tolist()
+
+    @classmethod
+    def from_list(cls, bbox_list: List[list], input_format: str='pminpmax') -> BBoxArray:
+        return BBoxArray.from_numpy(np.array(bbox_list, dtype=np.float64).reshape(-1, 4), input_format=input_format)
+
+    def to_int(self) -> BBoxArray:
+        """Truncates the coordinates towards zero as with BBox.to_int. The array stays float64."""
+        return BBoxArray(np.trunc(self.boxes))
+
+    def to_rounded_int(self, special: bool=False) -> BBoxArray:
+        """
+        Rounds the coordinates as with BBox.to_rounded_int. The array stays float64.
+        When special is True, xmin and ymin are rounded down and xmax and ymax are rounded up.
+        """
+        if not special:
+            # Rounds halves to even, as Python's round does.
+            return BBoxArray(np.round(self.boxes))
+        else:
+            return BBoxArray(np.concatenate([np.floor(self.boxes[:, :2]), np.ceil(self.boxes[:, 2:])], axis=1))
+
+    @property
+    def xmin(self) -> np.ndarray:
+        return self.boxes[:, 0]
+
+    @property
+    def ymin(self) -> np.ndarray:
+        return self.boxes[:, 1]
+
+    @property
+    def xmax(self) -> np.ndarray:
+        return self.boxes[:, 2]
+
+    @property
+    def ymax(self) -> np.ndarray:
+        return self.boxes[:, 3]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.xmax - self.xmin
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.ymax - self.ymin
+
+    def area(self) -> np.ndarray:
+        return self.width * self.height
+
+    def shape(self) -> np.ndarray:
+        """
+        return (N, 2) array of [height, width]
+        """
+        return np.stack([self.height, self.width], axis=1)
+
+    def center(self) -> np.ndarray:
+        """
+        return (N, 2) array of [x_center, y_center]
+        """
+        return 0.5 * (self.boxes[:, :2] + self.boxes[:, 2:])
+
+    def aspect_ratio(self) -> np.ndarray:
+        """
+        aspect ratio is height:width
+        """
+        return self.height / self.width
+
+    def resize(self, orig_frame_shape: list, new_frame_shape: list) -> BBoxArray:
+        h, w = orig_frame_shape[:2]
+        target_h, target_w = new_frame_shape[:2]
+        w_scale, h_scale = target_w / w, target_h / h
+        return BBoxArray(self.boxes * np.array([w_scale, h_scale, w_scale, h_scale]))
+
+    def rescale(self, target_shape: list, fixed_points: np.ndarray) -> BBoxArray:
+        """
+        Rescales every box to target_shape ([height, width]) while keeping its fixed point in place, as with BBox.rescale.
+
+        Args:
+            target_shape (list): Either one [height, width] for every box or an (N, 2) array.
+            fixed_points (np.ndarray): Either one [x, y] point for every box or an (N, 2) array.
+                    Each point must be inside of its box.
+        """
+        fixed_points = np.broadcast_to(np.asarray(fixed_points, dtype=np.float64), (len(self), 2))
+        target_shape = np.broadcast_to(np.asarray(target_shape, dtype=np.float64)[..., :2], (len(self), 2))
+        outside = np.any((fixed_points < self.boxes[:, :2]) | (fixed_points > self.boxes[:, 2:]), axis=1)
+        if outside.any():
+            idx = int(np.flatnonzero(outside)[0])
+            logger.error(f"fixed point {fixed_points[idx].tolist()} not inside bbox {self[idx]}")
+            raise Exception
+        # [w_scale_factor, h_scale_factor]
+        scale_factors = target_shape[:, ::-1] / (self.boxes[:, 2:] - self.boxes[:, :2])
+        new_pmin = fixed_points - (fixed_points - self.boxes[:, :2]) * scale_factors
+        new_pmax = fixed_points + (self.boxes[:, 2:] - fixed_points) * scale_factors
+        return BBoxArray(np.concatenate([new_pmin, new_pmax], axis=1))
+
+    def clip_at_bounds(self, frame_shape: list) -> BBoxArray:
+        """
+        Same as BBox.clip_at_bounds: negative coordinates become 0,
+        and coordinates at or beyond the frame's width or height become width - 1 or height - 1.
+        """
+        frame_h, frame_w = frame_shape[:2]
+        limits = np.array([frame_w, frame_h, frame_w, frame_h], dtype=np.float64)
+        boxes = np.where(self.boxes >= limits, limits - 1, self.boxes)
+        return BBoxArray(np.where(self.boxes < 0, 0.0, boxes))
+
+    def scale_about_center(self, scale_factor: float, frame_shape: list) -> BBoxArray:
+        frame_h, frame_w = frame_shape[:2]
+        deltas = (self.boxes[:, 2:] - self.boxes[:, :2]) * (scale_factor - 1.0) / 2
+        boxes = np.concatenate([self.boxes[:, :2] - deltas, self.boxes[:, 2:] + deltas], axis=1)
+        return BBoxArray(boxes).clip_at_bounds(frame_shape=[frame_h, frame_w])
+
+    def crop_from(self, img: np.ndarray) -> List[np.ndarray]:
+        """The crops of every box from img, as with BBox.crop_from."""
+        if len(img.shape) not in [2, 3]:
+            logger.error(f'Expected len(img.shape) to be either 2 or 3. Encountered len(img.shape) == {len(img.shape)}')
+            raise Exception
+        return [
+            img[ymin:ymax, xmin:xmax]
+            for xmin, ymin, xmax, ymax in self.boxes.astype(np.int64).tolist()
+        ]
+
+    def is_valid(self) -> np.ndarray:
+        return (self.xmin < self.xmax) & (self.ymin < self.ymax)
+
+    def _other_boxes(self, other) -> np.ndarray:
+        if isinstance(other, BBox):
+            return np.array([[other.xmin, other.ymin, other.xmax, other.ymax]], dtype=np.float64)
+        elif isinstance(other, BBoxArray):
+            if len(other) != len(self):
+                logger.error(f'Expected {len(self)} boxes. Got {len(other)}')
+                raise ValueError
+            return other.boxes
+        else:
+            logger.error(f'Cannot intersect BBoxArray with {type(other)}')
+            raise TypeError
+
+    def intersect_with(self, other, check_valid: bool=True) -> BBoxArray:
+        """
+        The intersection of every box with a BBox, or with the box at the same position of another BBoxArray.
+        When check_valid is True, an exception is raised if any intersection is empty.
+        """
+        other_boxes = self._other_boxes(other)
+        result = BBoxArray(np.concatenate([
+            np.maximum(self.boxes[:, :2], other_boxes[:, :2]),
+            np.minimum(self.boxes[:, 2:], other_boxes[:, 2:])
+        ], axis=1))
+        if check_valid and not result.is_valid().all():
+            idx = int(np.flatnonzero(~result.is_valid())[0])
+            logger.error(f'Result of intersection is invalid.')
+            logger.error(f'result: {result[idx]}')
+            logger.error(f'The two bounding boxes are likely not overlapping.')
+            raise Exception
+        return result
+
+    def iou(self, other) -> np.ndarray:
+        """The IoU of every box with a BBox, or with the box at the same position of another BBoxArray."""
+        other_boxes = BBoxArray(np.broadcast_to(self._other_boxes(other), self.boxes.shape))
+        intersection = self.intersect_with(other_boxes, check_valid=False)
+        intersection_area = np.where(intersection.is_valid(), intersection.area(), 0.0)
+        union_area = self.area() + (other_boxes.area() - intersection_area)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(intersection.is_valid(), intersection_area / union_area, 0.0)
+
+    def iou_matrix(self, other, metric: str='iou') -> np.ndarray:
+        """The (N, M) overlap of every box with every box of other. See iou_matrix."""
+        return iou_matrix(self, other, metric=metric)
+
+def as_bbox_array(boxes) -> BBoxArray:
+    """Converts a BBoxArray, a list of BBox or an (N, 4) array of [xmin, ymin, xmax, ymax] rows into a BBoxArray."""
+    if isinstance(boxes, BBoxArray):
+        return boxes
+    elif isinstance(boxes, np.ndarray):
+        return BBoxArray(boxes)
+    elif isinstance(boxes, (list, tuple)):
+        if len(boxes) > 0 and isinstance(boxes[0], BBox):
+            return BBoxArray.from_bbox_list(boxes)
+        return BBoxArray.from_list(boxes)
+    else:
+        logger.error(f'Cannot convert {type(boxes)} to BBoxArray')
+        raise TypeError
+
+def _overlap_block(boxes_a: np.ndarray, boxes_b: np.ndarray, metric: str) -> np.ndarray:
+    # The operations are the same as in BBox.intersect_with and BBox.iou, so that the results are identical.
+    # Widths and heights of the intersections, with 0 for pairs that don't intersect.
+    intersection_w = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    intersection_w -= np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    np.maximum(intersection_w, 0.0, out=intersection_w)
+    intersection_h = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection_h -= np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    np.maximum(intersection_h, 0.0, out=intersection_h)
+    intersection_area = np.multiply(intersection_w, intersection_h, out=intersection_w)
+    valid = intersection_area > 0
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    if metric == 'ios':
+        smaller_area = np.minimum(area_a[:, None], area_b[None, :])
+        return np.divide(intersection_area, smaller_area, out=np.zeros_like(intersection_area), where=valid)
+    union_area = np.subtract(area_b[None, :], intersection_area, out=intersection_h)
+    union_area += area_a[:, None]
+    iou = np.divide(intersection_area, union_area, out=np.zeros_like(intersection_area), where=valid)
+    if metric == 'iou':
+        return iou
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Smallest box that encloses both boxes
+        exmin = np.minimum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+        eymin = np.minimum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+        exmax = np.maximum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+        eymax = np.maximum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+        if metric == 'giou':
+            enclosing_area = (exmax - exmin) * (eymax - eymin)
+            penalty = np.where(enclosing_area > 0, (enclosing_area - union_area) / enclosing_area, 0.0)
+        elif metric == 'diou':
+            diagonal_sq = (exmax - exmin)**2 + (eymax - eymin)**2
+            center_dx = 0.5 * (boxes_a[:, None, 0] + boxes_a[:, None, 2]) - 0.5 * (boxes_b[None, :, 0] + boxes_b[None, :, 2])
+            center_dy = 0.5 * (boxes_a[:, None, 1] + boxes_a[:, None, 3]) - 0.5 * (boxes_b[None, :, 1] + boxes_b[None, :, 3])
+            penalty = np.where(diagonal_sq > 0, (center_dx**2 + center_dy**2) / diagonal_sq, 0.0)
+        else:
+            raise Exception
+        return iou - penalty
+
+def iou_matrix(boxes_a, boxes_b, metric: str='iou', block_size: int=2**16) -> np.ndarray:
+    """
+    Pairwise overlap between two collections of boxes, as an (N, M) float64 array.
+
+    metric options:
+        'iou': Intersection over union. Identical to boxes_a[i].iou(boxes_b[j]).
+        'giou': Generalized IoU, which subtracts the part of the smallest enclosing box
+                that isn't covered by the union. Between -1 and 1.
+        'diou': Distance IoU, which subtracts the squared distance between the centers
+                divided by the squared diagonal of the smallest enclosing box. Between -1 and 1.
+        'ios': Intersection over the area of the smaller box, e.g. to find boxes nested in other boxes.
+
+    Args:
+        boxes_a, boxes_b: BBoxArray, lists of BBox or (N, 4) arrays of [xmin, ymin, xmax, ymax] rows.
+        metric (str, optional): See above. Defaults to 'iou'.
+        block_size (int, optional): The maximum number of pairs that are computed at once.
+                Large inputs are processed in blocks of rows to cap the memory used by intermediate arrays.
+                Blocks that fit in the CPU cache are faster than a single large block. Defaults to 2**16.
+    """
+    check_value(metric, valid_value_list=['iou', 'giou', 'diou', 'ios'])
+    boxes_a, boxes_b = as_bbox_array(boxes_a).boxes, as_bbox_array(boxes_b).boxes
+    result = np.empty((len(boxes_a), len(boxes_b)), dtype=np.float64)
+    if result.size == 0:
+        return result
+    rows_per_block = max(1, block_size // len(boxes_b))
+    for start in range(0, len(boxes_a), rows_per_block):
+        result[start:start + rows_per_block] = _overlap_block(boxes_a[start:start + rows_per_block], boxes_b, metric)
+    return result
@@ -0,0 +1,288 @@
+from __future__ import annotations
+from typing import List, Tuple
+from math import floor, sqrt
+import numpy as np
+
+from logger import logger
+from ..check_utils import check_value
+from .bbox import BBox, BBoxArray, as_bbox_array
+from .point import Point2D
+from .nms import overlapping_pairs
+
+# Grid cell coordinates are clipped to this range so that they can be packed into one int64 key.
+cell_limit = 2**30
+
+def _cell_keys(cell_x: np.ndarray, cell_y: np.ndarray) -> np.ndarray:
+    cell_x = np.clip(cell_x, -cell_limit, cell_limit - 1) + cell_limit
+    cell_y = np.clip(cell_y, -cell_limit, cell_limit - 1) + cell_limit
+    return cell_x * (2 * cell_limit) + cell_y
+
+def _region_coords(region) -> Tuple[float, float, float, float]:
+    if isinstance(region, BBox):
+        return float(region.xmin), float(region.ymin), float(region.xmax), float(region.ymax)
+    xmin, ymin, xmax, ymax = [float(value) for value in region]
+    return xmin, ymin, xmax, ymax
+
+def _matches(boxes: np.ndarray, region: Tuple[float, float, float, float], predicate: str) -> np.ndarray:
+    """Vectorized boxes[i].<predicate>(region), with the same comparisons as the BBox methods."""
+    xmin, ymin, xmax, ymax = region
+    box_xmin, box_ymin, box_xmax, box_ymax = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    if predicate == 'intersects':
+        # BBox.intersect_with(region, check_valid=False).is_valid()
+        return (np.maximum(box_xmin, xmin) < np.minimum(box_xmax, xmax)) & (np.maximum(box_ymin, ymin) < np.minimum(box_ymax, ymax))
+    elif predicate == 'is_inside_of':
+        return (xmin <= box_xmin) & (box_xmax <= xmax) & (ymin <= box_ymin) & (box_ymax <= ymax)
+    elif predicate == 'encloses':
+        return (box_xmin <= xmin) & (xmax <= box_xmax) & (box_ymin <= ymin) & (ymax <= box_ymax)
+    elif predicate == 'center_is_inside_of':
+        center_x, center_y = 0.5 * (box_xmin + box_xmax), 0.5 * (box_ymin + box_ymax)
+        return (xmin <= center_x) & (center_x <= xmax) & (ymin <= center_y) & (center_y <= ymax)
+    elif predicate == 'overlaps_with':
+        x_overlaps = ((xmin < box_xmin) & (box_xmin < xmax)) | ((xmin < box_xmax) & (box_xmax < xmax))
+        y_overlaps = ((ymin < box_ymin) & (box_ymin < ymax)) | ((ymin < box_ymax) & (box_ymax < ymax))
+        return x_overlaps | y_overlaps
+    else:
+        raise Exception
+
+class BBoxIndex:
+    """
+    Spatial index of bounding boxes for region queries, nearest-center queries and overlapping pairs.
+
+    Each box is stored in one cell of a uniform grid whose cells are at least as large as the box.
+    There is one grid per power-of-two box size, starting at cell_size, so that large boxes don't
+    force large cells on small ones. A query only looks at the cells near the query region,
+    and the candidates are checked with the same comparisons as the corresponding BBox predicates,
+    so the results are identical to filtering every box with the BBox method.
+
+    Every box gets an integer id, which stays the same until the box is removed.
+    Inserted boxes are scanned by every query until there are enough of them to rebuild the grids.
+    Removed boxes are skipped, and the grids are rebuilt once half of their boxes were removed.
+
+    index = BBoxIndex(detections)
+    ids = index.query(tile_bbox, predicate='intersects')
+    nearest_ids = index.nearest(Point2D(x=100, y=200), k=5)
+    """
+    predicates = ['intersects', 'is_inside_of', 'encloses', 'center_is_inside_of', 'overlaps_with']
+
+    def __init__(self, boxes=None, cell_size: float=None, min_rebuild_size: int=256, rebuild_fraction: float=0.25):
+        """
+        Args:
+            boxes (optional): A BBoxArray, a list of BBox or an (N, 4) array to bulk-build the index from.
+                    Their ids are 0 to N - 1.
+            cell_size (float, optional): The cell size of the finest grid.
+                    Defaults to the median size of the boxes at each rebuild.
+            min_rebuild_size (int, optional), rebuild_fraction (float, optional):
+                    The grids are rebuilt when more than max(min_rebuild_size, rebuild_fraction * number of boxes
+                    in the grids) boxes were inserted since the last rebuild. Defaults to 256 and 0.25.
+        """
+        self.cell_size = cell_size
+        self.min_rebuild_size = min_rebuild_size
+        self.rebuild_fraction = rebuild_fraction
+        self._boxes = np.empty((0, 4), dtype=np.float64)
+        self._is_alive = np.empty(0, dtype=np.bool_)
+        self._num_slots = 0
+        self._num_alive = 0
+        self._levels = []
+        self._num_indexed = 0
+        self._num_removed_from_grid = 0
+        self._unindexed_ids = np.empty(0, dtype=np.int64)
+        self._center_bounds = None
+        if boxes is not None:
+            self.insert_all(boxes)
+            self.rebuild()
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}(num_boxes={len(self)}, num_levels={len(self._levels)})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return self._num_alive
+
+    def __contains__(self, box_id: int) -> bool:
+        return 0 <= box_id < self._num_slots and bool(self._is_alive[box_id])
+
+    def _check_id(self, box_id: int):
+        if box_id not in self:
+            logger.error(f'There is no box with id {box_id} in the index.')
+            raise KeyError(box_id)
+
+    def __getitem__(self, box_id: int) -> BBox:
+        self._check_id(box_id)
+        xmin, ymin, xmax, ymax = self._boxes[box_id].tolist()
+        return BBox(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """The ids of the boxes in the index, in increasing order."""
+        return np.flatnonzero(self._is_alive[:self._num_slots])
+
+    @property
+    def boxes(self) -> BBoxArray:
+        """The boxes in the index, in the order of ids."""
+        return BBoxArray(self._boxes[self.ids])
+
+    def insert(self, bbox: BBox) -> int:
+        """Adds a box (a BBox or [xmin, ymin, xmax, ymax]) and returns its id."""
+        return int(self.insert_all(BBoxArray([list(_region_coords(bbox))]))[0])
+
+    def insert_all(self, boxes) -> np.ndarray:
+        """Adds several boxes and returns their ids."""
+        boxes = as_bbox_array(boxes).boxes
+        end = self._num_slots + len(boxes)
+        if end > len(self._boxes):
+            capacity = max(end, 2 * len(self._boxes))
+            self._boxes = np.concatenate([self._boxes, np.empty((capacity - len(self._boxes), 4))])
+            self._is_alive = np.concatenate([self._is_alive, np.zeros(capacity - len(self._is_alive), dtype=np.bool_)])
+        ids = np.arange(self._num_slots, end)
+        self._boxes[ids] = boxes
+        self._is_alive[ids] = True
+        self._num_slots = end
+        self._num_alive += len(ids)
+        self._update_center_bounds(boxes)
+        if self._num_slots - self._num_indexed > max(self.min_rebuild_size, self.rebuild_fraction * self._num_indexed):
+            self.rebuild()
+        return ids
+
+    def remove(self, box_id: int):
+        self._check_id(box_id)
+        self._is_alive[box_id] = False
+        self._num_alive -= 1
+        if box_id < self._num_indexed:
+            self._num_removed_from_grid += 1
+            if self._num_removed_from_grid > self._num_indexed / 2:
+                self.rebuild()
+
+    def _update_center_bounds(self, boxes: np.ndarray):
+        centers = 0.5 * (boxes[:, :2] + boxes[:, 2:])
+        centers = centers[np.isfinite(centers).all(axis=1)]
+        if len(centers) == 0:
+            return
+        bounds = np.concatenate([centers.min(axis=0), centers.max(axis=0)])
+        if self._center_bounds is not None:
+            bounds = np.concatenate([np.minimum(bounds[:2], self._center_bounds[:2]), np.maximum(bounds[2:], self._center_bounds[2:])])
+        self._center_bounds = bounds
+
+    def rebuild(self):
+        """Rebuilds the grids from every box in the index."""
+        ids = self.ids
+        boxes = self._boxes[ids]
+        self._num_indexed = self._num_slots
+        self._num_removed_from_grid = 0
+        self._levels = []
+        # Inverted and non-finite boxes can't be located in a grid, so they are always scanned.
+        is_gridded = np.isfinite(boxes).all(axis=1) & (boxes[:, 0] <= boxes[:, 2]) & (boxes[:, 1] <= boxes[:, 3])
+        self._unindexed_ids = ids[~is_gridded]
+        ids, boxes = ids[is_gridded], boxes[is_gridded]
+        if len(ids) == 0:
+            return
+        sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+        base_size = self.cell_size if self.cell_size is not None else float(np.median(sizes))
+        base_size = base_size if base_size > 0 else 1.0
+        levels = np.zeros(len(ids), dtype=np.int64)
+        is_large = sizes > base_size
+        levels[is_large] = np.ceil(np.log2(sizes[is_large] / base_size)).astype(np.int64)
+        levels[is_large & (base_size * 2.0**levels < sizes)] += 1
+        for level in np.unique(levels).tolist():
+            cell_size = base_size * 2.0**level
+            level_ids = ids[levels == level]
+            cells = np.floor(boxes[levels == level, :2] / cell_size)
+            keys = _cell_keys(cells[:, 0].astype(np.int64), cells[:, 1].astype(np.int64))
+            order = np.argsort(keys, kind='stable')
+            self._levels.append((cell_size, keys[order], level_ids[order]))
+
+    def _candidates(self, region: Tuple[float, float, float, float]) -> np.ndarray:
+        xmin, ymin, xmax, ymax = region
+        low_x, high_x = min(xmin, xmax), max(xmin, xmax)
+        low_y, high_y = min(ymin, ymax), max(ymin, ymax)
+        candidate_list = [self._unindexed_ids, np.arange(self._num_indexed, self._num_slots)]
+        if not np.isfinite([low_x, high_x, low_y, high_y]).all():
+            candidate_list = [self.ids]
+        else:
+            for cell_size, keys, level_ids in self._levels:
+                # Boxes of this level that can match the region start less than one cell before it.
+                # One more cell is added to account for rounding.
+                first_x, last_x = floor(low_x / cell_size) - 2, floor(high_x / cell_size)
+                first_y, last_y = floor(low_y / cell_size) - 2, floor(high_y / cell_size)
+                if last_x - first_x + 1 > len(keys):
+                    candidate_list.append(level_ids)
+                    continue
+                columns = np.arange(first_x, last_x + 1)
+                starts = np.searchsorted(keys, _cell_keys(columns, np.full(len(columns), first_y)), side='left')
+                ends = np.searchsorted(keys, _cell_keys(columns, np.full(len(columns), last_y)), side='right')
+                counts = ends - starts
+                positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+                candidate_list.append(level_ids[positions])
+        candidates = np.concatenate(candidate_list)
+        return candidates[self._is_alive[candidates]]
+
+    def query(self, region, predicate: str='intersects') -> np.ndarray:
+        """
+        The ids of the boxes for which box.<predicate>(region) is True, in increasing order.
+
+        predicate options:
+            'intersects': The intersection of the box and the region has a positive area,
+                    i.e. box.intersect_with(region, check_valid=False).is_valid().
+            'is_inside_of', 'encloses', 'center_is_inside_of': The BBox methods of the same name.
+            'overlaps_with': BBox.overlaps_with, which is also True for boxes that only share
+                    an x range or a y range with the region. These boxes aren't close to the region,
+                    so every box is checked (with a single vectorized pass).
+
+        Args:
+            region: A BBox or [xmin, ymin, xmax, ymax].
+            predicate (str, optional): Defaults to 'intersects'.
+        """
+        check_value(predicate, valid_value_list=self.predicates)
+        region = _region_coords(region)
+        candidates = self.ids if predicate == 'overlaps_with' else self._candidates(region)
+        matches = candidates[_matches(self._boxes[candidates], region, predicate)]
+        return np.sort(matches)
+
+    def nearest(self, point, k: int=1) -> np.ndarray:
+        """
+        The ids of the k boxes whose centers (as in BBox.center) are closest to point,
+        from closest to farthest. Ties are broken by id.
+        Boxes whose center is not finite are skipped, so fewer than k ids can be returned.
+
+        Args:
+            point: A Point2D, [x, y], or a BBox whose center is used.
+            k (int, optional): Defaults to 1.
+        """
+        if isinstance(point, BBox):
+            point_x, point_y = point.center()
+        elif isinstance(point, Point2D):
+            point_x, point_y = point.x, point.y
+        else:
+            point_x, point_y = point
+        point_x, point_y = float(point_x), float(point_y)
+        if not (np.isfinite(point_x) and np.isfinite(point_y)):
+            logger.error(f'The point must be finite. Got [{point_x}, {point_y}]')
+            raise ValueError
+        k = min(k, len(self))
+        if k <= 0 or self._center_bounds is None:
+            return np.empty(0, dtype=np.int64)
+        min_x, min_y, max_x, max_y = self._center_bounds.tolist()
+        # Every finite center is within max_radius of the point.
+        max_radius = sqrt(max(abs(point_x - min_x), abs(point_x - max_x))**2 + max(abs(point_y - min_y), abs(point_y - max_y))**2)
+        area = max((max_x - min_x) * (max_y - min_y), 1e-12)
+        radius = max(sqrt(k * area / len(self)), 1e-12)
+        while True:
+            # Centers within radius are inside of the square around the point, so the k nearest are found
+            # once at least k of the centers in the square are within radius.
+            candidates = self.query([point_x - radius, point_y - radius, point_x + radius, point_y + radius], predicate='center_is_inside_of')
+            centers = 0.5 * (self._boxes[candidates, :2] + self._boxes[candidates, 2:])
+            distances = np.sqrt((centers[:, 0] - point_x)**2 + (centers[:, 1] - point_y)**2)
+            if np.count_nonzero(distances <= radius) >= k or radius >= max_radius:
+                order = np.lexsort((candidates, distances))
+                return candidates[order[:k]]
+            radius *= 2
+
+    def overlapping_pairs(self, iou_threshold: float=0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every pair of boxes in the index whose IoU is greater than iou_threshold.
+        Returns the ids of the first and second box of every pair and their IoU. See nms.overlapping_pairs.
+        """
+        ids = self.ids
+        first, second, ious = overlapping_pairs(self._boxes[ids], iou_threshold=iou_threshold)
+        return ids[first], ids[second], ious
@@ -0,0 +1,203 @@
+from __future__ import annotations
+from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from logger import logger
+from ..check_utils import check_value
+from .bbox import as_bbox_array, iou_matrix
+from .nms import _check_scores, _check_class_ids, _score_order
+
+class BoxMatches:
+    """
+    The matches between the GT boxes and the predicted boxes of a frame, at one or more IoU thresholds.
+
+    gt_match[t, j] is the index of the prediction matched with GT box j at iou_thresholds[t], or -1.
+    pred_match[t, i] is the index of the GT box matched with prediction i at iou_thresholds[t], or -1.
+    Matched predictions are true positives, the other predictions are false positives,
+    and the GT boxes without a match are false negatives.
+    """
+    def __init__(self, iou_thresholds: np.ndarray, gt_match: np.ndarray, pred_match: np.ndarray, ious: np.ndarray):
+        self.iou_thresholds = iou_thresholds
+        self.gt_match = gt_match
+        self.pred_match = pred_match
+        self.ious = ious
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}(iou_thresholds={self.iou_thresholds.tolist()}, num_tp={self.num_tp.tolist()}, num_fp={self.num_fp.tolist()}, num_fn={self.num_fn.tolist()})'
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def num_gt(self) -> int:
+        return self.gt_match.shape[1]
+
+    @property
+    def num_pred(self) -> int:
+        return self.pred_match.shape[1]
+
+    @property
+    def tp(self) -> np.ndarray:
+        """(num_thresholds, num_pred) bool array of the predictions that were matched."""
+        return self.pred_match >= 0
+
+    @property
+    def fp(self) -> np.ndarray:
+        """(num_thresholds, num_pred) bool array of the predictions that weren't matched."""
+        return self.pred_match < 0
+
+    @property
+    def fn(self) -> np.ndarray:
+        """(num_thresholds, num_gt) bool array of the GT boxes that weren't matched."""
+        return self.gt_match < 0
+
+    @property
+    def num_tp(self) -> np.ndarray:
+        return self.tp.sum(axis=1)
+
+    @property
+    def num_fp(self) -> np.ndarray:
+        return self.fp.sum(axis=1)
+
+    @property
+    def num_fn(self) -> np.ndarray:
+        return self.fn.sum(axis=1)
+
+    @property
+    def matched_ious(self) -> np.ndarray:
+        """(num_thresholds, num_pred) IoU of every prediction with its matched GT box, or NaN."""
+        pred_idx = np.broadcast_to(np.arange(self.num_pred), self.pred_match.shape)
+        matched_ious = self.ious[pred_idx, np.maximum(self.pred_match, 0)] if self.num_gt > 0 else np.zeros(self.pred_match.shape)
+        return np.where(self.tp, matched_ious, np.nan)
+
+def _check_iou_thresholds(iou_thresholds) -> np.ndarray:
+    iou_thresholds = np.atleast_1d(np.asarray(iou_thresholds, dtype=np.float64))
+    if iou_thresholds.ndim != 1 or len(iou_thresholds) == 0 or not ((iou_thresholds > 0) & (iou_thresholds <= 1)).all():
+        logger.error(f'IoU thresholds must be between 0 (exclusive) and 1. Got {iou_thresholds.tolist()}')
+        raise ValueError
+    return iou_thresholds
+
+def _greedy_match(valid_ious: np.ndarray, order: np.ndarray, iou_thresholds: np.ndarray):
+    num_pred, num_gt = valid_ious.shape
+    num_thresholds = len(iou_thresholds)
+    gt_match = np.full((num_thresholds, num_gt), -1, dtype=np.int64)
+    pred_match = np.full((num_thresholds, num_pred), -1, dtype=np.int64)
+    if num_gt == 0:
+        return gt_match, pred_match
+    # All thresholds are resolved together, one prediction at a time.
+    # Predictions that can't be matched at any threshold are skipped.
+    threshold_idx = np.arange(num_thresholds)
+    min_threshold = iou_thresholds.min()
+    order = order[valid_ious.max(axis=1)[order] >= min_threshold]
+    for pred_idx in order.tolist():
+        row = valid_ious[pred_idx]
+        is_available = (gt_match < 0) & (row[None, :] >= iou_thresholds[:, None])
+        best = np.where(is_available, row[None, :], -1.0).argmax(axis=1)
+        is_matched = is_available[threshold_idx, best]
+        gt_match[threshold_idx[is_matched], best[is_matched]] = pred_idx
+        pred_match[is_matched, pred_idx] = best[is_matched]
+    return gt_match, pred_match
+
+def _hungarian_match(valid_ious: np.ndarray, iou_thresholds: np.ndarray):
+    num_pred, num_gt = valid_ious.shape
+    gt_match = np.full((len(iou_thresholds), num_gt), -1, dtype=np.int64)
+    pred_match = np.full((len(iou_thresholds), num_pred), -1, dtype=np.int64)
+    for t, iou_threshold in enumerate(iou_thresholds.tolist()):
+        weights = np.where(valid_ious >= iou_threshold, valid_ious, 0.0)
+        # Only the rows and columns with at least one valid pair take part in the assignment.
+        pred_idx = np.flatnonzero(weights.max(axis=1, initial=0.0) > 0)
+        gt_idx = np.flatnonzero(weights.max(axis=0, initial=0.0) > 0)
+        if len(pred_idx) == 0:
+            continue
+        weights = weights[np.ix_(pred_idx, gt_idx)]
+        rows, cols = linear_sum_assignment(weights, maximize=True)
+        is_valid = weights[rows, cols] > 0
+        rows, cols = pred_idx[rows[is_valid]], gt_idx[cols[is_valid]]
+        gt_match[t, cols] = rows
+        pred_match[t, rows] = cols
+    return gt_match, pred_match
+
+def match_boxes(
+    gt_boxes, pred_boxes, pred_scores=None, gt_class_ids=None, pred_class_ids=None,
+    iou_thresholds=0.5, method: str='greedy'
+) -> BoxMatches:
+    """
+    Matches the predicted boxes of a frame with its GT boxes at one or more IoU thresholds.
+    A prediction and a GT box can be matched when their IoU is at least the threshold
+    and, when class ids are given, when they have the same class.
+
+    method options:
+        'greedy': Predictions are matched in descending order of score (as in COCO and Pascal VOC evaluation),
+                each with the available GT box that it overlaps the most. Ties are broken by index.
+                Without scores, predictions are matched in their order.
+        'hungarian': An optimal assignment that maximizes the total IoU of the matched pairs, ignoring scores.
+
+    The IoU matrix is computed once and every threshold is resolved in the same pass.
+
+    Args:
+        gt_boxes, pred_boxes: BBoxArray, lists of BBox or (N, 4) arrays of [xmin, ymin, xmax, ymax] rows.
+        pred_scores (optional): The score of every prediction. Defaults to None.
+        gt_class_ids, pred_class_ids (optional): The class of every box. Both or neither must be given.
+        iou_thresholds (optional): A threshold or a list of thresholds in (0, 1]. Defaults to 0.5.
+        method (str, optional): See above. Defaults to 'greedy'.
+    """
+    check_value(method, valid_value_list=['greedy', 'hungarian'])
+    iou_thresholds = _check_iou_thresholds(iou_thresholds)
+    gt_boxes, pred_boxes = as_bbox_array(gt_boxes), as_bbox_array(pred_boxes)
+    if (gt_class_ids is None) != (pred_class_ids is None):
+        logger.error(f'Either both or neither of gt_class_ids and pred_class_ids must be given.')
+        raise ValueError
+    ious = iou_matrix(pred_boxes, gt_boxes)
+    valid_ious = ious
+    if gt_class_ids is not None:
+        gt_class_ids = _check_class_ids(len(gt_boxes), gt_class_ids)
+        pred_class_ids = _check_class_ids(len(pred_boxes), pred_class_ids)
+        valid_ious = np.where(pred_class_ids[:, None] == gt_class_ids[None, :], ious, 0.0)
+    if method == 'greedy':
+        order = _score_order(_check_scores(pred_boxes, pred_scores)) if pred_scores is not None else np.arange(len(pred_boxes))
+        gt_match, pred_match = _greedy_match(valid_ious, order, iou_thresholds)
+    else:
+        gt_match, pred_match = _hungarian_match(valid_ious, iou_thresholds)
+    return BoxMatches(iou_thresholds=iou_thresholds, gt_match=gt_match, pred_match=pred_match, ious=ious)
+
+def _match_job(job: tuple, kwargs: dict) -> BoxMatches:
+    # Module level so that it can be sent to worker processes.
+    gt_boxes, pred_boxes, pred_scores, gt_class_ids, pred_class_ids = job
+    return match_boxes(gt_boxes, pred_boxes, pred_scores, gt_class_ids, pred_class_ids, **kwargs)
+
+def match_frames(
+    gt_boxes_list: list, pred_boxes_list: list, pred_scores_list: list=None,
+    gt_class_ids_list: list=None, pred_class_ids_list: list=None,
+    iou_thresholds=0.5, method: str='greedy', num_workers: int=None
+) -> List[BoxMatches]:
+    """
+    match_boxes for every frame. The i-th elements of the lists belong to the i-th frame.
+    When num_workers is greater than 1, the frames are matched in a process pool of this size.
+
+    matches = match_frames(gt_boxes_list, pred_boxes_list, pred_scores_list, iou_thresholds=[0.5, 0.75], num_workers=8)
+    num_tp = sum([frame_matches.num_tp for frame_matches in matches])
+    """
+    check_value(method, valid_value_list=['greedy', 'hungarian'])
+    _check_iou_thresholds(iou_thresholds)
+    num_frames = len(gt_boxes_list)
+    optional_lists = [pred_scores_list, gt_class_ids_list, pred_class_ids_list]
+    for values in [pred_boxes_list] + optional_lists:
+        if values is not None and len(values) != num_frames:
+            logger.error(f'Expected lists of {num_frames} frames. Got a list of {len(values)}')
+            raise ValueError
+    optional_lists = [values if values is not None else repeat(None) for values in optional_lists]
+    jobs = list(zip(gt_boxes_list, pred_boxes_list, *optional_lists))
+    kwargs = {'iou_thresholds': iou_thresholds, 'method': method}
+    if num_workers is not None and num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            return list(
+                executor.map(
+                    _match_job, jobs, repeat(kwargs),
+                    chunksize=max(1, len(jobs) // (4 * num_workers))
+                )
+            )
+    else:
+        return [_match_job(job, kwargs) for job in jobs]
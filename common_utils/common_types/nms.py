@@ -0,0 +1,479 @@
+from __future__ import annotations
+from typing import Tuple
+import heapq
+from math import floor, ceil, log2
+import numpy as np
+
+from logger import logger
+from ..check_utils import check_value
+from .bbox import BBoxArray, as_bbox_array
+
+def _pair_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    # Element-wise IoU with the same operations as iou_matrix, so that the values are identical.
+    intersection_w = np.maximum(np.minimum(boxes_a[:, 2], boxes_b[:, 2]) - np.maximum(boxes_a[:, 0], boxes_b[:, 0]), 0.0)
+    intersection_h = np.maximum(np.minimum(boxes_a[:, 3], boxes_b[:, 3]) - np.maximum(boxes_a[:, 1], boxes_b[:, 1]), 0.0)
+    intersection_area = intersection_w * intersection_h
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union_area = (area_b - intersection_area) + area_a
+    return np.divide(intersection_area, union_area, out=np.zeros_like(intersection_area), where=intersection_area > 0)
+
+def _expand_cells(box_indices: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+    """One (box, cell_x, cell_y) entry for every grid cell that each box covers."""
+    cell_counts_x = hi[:, 0] - lo[:, 0] + 1
+    cell_counts_y = hi[:, 1] - lo[:, 1] + 1
+    counts = cell_counts_x * cell_counts_y
+    local_idx = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    repeated_counts_y = np.repeat(cell_counts_y, counts)
+    entry_boxes = np.repeat(box_indices, counts)
+    cell_x = np.repeat(lo[:, 0], counts) + local_idx // repeated_counts_y
+    cell_y = np.repeat(lo[:, 1], counts) + local_idx % repeated_counts_y
+    return entry_boxes, cell_x, cell_y
+
+def _box_levels(boxes: np.ndarray, valid: np.ndarray):
+    """
+    The base cell size of the grid, and the level of every box:
+    the smallest level whose cells (base size * 2**level) are at least as large as the box.
+    """
+    sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    base_size = float(np.median(sizes[valid])) if valid.any() else 1.0
+    levels = np.zeros(len(boxes), dtype=np.int64)
+    is_large = valid & (sizes > base_size)
+    levels[is_large] = np.ceil(np.log2(sizes[is_large] / base_size)).astype(np.int64)
+    levels[is_large & (base_size * 2.0**levels < sizes)] += 1
+    return base_size, levels
+
+def _grid_pairs(boxes: np.ndarray, iou_threshold: float, block_size: int):
+    # Boxes are stored in a grid for each level, with cells at least as large as the boxes of that level.
+    # The pairs of a box are found at the level of the larger box of the pair, among the boxes that share a cell.
+    # Pairs that share several cells are only counted in the cell that contains the corner
+    # (max xmin, max ymin) of their intersection.
+    # Empty, inverted and non-finite boxes never overlap anything.
+    valid = np.isfinite(boxes).all(axis=1) & (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+    base_size, levels = _box_levels(boxes, valid)
+    first_list, second_list, iou_list = [], [], []
+    for level in np.unique(levels[valid]).tolist():
+        cell_size = base_size * 2.0**level
+        natives = np.flatnonzero(valid & (levels == level))
+        smaller = np.flatnonzero(valid & (levels < level))
+        native_boxes, native_x, native_y = _expand_cells(
+            natives, np.floor(boxes[natives, :2] / cell_size).astype(np.int64),
+            np.floor(boxes[natives, 2:] / cell_size).astype(np.int64)
+        )
+        smaller_boxes, smaller_x, smaller_y = _expand_cells(
+            smaller, np.floor(boxes[smaller, :2] / cell_size).astype(np.int64),
+            np.floor(boxes[smaller, 2:] / cell_size).astype(np.int64)
+        )
+        min_x, min_y = native_x.min(), native_y.min()
+        num_y = native_y.max() - min_y + 1
+        native_keys = (native_x - min_x) * num_y + (native_y - min_y)
+        in_range = (smaller_x >= min_x) & (smaller_x <= native_x.max()) & (smaller_y >= min_y) & (smaller_y < min_y + num_y)
+        smaller_keys = (smaller_x - min_x) * num_y + (smaller_y - min_y)
+        # Smaller boxes are only needed in the cells that contain boxes of this level.
+        shared = in_range & np.isin(smaller_keys, native_keys)
+        entry_boxes = np.concatenate([native_boxes, smaller_boxes[shared]])
+        entry_keys = np.concatenate([native_keys, smaller_keys[shared]])
+        is_native = np.concatenate([np.ones(len(native_boxes), dtype=np.bool_), np.zeros(shared.sum(), dtype=np.bool_)])
+        # Sorted by cell, with the boxes of this level first in each cell.
+        order = np.lexsort((~is_native, entry_keys))
+        entry_boxes, entry_keys, is_native = entry_boxes[order], entry_keys[order], is_native[order]
+        # Coordinates in entry order, so that the pairs below read nearby rows.
+        entry_coords = boxes[entry_boxes]
+        cell_ends = np.searchsorted(entry_keys, entry_keys, side='right')
+        # Each box of this level is paired with the boxes after it in its cell.
+        counts = np.where(is_native, cell_ends - np.arange(len(entry_keys)) - 1, 0)
+        cumulative_counts = np.cumsum(counts)
+        start = 0
+        while start < len(entry_keys):
+            offset = cumulative_counts[start - 1] if start > 0 else 0
+            stop = max(int(np.searchsorted(cumulative_counts, offset + block_size, side='right')), start + 1)
+            block_counts = counts[start:stop]
+            rows = np.repeat(np.arange(start, stop), block_counts)
+            row_starts = np.repeat(np.cumsum(block_counts) - block_counts, block_counts)
+            cols = rows + 1 + (np.arange(len(rows)) - row_starts)
+            coords_a, coords_b = entry_coords[rows], entry_coords[cols]
+            corners = np.floor(np.maximum(coords_a[:, :2], coords_b[:, :2]) / cell_size).astype(np.int64)
+            corner_keys = (corners[:, 0] - min_x) * num_y + (corners[:, 1] - min_y)
+            is_reference_cell = corner_keys == entry_keys[rows]
+            rows, cols = rows[is_reference_cell], cols[is_reference_cell]
+            ious = _pair_iou(coords_a[is_reference_cell], coords_b[is_reference_cell])
+            overlapping = ious > iou_threshold
+            first_list.append(entry_boxes[rows[overlapping]])
+            second_list.append(entry_boxes[cols[overlapping]])
+            iou_list.append(ious[overlapping])
+            start = stop
+    if len(first_list) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(first_list), np.concatenate(second_list), np.concatenate(iou_list)
+
+def _check_class_ids(num_boxes: int, class_ids) -> np.ndarray:
+    class_ids = np.asarray(class_ids)
+    if class_ids.shape != (num_boxes,):
+        logger.error(f'Expected {num_boxes} class ids. Got shape {class_ids.shape}')
+        raise ValueError
+    return class_ids
+
+def overlapping_pairs(boxes, iou_threshold: float=0.0, class_ids=None, block_size: int=2**20) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every pair of boxes whose IoU is greater than iou_threshold, without computing the full IoU matrix.
+
+    Boxes are bucketed in uniform grids whose cells are about as large as the boxes
+    (one grid per power-of-two size, so that large boxes don't slow down the small ones),
+    and only boxes that share a cell are compared.
+    The cost depends on the number of nearby pairs rather than on the square of the number of boxes.
+    Boxes with a non-positive width or height or non-finite coordinates never have a positive IoU, so they are never paired.
+
+    Args:
+        boxes: A BBoxArray, a list of BBox or an (N, 4) array.
+        iou_threshold (float, optional): Pairs with an IoU greater than this (at least 0) are returned.
+                Defaults to 0.0, which returns every pair of intersecting boxes.
+        class_ids (optional): The class of every box. Only boxes of the same class are paired.
+        block_size (int, optional): The maximum number of candidate pairs that are compared at once. Defaults to 2**20.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The indices of the first and second box of every pair, and their IoU.
+    """
+    boxes = as_bbox_array(boxes).boxes
+    if class_ids is None:
+        return _grid_pairs(boxes, iou_threshold, block_size)
+    class_ids = _check_class_ids(len(boxes), class_ids)
+    first_list, second_list, iou_list = [], [], []
+    for class_id in np.unique(class_ids):
+        indices = np.flatnonzero(class_ids == class_id)
+        first, second, ious = _grid_pairs(boxes[indices], iou_threshold, block_size)
+        first_list.append(indices[first])
+        second_list.append(indices[second])
+        iou_list.append(ious)
+    if len(first_list) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(first_list), np.concatenate(second_list), np.concatenate(iou_list)
+
+def _check_scores(boxes: BBoxArray, scores) -> np.ndarray:
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.shape != (len(boxes),):
+        logger.error(f'Expected {len(boxes)} scores. Got shape {scores.shape}')
+        raise ValueError
+    return scores
+
+def _score_order(scores: np.ndarray) -> np.ndarray:
+    # Descending scores. Ties are broken by index.
+    return np.argsort(-scores, kind='stable')
+
+def _greedy_keep(num_boxes: int, higher: np.ndarray, lower: np.ndarray, ranks: np.ndarray, max_rounds: int=16) -> np.ndarray:
+    """
+    Resolves greedy NMS over the edges (higher, lower), where higher has a better rank than lower
+    and suppresses it if it is kept. Returns a boolean mask of the kept boxes.
+    """
+    undecided, kept, suppressed = 0, 1, 2
+    state = np.zeros(num_boxes, dtype=np.int8)
+    # Vectorized rounds: a box is kept once every box that can suppress it is suppressed,
+    # and suppressed once one of them is kept. Each round decides at least the best undecided box.
+    for _ in range(max_rounds):
+        if len(lower) == 0:
+            break
+        is_blocked = np.zeros(num_boxes, dtype=np.bool_)
+        is_blocked[lower[state[higher] != suppressed]] = True
+        state[(state == undecided) & ~is_blocked] = kept
+        is_suppressed = np.zeros(num_boxes, dtype=np.bool_)
+        is_suppressed[lower[state[higher] == kept]] = True
+        state[(state == undecided) & is_suppressed] = suppressed
+        remaining = state[lower] == undecided
+        higher, lower = higher[remaining], lower[remaining]
+    state[(state == undecided) & ~np.isin(np.arange(num_boxes), lower)] = kept
+    if len(lower) > 0:
+        # Long chains of overlapping boxes: finish sequentially in rank order.
+        # Every remaining edge ends at an undecided box.
+        edge_order = np.argsort(higher, kind='stable')
+        higher, lower = higher[edge_order], lower[edge_order]
+        unique_higher, starts = np.unique(higher, return_index=True)
+        suppressed_by = dict(zip(unique_higher.tolist(), [part.tolist() for part in np.split(lower, starts[1:])]))
+        state_list = state.tolist()
+        undecided_boxes = np.flatnonzero(state == undecided)
+        for box_idx in undecided_boxes[np.argsort(ranks[undecided_boxes])].tolist():
+            if state_list[box_idx] != undecided:
+                continue
+            state_list[box_idx] = kept
+            for lower_idx in suppressed_by.get(box_idx, []):
+                if state_list[lower_idx] == undecided:
+                    state_list[lower_idx] = suppressed
+        state = np.array(state_list, dtype=np.int8)
+    return state == kept
+
+def nms(boxes, scores, iou_threshold: float=0.5, class_ids=None) -> np.ndarray:
+    """
+    Greedy non-maximum suppression.
+    Boxes are visited in order of decreasing score, and a box is kept unless its IoU with
+    an already kept box is greater than iou_threshold.
+
+    When class_ids is given, boxes only suppress boxes of the same class (class-aware NMS).
+
+    Only pairs of boxes that overlap are compared (see overlapping_pairs), and the suppression is
+    resolved with vectorized passes over those pairs, so large numbers of small boxes are handled quickly.
+
+    Args:
+        boxes: A BBoxArray, a list of BBox or an (N, 4) array.
+        scores: The score of every box.
+        iou_threshold (float, optional): Defaults to 0.5.
+        class_ids (optional): The class of every box. Defaults to None.
+
+    Returns:
+        np.ndarray: The indices of the kept boxes, in order of decreasing score.
+    """
+    boxes = as_bbox_array(boxes)
+    scores = _check_scores(boxes, scores)
+    order = _score_order(scores)
+    ranks = np.empty(len(boxes), dtype=np.int64)
+    ranks[order] = np.arange(len(boxes))
+    first, second, _ = overlapping_pairs(boxes, iou_threshold=iou_threshold, class_ids=class_ids)
+    first_is_higher = ranks[first] < ranks[second]
+    higher = np.where(first_is_higher, first, second)
+    lower = np.where(first_is_higher, second, first)
+    is_kept = _greedy_keep(len(boxes), higher, lower, ranks)
+    return order[is_kept[order]]
+
+def soft_nms(
+    boxes, scores, iou_threshold: float=0.3, sigma: float=0.5, method: str='linear',
+    score_threshold: float=0.001, class_ids=None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Soft-NMS: instead of removing the boxes that overlap a selected box, their scores are decayed.
+    Boxes are selected in order of their decayed score until the best remaining score is below score_threshold.
+
+    method options:
+        'linear': Scores of boxes whose IoU with the selected box is greater than iou_threshold
+                are multiplied by 1 - IoU.
+        'gaussian': Scores of every overlapping box are multiplied by exp(-IoU^2 / sigma).
+
+    When class_ids is given, boxes only decay the scores of boxes of the same class.
+    The selection is sequential, but each selected box only updates the boxes that overlap it.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The indices of the selected boxes in order of selection, and their decayed scores.
+    """
+    check_value(method, valid_value_list=['linear', 'gaussian'])
+    boxes = as_bbox_array(boxes)
+    scores = _check_scores(boxes, scores)
+    pair_threshold = iou_threshold if method == 'linear' else 0.0
+    first, second, ious = overlapping_pairs(boxes, iou_threshold=pair_threshold, class_ids=class_ids)
+    if method == 'linear':
+        decays = 1.0 - ious
+    else:
+        decays = np.exp(-ious**2 / sigma)
+    # Neighbors of every box in both directions
+    sources = np.concatenate([first, second])
+    targets = np.concatenate([second, first])
+    edge_order = np.argsort(sources, kind='stable')
+    targets, decays = targets[edge_order].tolist(), np.concatenate([decays, decays])[edge_order].tolist()
+    indptr = np.searchsorted(sources[edge_order], np.arange(len(boxes) + 1)).tolist()
+
+    current_scores = scores.tolist()
+    is_selected = [False] * len(boxes)
+    heap = [(-score, box_idx) for box_idx, score in enumerate(current_scores)]
+    heapq.heapify(heap)
+    selected, selected_scores = [], []
+    # Scores only decrease, so every heap entry is an upper bound of the current score of its box.
+    # Decayed boxes are only pushed again when their stale entry reaches the top of the heap.
+    while len(heap) > 0:
+        neg_score, box_idx = heap[0]
+        score = current_scores[box_idx]
+        if -neg_score != score:
+            heapq.heapreplace(heap, (-score, box_idx))
+            continue
+        if score < score_threshold:
+            break
+        heapq.heappop(heap)
+        is_selected[box_idx] = True
+        selected.append(box_idx)
+        selected_scores.append(score)
+        start, stop = indptr[box_idx], indptr[box_idx + 1]
+        for target, decay in zip(targets[start:stop], decays[start:stop]):
+            if not is_selected[target]:
+                current_scores[target] *= decay
+    return np.array(selected, dtype=np.int64), np.array(selected_scores, dtype=np.float64)
+
+def _fuse_boxes(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float):
+    """
+    Clusters boxes that are sorted by decreasing score, as in weighted_box_fusion.
+    Returns the fused box, score sum, maximum score and size of every cluster.
+    """
+    # As in overlapping_pairs, there is a grid for each level, with cells of base_size * 2**level.
+    # Each cluster is stored in the cells covered by its fused box (at most 2 x 2 cells),
+    # in the grid whose cells are at least as large as the fused box, and is moved when its fused box changes.
+    # A box can only overlap the clusters that share one of the cells that it covers in each grid.
+    # Moreover, an IoU greater than iou_threshold requires the sizes of the box and the fused box
+    # to be within a factor of 1 / iou_threshold of each other, so only a few grids are visited.
+    # Empty, inverted and non-finite boxes can't overlap anything, so they are never stored or looked up.
+    inf = float('inf')
+    valid = np.isfinite(boxes).all(axis=1) & (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+    base_size, levels = _box_levels(boxes, valid)
+    # Fused boxes are weighted averages of their boxes, so they are never larger than the largest box.
+    max_level = int(levels.max()) if len(levels) > 0 else 0
+    cell_sizes = [base_size * 2.0**level for level in range(max_level + 2)]
+    box_cell_sizes = base_size * 2.0**levels[:, None]
+    with np.errstate(invalid='ignore'):
+        first_cells = np.where(valid[:, None], np.floor(boxes[:, :2] / box_cell_sizes), 0).astype(np.int64)
+        last_cells = np.where(valid[:, None], np.floor(boxes[:, 2:] / box_cell_sizes), 0).astype(np.int64)
+    box_locations = [
+        (level, first_x, first_y, last_x, last_y) if is_valid else None
+        for is_valid, level, first_x, first_y, last_x, last_y in zip(
+            valid.tolist(), levels.tolist(), first_cells[:, 0].tolist(), first_cells[:, 1].tolist(),
+            last_cells[:, 0].tolist(), last_cells[:, 1].tolist()
+        )
+    ]
+    # The levels whose fused boxes can have an IoU greater than iou_threshold with each box, with some tolerance for rounding.
+    # Fused boxes of level > 0 are larger than half of their cells.
+    sizes = np.where(valid, np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]), base_size)
+    with np.errstate(divide='ignore'):
+        first_levels = np.ceil(np.log2(sizes * max(iou_threshold, 0.0) * (1 - 1e-9) / base_size))
+    if iou_threshold > 0:
+        last_levels = np.floor(np.log2(sizes / iou_threshold * (1 + 1e-9) / base_size)) + 1
+    else:
+        last_levels = np.full(len(boxes), max_level + 1)
+    # Level 0 also holds the fused boxes smaller than its cells, and rounding can make
+    # a fused box slightly larger than its largest box.
+    first_levels = np.clip(first_levels, 0, max_level + 2).astype(np.int64).tolist()
+    last_levels = np.clip(last_levels, 0, max_level + 1).astype(np.int64).tolist()
+    grids = {}
+    locations = []
+
+    def locate(box: list):
+        xmin, ymin, xmax, ymax = box
+        if not (-inf < xmin < xmax < inf and -inf < ymin < ymax < inf):
+            return None
+        size = max(xmax - xmin, ymax - ymin)
+        level = 0
+        if size > base_size:
+            level = ceil(log2(size / base_size))
+            if base_size * 2.0**level < size:
+                level += 1
+        cell_size = base_size * 2.0**level
+        return level, floor(xmin / cell_size), floor(ymin / cell_size), floor(xmax / cell_size), floor(ymax / cell_size)
+
+    def move(cluster: int, location: tuple):
+        old_location = locations[cluster]
+        if location == old_location:
+            return
+        if old_location is not None:
+            level, first_x, first_y, last_x, last_y = old_location
+            cells = grids[level]
+            for cell_x in range(first_x, last_x + 1):
+                for cell_y in range(first_y, last_y + 1):
+                    clusters = cells[(cell_x, cell_y)]
+                    clusters.discard(cluster)
+                    if len(clusters) == 0:
+                        del cells[(cell_x, cell_y)]
+        if location is not None:
+            level, first_x, first_y, last_x, last_y = location
+            cells = grids.setdefault(level, {})
+            for cell_x in range(first_x, last_x + 1):
+                for cell_y in range(first_y, last_y + 1):
+                    cells.setdefault((cell_x, cell_y), set()).add(cluster)
+        locations[cluster] = location
+
+    fused, weighted_sums, score_sums, max_scores, counts = [], [], [], [], []
+    for box, score, box_location, first_level, last_level in zip(boxes.tolist(), scores.tolist(), box_locations, first_levels, last_levels):
+        xmin, ymin, xmax, ymax = box
+        candidates = set()
+        if box_location is not None:
+            for level in range(first_level, last_level + 1):
+                cells = grids.get(level)
+                if not cells:
+                    continue
+                cell_size = cell_sizes[level]
+                first_x, last_x = floor(xmin / cell_size), floor(xmax / cell_size)
+                first_y, last_y = floor(ymin / cell_size), floor(ymax / cell_size)
+                if (last_x - first_x + 1) * (last_y - first_y + 1) > len(cells):
+                    # A large box in a fine grid: visiting the occupied cells is faster.
+                    for (cell_x, cell_y), clusters in cells.items():
+                        if first_x <= cell_x <= last_x and first_y <= cell_y <= last_y:
+                            candidates.update(clusters)
+                else:
+                    for cell_x in range(first_x, last_x + 1):
+                        for cell_y in range(first_y, last_y + 1):
+                            clusters = cells.get((cell_x, cell_y))
+                            if clusters is not None:
+                                candidates.update(clusters)
+        best_cluster, best_iou = -1, iou_threshold
+        area = (xmax - xmin) * (ymax - ymin)
+        for cluster in sorted(candidates):
+            # Same operations as _pair_iou
+            fused_xmin, fused_ymin, fused_xmax, fused_ymax = fused[cluster]
+            intersection_w = max(min(fused_xmax, xmax) - max(fused_xmin, xmin), 0.0)
+            intersection_h = max(min(fused_ymax, ymax) - max(fused_ymin, ymin), 0.0)
+            intersection_area = intersection_w * intersection_h
+            if intersection_area > 0:
+                fused_area = (fused_xmax - fused_xmin) * (fused_ymax - fused_ymin)
+                iou = intersection_area / ((area - intersection_area) + fused_area)
+                if iou > best_iou:
+                    best_cluster, best_iou = cluster, iou
+        if best_cluster < 0:
+            best_cluster = len(fused)
+            fused.append(box)
+            weighted_sums.append([score * value for value in box])
+            score_sums.append(score)
+            max_scores.append(score)
+            counts.append(1)
+            locations.append(None)
+            location = box_location
+        else:
+            weighted_sums[best_cluster] = [total + score * value for total, value in zip(weighted_sums[best_cluster], box)]
+            score_sums[best_cluster] += score
+            max_scores[best_cluster] = max(max_scores[best_cluster], score)
+            counts[best_cluster] += 1
+            fused[best_cluster] = [total / score_sums[best_cluster] for total in weighted_sums[best_cluster]]
+            location = locate(fused[best_cluster])
+        move(best_cluster, location)
+    return (
+        np.array(fused, dtype=np.float64).reshape(-1, 4), np.array(score_sums, dtype=np.float64),
+        np.array(max_scores, dtype=np.float64), np.array(counts, dtype=np.int64)
+    )
+
+def weighted_box_fusion(
+    boxes, scores, iou_threshold: float=0.55, class_ids=None, skip_threshold: float=0.0,
+    num_models: int=1, conf_type: str='avg'
+) -> Tuple[BBoxArray, np.ndarray, np.ndarray]:
+    """
+    Weighted box fusion (WBF): instead of keeping one box per cluster of overlapping boxes,
+    every cluster is replaced with the score-weighted average of its boxes.
+
+    Boxes are visited in order of decreasing score. Each box joins the cluster of the same class
+    whose fused box has the highest IoU with it, if that IoU is greater than iou_threshold,
+    and starts a new cluster otherwise.
+    Since every box depends on the fused boxes of the previous ones, boxes are clustered one at a time.
+    Only the clusters in nearby grid cells are compared with each box, but the cost is still
+    a few microseconds per box: a few hundred boxes take milliseconds, and 100k boxes take seconds.
+
+    To fuse the predictions of several models, concatenate them and pass the number of models as num_models:
+    the scores of clusters that contain fewer boxes than num_models are scaled down accordingly.
+
+    conf_type options:
+        'avg': The fused score is the average score of the cluster, scaled by min(cluster size, num_models) / num_models.
+        'max': The fused score is the maximum score of the cluster.
+
+    Returns:
+        Tuple[BBoxArray, np.ndarray, np.ndarray]: The fused boxes, their scores and their class ids
+                (None when class_ids is None), in order of decreasing score.
+    """
+    check_value(conf_type, valid_value_list=['avg', 'max'])
+    boxes = as_bbox_array(boxes).boxes
+    scores = _check_scores(BBoxArray(boxes), scores)
+    class_array = _check_class_ids(len(boxes), class_ids) if class_ids is not None else np.zeros(len(boxes), dtype=np.int64)
+    fused_list, score_list, class_list = [], [], []
+    for class_id in np.unique(class_array[scores >= skip_threshold]):
+        indices = np.flatnonzero((class_array == class_id) & (scores >= skip_threshold))
+        indices = indices[_score_order(scores[indices])]
+        fused, score_sums, max_scores, counts = _fuse_boxes(boxes[indices], scores[indices], iou_threshold)
+        num_clusters = len(fused)
+        if conf_type == 'avg':
+            fused_scores = score_sums / counts * np.minimum(counts, num_models) / num_models
+        else:
+            fused_scores = max_scores
+        fused_list.append(fused)
+        score_list.append(fused_scores)
+        class_list.append(np.full(num_clusters, class_id))
+    if len(fused_list) == 0:
+        return BBoxArray(), np.empty(0), (np.empty(0, dtype=class_array.dtype) if class_ids is not None else None)
+    fused_scores = np.concatenate(score_list)
+    order = _score_order(fused_scores)
+    fused_classes = np.concatenate(class_list)[order] if class_ids is not None else None
+    return BBoxArray(np.concatenate(fused_list)[order]), fused_scores[order], fused_classes
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Tuple
+from typing import List, Tuple, Iterator
 import numpy as np
 import cv2
 from shapely.geometry import Point as ShapelyPoint
@@ -403,17 +403,8 @@ class Segmentation:
         check_type(value, valid_type_list=[Polygon])
         self.polygon_list[idx] = value
 
-    def __iter__(self):
-        self.n = 0
-        return self
-
-    def __next__(self) -> Polygon:
-        if self.n < len(self.polygon_list):
-            result = self.polygon_list[self.n]
-            self.n += 1
-            return result
-        else:
-            raise StopIteration
+    def __iter__(self) -> Iterator[Polygon]:
+        return iter(self.polygon_list)
 
     def __add__(self, other) -> Segmentation:
         if isinstance(other, Segmentation):
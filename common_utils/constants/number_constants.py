@@ -14,4 +14,5 @@ noniterable_jsonable_types = [
     int, float, bool,
     type(None)
 ]
-jsonable_types = iterable_jsonable_types + noniterable_jsonable_types
\ No newline at end of file
+jsonable_types = iterable_jsonable_types + noniterable_jsonable_types
+jsonable_scalar_types = noniterable_jsonable_types + [str]
@@ -0,0 +1,51 @@
+import numpy as np
+from common_utils.common_types.bbox import BBox, BBoxArray
+from common_utils.common_types.point import Point2D
+
+rng = np.random.default_rng(0)
+pmin = rng.uniform(-20, 100, size=(200, 2)).round(1)
+boxes = BBoxArray(np.concatenate([pmin, pmin + rng.uniform(0.5, 40, size=(200, 2)).round(1)], axis=1))
+bbox_list = boxes.to_bbox_list()
+assert BBoxArray.from_bbox_list(bbox_list) == boxes and len(boxes) == 200
+assert boxes[3] == bbox_list[3] and boxes[:5].to_bbox_list() == bbox_list[:5]
+assert boxes[boxes.is_valid()] == boxes and len(BBoxArray()) == 0
+
+frame_shape = [90, 110, 3]
+assert np.allclose(boxes.area(), [bbox.area() for bbox in bbox_list])
+assert np.allclose(boxes.center(), [bbox.center() for bbox in bbox_list])
+assert np.allclose(boxes.shape(), [bbox.shape() for bbox in bbox_list])
+assert np.allclose(boxes.width, [bbox.width for bbox in bbox_list])
+assert np.allclose(boxes.aspect_ratio(), [bbox.aspect_ratio() for bbox in bbox_list])
+assert boxes.clip_at_bounds(frame_shape).to_list() == [bbox.clip_at_bounds(frame_shape).to_list() for bbox in bbox_list]
+assert np.allclose(boxes.resize(frame_shape, [45, 220]).to_list(), [bbox.resize(frame_shape, [45, 220]).to_list() for bbox in bbox_list])
+assert np.allclose(
+    boxes.scale_about_center(1.3, frame_shape).to_list(),
+    [bbox.scale_about_center(1.3, frame_shape).to_list() for bbox in bbox_list]
+)
+assert np.allclose(
+    boxes.rescale([10, 20], boxes.center()).to_list(),
+    [bbox.rescale([10, 20], Point2D(*bbox.center())).to_list() for bbox in bbox_list]
+)
+assert boxes.to_list('pminsize') == [bbox.to_list('pminsize') for bbox in bbox_list]
+assert np.allclose(BBoxArray.from_list(boxes.to_list('pminsize'), input_format='pminsize').boxes, boxes.boxes)
+assert boxes.to_int().to_list() == [bbox.to_int().to_list() for bbox in bbox_list]
+assert boxes.to_rounded_int(special=True).to_list() == [bbox.to_rounded_int(special=True).to_list() for bbox in bbox_list]
+assert (boxes + Point2D(1, 2))[0] == bbox_list[0] + Point2D(1, 2)
+
+query = BBox(xmin=10.0, ymin=20.0, xmax=60.0, ymax=70.0)
+assert np.allclose(boxes.iou(query), [bbox.iou(query) for bbox in bbox_list])
+assert np.allclose(boxes.iou(boxes[::-1]), [bbox.iou(other) for bbox, other in zip(bbox_list, bbox_list[::-1])])
+intersection = boxes.intersect_with(query, check_valid=False)
+assert intersection.to_list() == [bbox.intersect_with(query, check_valid=False).to_list() for bbox in bbox_list]
+assert intersection.is_valid().tolist() == [bbox.intersect_with(query, check_valid=False).is_valid() for bbox in bbox_list]
+try:
+    boxes.intersect_with(query)
+    assert False
+except Exception:
+    pass
+
+img = rng.integers(0, 255, size=(90, 110, 3), dtype=np.uint8)
+clipped = boxes.clip_at_bounds(frame_shape)
+for crop, bbox in zip(clipped.crop_from(img), clipped.to_bbox_list()):
+    assert np.array_equal(crop, bbox.crop_from(img))
+print('BBoxArray Test Passed')
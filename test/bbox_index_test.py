@@ -0,0 +1,77 @@
+import numpy as np
+from common_utils.common_types.bbox import BBox, BBoxArray
+from common_utils.common_types.point import Point2D
+from common_utils.common_types.bbox_index import BBoxIndex
+
+def reference_query(boxes: dict, region: BBox, predicate: str) -> list:
+    if predicate == 'intersects':
+        return sorted([box_id for box_id, bbox in boxes.items() if bbox.intersect_with(region, check_valid=False).is_valid()])
+    return sorted([box_id for box_id, bbox in boxes.items() if getattr(bbox, predicate)(region)])
+
+def reference_nearest(boxes: dict, point: list, k: int) -> list:
+    distances = {box_id: np.hypot(bbox.center()[0] - point[0], bbox.center()[1] - point[1]) for box_id, bbox in boxes.items()}
+    return sorted(distances, key=lambda box_id: (distances[box_id], box_id))[:k]
+
+def random_boxes(rng: np.random.Generator, num_boxes: int) -> BBoxArray:
+    # Mostly small boxes on a coarse lattice (to get shared edges), a few large and a few inverted ones.
+    pmin = rng.integers(0, 200, size=(num_boxes, 2)).astype(float)
+    sizes = rng.integers(0, 20, size=(num_boxes, 2)).astype(float)
+    sizes[rng.random(num_boxes) < 0.05] *= 10
+    sizes[rng.random(num_boxes) < 0.02] *= -1
+    return BBoxArray(np.concatenate([pmin, pmin + sizes], axis=1))
+
+rng = np.random.default_rng(0)
+boxes = random_boxes(rng, 500)
+index = BBoxIndex(boxes, min_rebuild_size=50)
+reference_boxes = {box_id: bbox for box_id, bbox in enumerate(boxes)}
+
+def check_index():
+    assert len(index) == len(reference_boxes)
+    assert index.ids.tolist() == sorted(reference_boxes)
+    for region in list(random_boxes(rng, 30)) + [BBox(xmin=40, ymin=40, xmax=40, ymax=40), BBox(xmin=90, ymin=90, xmax=30, ymax=30)]:
+        for predicate in BBoxIndex.predicates:
+            assert index.query(region, predicate=predicate).tolist() == reference_query(reference_boxes, region, predicate), predicate
+    for point in rng.uniform(-50, 250, size=(10, 2)).tolist():
+        for k in [1, 7]:
+            assert index.nearest(point, k=k).tolist() == reference_nearest(reference_boxes, point, k)
+
+check_index()
+
+# Incremental inserts and removals, with and without rebuilds of the grids.
+for bbox in random_boxes(rng, 120):
+    box_id = index.insert(bbox)
+    reference_boxes[box_id] = bbox
+for box_id in rng.choice(sorted(reference_boxes), size=350, replace=False).tolist():
+    index.remove(box_id)
+    del reference_boxes[box_id]
+check_index()
+
+new_ids = index.insert_all(random_boxes(rng, 20))
+reference_boxes.update({box_id: bbox for box_id, bbox in zip(new_ids.tolist(), index.boxes[-20:])})
+check_index()
+
+box_id = new_ids[0]
+assert index[box_id] == reference_boxes[box_id]
+index.remove(box_id)
+assert box_id not in index
+try:
+    index.remove(box_id)
+    assert False
+except KeyError:
+    pass
+
+assert index.nearest(Point2D(x=10, y=10), k=3).tolist() == index.nearest([10, 10], k=3).tolist()
+for point in [[float('nan'), 0], [0, float('inf')]]:
+    try:
+        index.nearest(point)
+        assert False
+    except ValueError:
+        pass
+# Boxes without a finite center are never among the nearest boxes.
+nan_index = BBoxIndex([[0, 0, 2, 2], [10, 10, 12, 12], [0, 0, float('nan'), 0]])
+assert nan_index.nearest([0, 0], k=3).tolist() == [0, 1]
+empty_index = BBoxIndex()
+assert len(empty_index.query([0, 0, 10, 10])) == 0 and len(empty_index.nearest([0, 0], k=3)) == 0
+empty_index.insert([0, 0, 10, 10])
+assert empty_index.query([5, 5, 20, 20]).tolist() == [0]
+print('BBoxIndex Test Passed')
@@ -0,0 +1,82 @@
+from __future__ import annotations
+from typing import List
+import os
+import json
+import tempfile
+import random
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from common_utils.base.binary import save_npz, load_npz
+from common_utils.common_types.angle import EulerAngle, EulerAngleList, Quaternion, QuaternionList
+
+class Pose(
+    PredictionDatum['Pose'],
+    BasicLoadableObject['Pose']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, angle: EulerAngle, keypoints: list, score: float=None):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.angle = angle
+        self.keypoints = keypoints
+        self.score = score
+
+    def to_dict(self) -> dict:
+        result = super().to_dict()
+        result['angle'] = self.angle.to_dict()
+        return result
+
+    @classmethod
+    def from_dict(cls, item_dict: dict) -> Pose:
+        item_dict = item_dict.copy()
+        item_dict['angle'] = EulerAngle.from_dict(item_dict['angle'])
+        return cls(**item_dict)
+
+class PoseList(
+    PredictionData['PoseList', 'Pose'],
+    BasicLoadableHandler['PoseList', 'Pose'],
+    BasicHandler['PoseList', 'Pose']
+):
+    def __init__(self, obj_list: List[Pose]=None):
+        super().__init__(obj_type=Pose, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> PoseList:
+        return PoseList([Pose.from_dict(item_dict) for item_dict in dict_list])
+
+random.seed(0)
+poses = PoseList()
+for i in range(200):
+    poses.append(
+        Pose(
+            frame=f'{i}.jpg', test_name=f'test_{i % 4}', model_name=None if i % 9 == 0 else f'model_{i % 3}',
+            angle=EulerAngle(roll=random.random(), pitch=random.random(), yaw=random.random()),
+            keypoints=[[random.random() * 100, random.random() * 100, 2] for j in range(17)] if i % 5 != 0 else [],
+            score=None if i % 7 == 0 else random.random()
+        )
+    )
+tmp_dir = tempfile.mkdtemp()
+npz_path, json_path = f'{tmp_dir}/poses.npz', f'{tmp_dir}/poses.json'
+poses.save_to_path(npz_path)
+poses.save_to_path(json_path)
+assert PoseList.load_from_path(npz_path).to_dict_list() == PoseList.load_from_path(json_path).to_dict_list()
+angles = EulerAngleList([pose.angle for pose in poses])
+angles.save_to_path(npz_path, overwrite=True)
+angles.save_to_path(json_path, overwrite=True)
+assert EulerAngleList.load_from_path(npz_path).to_dict_list() == angles.to_dict_list()
+quaternions = QuaternionList([Quaternion(qw=1.0, qx=0.5 * i, qy=-0.5, qz=float(i)) for i in range(20)])
+quaternions.save_to_path(npz_path, overwrite=True)
+assert QuaternionList.load_from_path(npz_path).to_dict_list() == quaternions.to_dict_list()
+print('Binary Handler Round Trip Test Passed')
+
+items = [
+    {'a': 1, 'b': 'x', 'c': [1, 2.5], 'd': {'e': True, 'f': None}, 'g': 2**70, 'h': (1, 2)},
+    {'a': None, 'b': None, 'c': [3, 4], 'd': {'e': False, 'f': 1.5}, 'g': 0, 'h': (3, 4)},
+    {'a': 3, 'b': 'テスト', 'c': [5, 6, 7], 'd': {'f': 2.0, 'e': None}, 'g': -1, 'h': (5, 6)},
+]
+for item_list in [items, items[:1], [], [1, 'a', None], [{}, {}], [{'k': []}, {'k': [[1, 2]]}]]:
+    save_npz(item_list, npz_path, compressed=True)
+    assert load_npz(npz_path) == json.loads(json.dumps(item_list)), item_list
+print('Binary Format Edge Case Test Passed')
+
+for path in [npz_path, json_path]:
+    os.remove(path)
+os.rmdir(tmp_dir)
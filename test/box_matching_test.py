@@ -0,0 +1,79 @@
+import numpy as np
+from itertools import permutations
+from common_utils.common_types.bbox import BBox, BBoxArray
+from common_utils.common_types.matching import match_boxes, match_frames
+
+def reference_greedy(gt_boxes: BBoxArray, pred_boxes: BBoxArray, scores: np.ndarray, iou_threshold: float, gt_classes=None, pred_classes=None) -> list:
+    gt_match = [-1] * len(gt_boxes)
+    for i in np.argsort(-scores, kind='stable').tolist():
+        best_j, best_iou = -1, -1.0
+        for j in range(len(gt_boxes)):
+            if gt_match[j] >= 0 or (gt_classes is not None and gt_classes[j] != pred_classes[i]):
+                continue
+            iou = pred_boxes[i].iou(gt_boxes[j])
+            if iou >= iou_threshold and iou > best_iou:
+                best_j, best_iou = j, iou
+        if best_j >= 0:
+            gt_match[best_j] = i
+    return gt_match
+
+def best_total_iou(gt_boxes: BBoxArray, pred_boxes: BBoxArray, iou_threshold: float) -> float:
+    ious = [[pred_bbox.iou(gt_bbox) for gt_bbox in gt_boxes] for pred_bbox in pred_boxes]
+    ious = [[iou if iou >= iou_threshold else 0.0 for iou in row] for row in ious]
+    num_slots = max(len(gt_boxes), len(pred_boxes))
+    best = 0.0
+    for assignment in permutations(range(num_slots), len(pred_boxes)):
+        best = max(best, sum([ious[i][j] for i, j in enumerate(assignment) if j < len(gt_boxes)]))
+    return best
+
+def random_frame(rng: np.random.Generator, num_gt: int, num_pred: int):
+    pmin = rng.uniform(0, 60, size=(num_gt, 2))
+    gt_boxes = BBoxArray(np.concatenate([pmin, pmin + rng.uniform(10, 30, size=(num_gt, 2))], axis=1))
+    source = rng.integers(0, max(num_gt, 1), size=num_pred)
+    pred_boxes = gt_boxes.boxes[source] + rng.normal(0, 4, size=(num_pred, 4)) if num_gt > 0 else rng.uniform(0, 60, size=(num_pred, 4))
+    return gt_boxes, BBoxArray(pred_boxes), rng.random(num_pred)
+
+rng = np.random.default_rng(0)
+iou_thresholds = [0.3, 0.5, 0.75]
+frames = [random_frame(rng, rng.integers(0, 7), rng.integers(0, 7)) for _ in range(60)]
+for gt_boxes, pred_boxes, scores in frames:
+    gt_classes, pred_classes = rng.integers(0, 2, size=len(gt_boxes)), rng.integers(0, 2, size=len(pred_boxes))
+    matches = match_boxes(gt_boxes, pred_boxes, scores, iou_thresholds=iou_thresholds)
+    class_matches = match_boxes(gt_boxes, pred_boxes, scores, gt_classes, pred_classes, iou_thresholds=iou_thresholds)
+    optimal_matches = match_boxes(gt_boxes, pred_boxes, iou_thresholds=iou_thresholds, method='hungarian')
+    for t, iou_threshold in enumerate(iou_thresholds):
+        assert matches.gt_match[t].tolist() == reference_greedy(gt_boxes, pred_boxes, scores, iou_threshold)
+        assert class_matches.gt_match[t].tolist() == reference_greedy(gt_boxes, pred_boxes, scores, iou_threshold, gt_classes, pred_classes)
+        for frame_matches in [matches, class_matches, optimal_matches]:
+            # gt_match and pred_match describe the same pairs.
+            pairs = [(i, j) for i, j in enumerate(frame_matches.pred_match[t].tolist()) if j >= 0]
+            assert pairs == sorted([(i, j) for j, i in enumerate(frame_matches.gt_match[t].tolist()) if i >= 0])
+            assert (frame_matches.matched_ious[t][frame_matches.tp[t]] >= iou_threshold).all()
+            assert frame_matches.num_tp[t] + frame_matches.num_fp[t] == len(pred_boxes)
+            assert frame_matches.num_tp[t] + frame_matches.num_fn[t] == len(gt_boxes)
+        total_iou = np.nansum(optimal_matches.matched_ious[t])
+        assert abs(total_iou - best_total_iou(gt_boxes, pred_boxes, iou_threshold)) < 1e-9
+        assert total_iou >= np.nansum(matches.matched_ious[t]) - 1e-9
+
+# Parallel and serial results are the same.
+gt_boxes_list, pred_boxes_list, scores_list = [list(values) for values in zip(*frames)]
+serial_matches = match_frames(gt_boxes_list, pred_boxes_list, scores_list, iou_thresholds=iou_thresholds)
+parallel_matches = match_frames(gt_boxes_list, pred_boxes_list, scores_list, iou_thresholds=iou_thresholds, num_workers=2)
+for serial, parallel in zip(serial_matches, parallel_matches):
+    assert (serial.gt_match == parallel.gt_match).all() and (serial.pred_match == parallel.pred_match).all()
+
+# A lower-scored prediction with a better IoU loses its GT box to the higher-scored one in greedy matching.
+gt_boxes = [BBox(xmin=0, ymin=0, xmax=10, ymax=10)]
+pred_boxes = [BBox(xmin=0, ymin=0, xmax=10, ymax=10), BBox(xmin=1, ymin=0, xmax=11, ymax=10)]
+matches = match_boxes(gt_boxes, pred_boxes, [0.6, 0.9])
+assert matches.gt_match.tolist() == [[1]] and matches.tp.tolist() == [[False, True]] and matches.fn.tolist() == [[False]]
+matches = match_boxes(gt_boxes, pred_boxes, method='hungarian')
+assert matches.gt_match.tolist() == [[0]]
+matches = match_boxes([], pred_boxes, [0.6, 0.9], iou_thresholds=[0.5, 0.9])
+assert matches.num_fp.tolist() == [2, 2] and matches.num_fn.tolist() == [0, 0]
+try:
+    match_boxes(gt_boxes, pred_boxes, iou_thresholds=0)
+    assert False
+except ValueError:
+    pass
+print('Box Matching Test Passed')
@@ -0,0 +1,65 @@
+from __future__ import annotations
+from typing import List
+from common_utils.base.basic import BasicLoadableIdObject, BasicLoadableIdHandler, \
+    BasicLoadableHandler, BasicHandler
+from common_utils.common_types.point import Point2D, Point2D_List
+
+class Annotation(BasicLoadableIdObject['Annotation']):
+    def __init__(self, id: int, image_id: int, name: str):
+        super().__init__(id=id)
+        self.image_id = image_id
+        self.name = name
+
+class AnnotationHandler(
+    BasicLoadableIdHandler['AnnotationHandler', 'Annotation'],
+    BasicLoadableHandler['AnnotationHandler', 'Annotation'],
+    BasicHandler['AnnotationHandler', 'Annotation']
+):
+    def __init__(self, annotations: List[Annotation]=None):
+        super().__init__(obj_type=Annotation, obj_list=annotations)
+        self.annotations = self.obj_list
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> AnnotationHandler:
+        return AnnotationHandler([Annotation.from_dict(item_dict) for item_dict in dict_list])
+
+def make(start: int, stop: int) -> List[Annotation]:
+    return [Annotation(id=i, image_id=i // 3, name=f'ann{i % 4}') for i in range(start, stop)]
+
+handler = AnnotationHandler(make(0, 10))
+handler.create_index('name')
+handler.create_index('image_id', kind='sorted')
+assert len(handler.get(name='ann1')) == 3 and handler.get_obj_from_id(9).name == 'ann1'
+handler.extend(make(10, 20))
+handler.extend(AnnotationHandler(make(20, 25)))
+handler.extend(iter(make(25, 30)), trusted=True)
+assert handler.annotations is handler.obj_list and len(handler) == 30
+assert handler.get(name='ann1').ids == [i for i in range(30) if i % 4 == 1]
+assert handler.get_indices_in_range('image_id', 2, 4).tolist() == list(range(6, 15))
+assert handler.get_obj_from_id(27).name == 'ann3'
+try:
+    handler.extend(make(30, 32) + [Point2D(x=0, y=0)])
+    assert False
+except TypeError:
+    pass
+assert len(handler) == 30
+handler.extend(handler)
+assert len(handler) == 60 and handler.get_obj_from_id(5) is handler[5]
+print('Bulk Extend Test Passed')
+
+first, second, third = AnnotationHandler(make(0, 5)), AnnotationHandler(make(5, 8)), AnnotationHandler([])
+combined = first + second
+assert combined.ids == list(range(8)) and combined.annotations is combined.obj_list
+assert AnnotationHandler.concat([first, second, third, make(8, 10)]).ids == list(range(10))
+assert AnnotationHandler.concat([]).ids == []
+columnar = AnnotationHandler.concat([first.to_columnar(), second, second.to_columnar()])
+assert columnar.is_columnar and columnar.ids == list(range(5)) + list(range(5, 8)) * 2
+try:
+    AnnotationHandler.concat([first, [Point2D(x=0, y=0)]])
+    assert False
+except TypeError:
+    pass
+points = Point2D_List.concat([Point2D_List([Point2D(x=i, y=i)]) for i in range(3)])
+assert points.point_list is points.obj_list and [point.x for point in points] == [0, 1, 2]
+assert [point.x for point in points[1:]] == [1, 2]
+print('Concat Test Passed')
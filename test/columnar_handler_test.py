@@ -0,0 +1,92 @@
+from __future__ import annotations
+from typing import List
+import random
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from common_utils.common_types.angle import EulerAngle, EulerAngleList
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+rows = ScoreList()
+for i in range(30):
+    rows.append(Score(frame=f'{i % 10}.jpg', test_name=f'test_{i // 10}', model_name=f'model_{i % 3}', score=(i * 7 % 11) / 10))
+cols = rows.to_columnar()
+
+assert cols.is_columnar and not rows.is_columnar
+assert cols.to_dict_list() == rows.to_dict_list()
+assert cols[3] == rows[3] and cols[-1] == rows[-1]
+assert cols[2:7].is_columnar and cols[2:7].to_dict_list() == rows[2:7].to_dict_list()
+assert cols.to_row_based().to_dict_list() == rows.to_dict_list()
+print('Columnar Access Test Passed')
+
+for kwargs in [
+    dict(test_name='test_1'),
+    dict(test_name='test_1', frame=['1.jpg', '3.jpg']),
+    dict(score=0.5),
+    dict(model_name=None, frame='2.jpg')
+]:
+    assert cols.get(**kwargs).to_dict_list() == rows.get(**kwargs).to_dict_list()
+print('Columnar Get Test Passed')
+
+for attr_name in ['score', 'frame', 'model_name']:
+    for reverse in [False, True]:
+        sorted_rows, sorted_cols = rows.copy(), cols.copy()
+        sorted_rows.sort(attr_name, reverse=reverse)
+        sorted_cols.sort(attr_name, reverse=reverse)
+        assert sorted_cols.to_dict_list() == sorted_rows.to_dict_list()
+random.seed(0)
+shuffled_rows = rows.copy()
+shuffled_rows.shuffle()
+random.seed(0)
+shuffled_cols = cols.copy()
+shuffled_cols.shuffle()
+assert shuffled_cols.to_dict_list() == shuffled_rows.to_dict_list()
+print('Columnar Sort Test Passed')
+
+edited_rows, edited_cols = rows.copy(), cols.copy()
+for handler in [edited_rows, edited_cols]:
+    handler.append(Score(frame='x.jpg', test_name='test_3', model_name=None, score=None))
+    handler[0] = Score(frame='y.jpg', test_name='test_3', model_name='model_0', score=[0.1, 0.2])
+    handler[1:3] = [rows[5]]
+    del handler[4]
+    del handler[6:9]
+assert edited_cols.to_dict_list() == edited_rows.to_dict_list()
+assert edited_cols.obj_list.columns['score'].kind == 'object'
+assert len(cols + cols) == 2 * len(rows) and (cols + cols).is_columnar
+assert [len(part) for part in cols.split([1, 2], shuffle=False)] == [10, 20]
+# Objects read from a columnar handler and copies of it don't share list fields with it.
+tag_rows = ScoreList([Score(frame='0.jpg', test_name='test_0', model_name=None, score=[0.1])])
+tag_cols = tag_rows.to_columnar()
+tag_rows[0].score.append(0.2)
+tag_cols[0].score.append(0.3)
+for obj in tag_cols:
+    obj.score.append(0.4)
+tag_copy = tag_cols.copy()
+tag_copy[0].score.append(0.5)
+tag_copy.get_column('score')[0].append(0.6)
+assert tag_cols[0].score == [0.1] and tag_copy[0].score == [0.1, 0.6]
+print('Columnar Mutation Test Passed')
+
+angles = EulerAngleList([EulerAngle(float(i), 1.0, 2.0) for i in range(1000)]).to_columnar()
+assert angles.angles is angles.obj_list
+assert angles.get_column('roll').sum() == sum(range(1000))
+assert list(cols.get_column('frame')[:2]) == ['0.jpg', '1.jpg']
+print('Columnar Column Test Passed')
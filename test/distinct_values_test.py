@@ -0,0 +1,74 @@
+from __future__ import annotations
+from typing import List
+import numpy as np
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float=0.0):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+def check(handler: ScoreList):
+    for attr_name in ['frame', 'test_name', 'model_name']:
+        assert handler.distinct_values(attr_name) == sorted(set([getattr(datum, attr_name) for datum in handler]))
+
+scores = ScoreList([Score(frame=f'{i % 4}.png', test_name='test0', model_name=f'model{i % 3}') for i in range(12)])
+frames = scores.distinct_values('frame')
+assert frames == ['0.png', '1.png', '2.png', '3.png'] and scores.distinct_values('model_name') == ['model0', 'model1', 'model2']
+frames.append('modified')
+assert scores.distinct_values('frame') is not frames and len(scores.distinct_values('frame')) == 4
+scores.distinct_values('test_name')
+counts = scores._distinct_values['frame']
+
+scores.append(Score(frame='4.png', test_name='test1', model_name='model0'))
+assert scores.distinct_values('frame')[-1] == '4.png' and scores.distinct_values('test_name') == ['test0', 'test1'] and counts.valid
+scores.extend([Score(frame='5.png', test_name='test0', model_name='model3')])
+del scores[-2]
+assert scores.distinct_values('test_name') == ['test0'] and counts.valid
+scores[0] = Score(frame='9.png', test_name='test0', model_name='model0')
+del scores[np.arange(len(scores)) % 4 == 1]
+scores[[0, 1]] = [Score(frame='1.png', test_name='test2', model_name='model0')] * 2
+check(scores)
+del scores[1:3]
+scores[-2:] = [Score(frame='6.png', test_name='test0', model_name='model9')]
+scores.sort('frame')
+scores.shuffle()
+check(scores)
+assert counts.valid and counts.size == len(scores)
+
+# Repeated positions and direct changes to obj_list trigger a recount.
+scores[[0, 0]] = [Score(frame='7.png', test_name='test0', model_name='model0'), Score(frame='8.png', test_name='test0', model_name='model0')]
+check(scores)
+scores.obj_list.append(Score(frame='10.png', test_name='test0', model_name='model0'))
+check(scores)
+
+# The frames, test_names and model_names properties see objects that are modified in place.
+# distinct_values needs refresh=True for that.
+for datum in scores:
+    datum.frame = f'images/{datum.frame}'
+scores.obj_list[0] = Score(frame='images/0.png', test_name='test0', model_name='model5')
+expected_frames = sorted(set([datum.frame for datum in scores]))
+assert scores.frames == expected_frames and 'model5' in scores.model_names and scores.test_names == sorted(set([datum.test_name for datum in scores]))
+assert scores.distinct_values('frame') != expected_frames
+assert scores.distinct_values('frame', refresh=True) == expected_frames
+assert 'model5' not in scores.distinct_values('model_name')
+scores.distinct_values('model_name', refresh=True)
+check(scores)
+assert scores.to_columnar().frames == expected_frames
+print('Distinct Values Test Passed')
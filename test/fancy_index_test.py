@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import List
+import numpy as np
+from common_utils.base.basic import BasicLoadableIdObject, BasicLoadableIdHandler, \
+    BasicLoadableHandler, BasicHandler, MultiParameterHandler
+
+class Detection(BasicLoadableIdObject['Detection']):
+    def __init__(self, id: int, score: float, name: str):
+        super().__init__(id=id)
+        self.score = score
+        self.name = name
+
+class DetectionHandler(
+    BasicLoadableIdHandler['DetectionHandler', 'Detection'],
+    BasicLoadableHandler['DetectionHandler', 'Detection'],
+    BasicHandler['DetectionHandler', 'Detection']
+):
+    def __init__(self, detections: List[Detection]=None):
+        super().__init__(obj_type=Detection, obj_list=detections)
+        self.detections = self.obj_list
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> DetectionHandler:
+        return DetectionHandler([Detection.from_dict(item_dict) for item_dict in dict_list])
+
+def make(num: int) -> DetectionHandler:
+    return DetectionHandler([Detection(id=i, score=(i * 7 % 10) / 10, name=f'name{i % 3}') for i in range(num)])
+
+for columnar in [False, True]:
+    handler = make(10)
+    handler = handler.to_columnar() if columnar else handler
+    handler.create_index('name')
+    scores = np.array([det.score for det in handler])
+
+    # Selection
+    top3 = handler[np.argsort(-scores)[:3]]
+    assert isinstance(top3, DetectionHandler) and top3.ids == [7, 4, 1]
+    assert handler[scores > 0.5].ids == [1, 4, 7, 8]
+    assert handler[[0, -1, 0]].ids == [0, 9, 0] and handler[[]].ids == []
+    assert handler[np.int64(3)].id == 3 and handler[range(2, 5)].ids == [2, 3, 4]
+    assert handler[[True, False] * 5].ids == [0, 2, 4, 6, 8]
+    for bad_idx in [[10], [True, False], np.array([0.5])]:
+        try:
+            handler[bad_idx]
+            assert False
+        except IndexError:
+            pass
+
+    # Bulk assignment
+    handler[[1, 3]] = [Detection(id=11, score=0.0, name='name9'), Detection(id=13, score=0.0, name='name9')]
+    handler[np.array([0])] = make(1)
+    assert handler.ids == [0, 11, 2, 13, 4, 5, 6, 7, 8, 9]
+    assert handler.get(name='name9').ids == [11, 13] and handler.get_obj_from_id(13).score == 0.0
+    try:
+        handler[[1, 2]] = make(3)
+        assert False
+    except ValueError:
+        pass
+
+    # Bulk deletion
+    del handler[np.array([det.name == 'name9' for det in handler])]
+    assert handler.ids == [0, 2, 4, 5, 6, 7, 8, 9] and handler.detections is handler.obj_list
+    del handler[[-1, 0, 0]]
+    assert handler.ids == [2, 4, 5, 6, 7, 8]
+    assert handler.get(name='name2').ids == [2, 5, 8] and handler.get_obj_from_id(8).name == 'name2'
+
+class Test:
+    def __init__(self, a: int):
+        self.a = a
+
+class TestHandler(MultiParameterHandler['TestHandler', 'Test']):
+    def __init__(self, x: int, test_list: List[Test]=None):
+        super().__init__(obj_type=Test, obj_list=test_list)
+        self.x = x
+        self.test_list = self.obj_list
+
+handler = TestHandler(x=3, test_list=[Test(a=i) for i in range(5)])
+subset = handler[np.array([4, 1])]
+assert subset.x == 3 and subset.test_list is subset.obj_list and [t.a for t in subset] == [4, 1]
+handler[[0, 1]] = [Test(a=10), Test(a=11)]
+del handler[np.arange(5) % 2 == 1]
+assert [t.a for t in handler.test_list] == [10, 2, 4]
+print('Fancy Index Test Passed')
@@ -0,0 +1,60 @@
+from __future__ import annotations
+from typing import List
+import random
+import numpy as np
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float=None):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+random.seed(0)
+scores = ScoreList([
+    Score(
+        frame=f'{random.randrange(4)}.png', test_name=f'test{random.randrange(2)}', model_name=f'model{random.randrange(3)}',
+        score=random.random() if random.random() > 0.1 else None
+    )
+    for i in range(500)
+])
+
+groups = scores.group_by('model_name', 'frame')
+expected_keys = sorted(set([(datum.model_name, datum.frame) for datum in scores]))
+assert list(groups.keys()) == expected_keys and len(groups) == len(expected_keys)
+for key in expected_keys:
+    group = groups[key]
+    expected = scores.get(model_name=key[0], frame=key[1])
+    assert isinstance(group, ScoreList) and group.to_dict_list() == expected.to_dict_list()
+    values = np.array([datum.score for datum in expected if datum.score is not None])
+    assert groups.count()[key] == len(expected)
+    assert np.isclose(groups.mean('score')[key], values.mean()) and np.isclose(groups.std('score')[key], values.std())
+    assert np.isclose(groups.sum('score')[key], values.sum())
+    assert np.isclose(groups.median('score')[key], np.median(values))
+    assert np.isclose(groups.percentile('score', 90)[key], np.percentile(values, 90))
+    assert groups.min('score')[key] == values.min() and groups.max('score')[key] == values.max()
+assert groups.positions(expected_keys[0]).tolist() == scores.get_indices(model_name='model0', frame='0.png').tolist()
+assert ('model9', '0.png') not in groups
+
+# Keys that can't be sorted keep the order in which they first appear.
+mixed = ScoreList([Score(frame=frame, test_name='test', model_name=None) for frame in ['b', None, 'a', 'b']])
+mixed_groups = mixed.group_by('frame')
+assert list(mixed_groups.keys()) == [('b',), (None,), ('a',)] and mixed_groups.count()[('b',)] == 2
+assert np.isnan(mixed_groups.mean('score')[('a',)])
+assert len(ScoreList().group_by('frame')) == 0
+print('Group By Test Passed')
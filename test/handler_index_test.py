@@ -0,0 +1,70 @@
+from __future__ import annotations
+from typing import List
+import random
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+random.seed(1)
+base = ScoreList()
+for i in range(500):
+    base.append(
+        Score(
+            frame=f'{random.randint(0, 20)}.jpg', test_name=random.choice(['a', 'b', None]),
+            model_name=random.choice(['m0', 'm1', 'm2']), score=random.choice([None, 0.1, 0.2, 0.5, 1.0])
+        )
+    )
+queries = [
+    dict(test_name='a'), dict(test_name='a', frame=['1.jpg', '2.jpg']), dict(score=0.5, model_name='m1'),
+    dict(score=None, test_name=None), dict(frame=('3.jpg',), model_name=['m0', 'm2']),
+    dict(test_name=['a', None]), dict(score=[0.1, None]), dict(nonexistent=None), dict()
+]
+
+for kind in ['hash', 'sorted']:
+    for columnar in [False, True]:
+        indexed = base.to_columnar() if columnar else base.copy()
+        for attr_name in ['frame', 'score', 'model_name']:
+            indexed.create_index(attr_name, kind=kind)
+        indexed.create_index('test_name')
+        for query in queries:
+            assert indexed.get(**query).to_dict_list() == base.get(**query).to_dict_list()
+
+        unindexed = base.copy()
+        for handler in [indexed, unindexed]:
+            handler.extend([Score(frame='new.jpg', test_name='a', model_name='m9', score=0.5) for i in range(50)])
+            handler[3] = Score(frame='x.jpg', test_name='b', model_name='m0', score=0.2)
+            handler[-1] = Score(frame='y.jpg', test_name='b', model_name='m0', score=0.2)
+        for query in queries + [dict(frame='new.jpg'), dict(frame='x.jpg')]:
+            assert indexed.get(**query).to_dict_list() == unindexed.get(**query).to_dict_list()
+            assert indexed.get_indices(**query).tolist() == unindexed.get_indices(**query).tolist()
+
+        for handler in [indexed, unindexed]:
+            del handler[5]
+            handler.sort('frame')
+            handler.append(Score(frame='z.jpg', test_name='a', model_name='m0', score=None))
+        for query in queries + [dict(frame='z.jpg')]:
+            assert indexed.get(**query).to_dict_list() == unindexed.get(**query).to_dict_list()
+
+        in_range = indexed.get_in_range('score', min_val=0.15, max_val=0.5).to_dict_list()
+        assert len(in_range) > 0
+        assert in_range == unindexed.get_in_range('score', min_val=0.15, max_val=0.5).to_dict_list()
+print('Handler Index Test Passed')
@@ -0,0 +1,26 @@
+from threading import Thread
+from common_utils.common_types.angle import EulerAngle, EulerAngleList
+from common_utils.common_types.point import Point2D, Point2D_List
+
+angles = EulerAngleList([EulerAngle(roll=i, pitch=2 * i, yaw=3 * i) for i in range(20)])
+pairs = [(a.roll, b.roll) for a in angles for b in angles]
+assert pairs == [(i, j) for i in range(20) for j in range(20)]
+assert 'n' not in angles.__dict__
+angles_copy = angles.copy()
+for angle in angles:
+    pass
+assert angles == angles_copy
+assert angles.to_columnar() == angles.to_columnar().copy()
+print('Nested Iteration Test Passed')
+
+points = Point2D_List([Point2D(x=i, y=-i) for i in range(1000)])
+results = [None] * 8
+def read(worker_idx: int):
+    results[worker_idx] = sum([point.x for point in points for j in range(3)])
+threads = [Thread(target=read, args=(i,)) for i in range(len(results))]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+assert results == [3 * sum(range(1000))] * len(results)
+print('Concurrent Iteration Test Passed')
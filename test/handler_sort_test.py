@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import List
+import random
+import numpy as np
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler, \
+    BasicSubclassHandler
+
+class Prediction(BasicLoadableObject['Prediction']):
+    def __init__(self, test_name: str, frame: int, score: float, note: str=None):
+        super().__init__()
+        self.test_name = test_name
+        self.frame = frame
+        self.score = score
+        self.note = note
+
+    @property
+    def rounded_score(self) -> float:
+        return round(self.score, 1)
+
+class PredictionHandler(
+    BasicLoadableHandler['PredictionHandler', 'Prediction'],
+    BasicHandler['PredictionHandler', 'Prediction']
+):
+    def __init__(self, predictions: List[Prediction]=None):
+        super().__init__(obj_type=Prediction, obj_list=predictions)
+        self.predictions = self.obj_list
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> PredictionHandler:
+        return PredictionHandler([Prediction.from_dict(item_dict) for item_dict in dict_list])
+
+random.seed(0)
+objs = [
+    Prediction(test_name=f'test{random.randrange(3)}', frame=random.randrange(5), score=random.randrange(10) / 10)
+    for i in range(200)
+]
+for columnar in [False, True]:
+    handler = PredictionHandler(list(objs))
+    handler = handler.to_columnar() if columnar else handler
+    original = handler.to_dict_list()
+    positions = list(range(len(objs)))
+
+    # Stable, with a descending key
+    order = handler.argsort(['test_name', 'frame', 'score'], reverse=[False, False, True])
+    expected = sorted(positions, key=lambda i: (objs[i].test_name, objs[i].frame, -objs[i].score))
+    assert order.tolist() == expected and handler.to_dict_list() == original
+    handler.sort(['test_name', 'frame', 'score'], reverse=[False, False, True])
+    assert handler.to_dict_list() == [original[i] for i in expected]
+    assert handler.predictions is handler.obj_list
+
+    # Properties as keys, and reverse for every key
+    handler = PredictionHandler(list(objs))
+    handler.sort(['rounded_score', 'test_name'], reverse=True)
+    expected = sorted(positions, key=lambda i: (objs[i].rounded_score, objs[i].test_name), reverse=True)
+    assert [obj.to_dict() for obj in handler] == [original[i] for i in expected]
+    handler.sort('frame')
+    assert [obj.frame for obj in handler] == sorted([obj.frame for obj in objs])
+
+# Values that can't be converted into sort keys are compared in Python
+handler = PredictionHandler([Prediction('a', 0, 0.5, note=note) for note in [(1, 'b'), (0, 'c'), (1, 'a')]])
+assert handler.argsort(['note', 'test_name']).tolist() == [1, 2, 0]
+assert handler.argsort('score', reverse=True).tolist() == [0, 1, 2]
+for bad_args in [('not_an_attribute',), (['frame', 'score'], [True])]:
+    try:
+        handler.sort(*bad_args)
+        assert False
+    except (Exception, ValueError):
+        pass
+
+class Cat(Prediction):
+    pass
+
+subclass_handler = BasicSubclassHandler(obj_parent_class=Prediction, obj_list=[Cat('b', 1, 0.1), Prediction('a', 2, 0.2)])
+subclass_handler.sort(['test_name'])
+assert [obj.frame for obj in subclass_handler] == [2, 1]
+assert np.array_equal(subclass_handler.argsort('frame'), [1, 0])
+print('Handler Sort Test Passed')
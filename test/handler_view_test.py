@@ -0,0 +1,76 @@
+from __future__ import annotations
+from typing import List
+import numpy as np
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler, \
+    MultiParameterHandler
+from common_utils.base.view import ListView
+from common_utils.common_types.point import Point2D, Point2D_List
+
+points = Point2D_List([Point2D(x=i, y=-i) for i in range(10)])
+
+# Views share the parent's objects
+view = points.view(slice(2, 8, 2))
+assert isinstance(view, Point2D_List) and isinstance(view.obj_list, ListView)
+assert [p.x for p in view] == [2, 4, 6] and view[1] is points[4]
+assert [p.x for p in points.view([9, -1, 0])] == [9, 9, 0]
+assert [p.x for p in points.view(np.arange(10) % 3 == 0)] == [0, 3, 6, 9]
+nested = view.view(slice(None, None, -1))
+assert nested.obj_list._parent is points.obj_list and [p.x for p in nested] == [6, 4, 2]
+assert [p.x for p in view[1:]] == [4, 6]
+
+# Mutating a view copies it first, so the parent doesn't change
+view.append(Point2D(x=100, y=100))
+del view[0]
+assert [p.x for p in view] == [4, 6, 100] and type(view.obj_list) is list
+assert len(points) == 10 and [p.x for p in points][:3] == [0, 1, 2]
+detached = points.view(slice(0, 3)).copy()
+assert type(detached.obj_list) is list and [p.x for p in detached] == [0, 1, 2]
+try:
+    points.view([10])
+    assert False
+except IndexError:
+    pass
+
+class Frame(BasicLoadableObject['Frame']):
+    def __init__(self, index: int):
+        super().__init__()
+        self.index = index
+
+class FrameHandler(
+    BasicLoadableHandler['FrameHandler', 'Frame'],
+    BasicHandler['FrameHandler', 'Frame']
+):
+    def __init__(self, frames: List[Frame]=None):
+        super().__init__(obj_type=Frame, obj_list=frames)
+        self.frames = self.obj_list
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> FrameHandler:
+        return FrameHandler([Frame.from_dict(item_dict) for item_dict in dict_list])
+
+frames = FrameHandler([Frame(index=i) for i in range(10)])
+parts = frames.split(ratio=[1, 1], shuffle=False, copy=False)
+assert [len(part) for part in parts] == [5, 5] and parts[1][0] is frames[5]
+assert parts[0].frames is parts[0].obj_list
+assert parts[0].to_dict_list() == frames.split(ratio=[1, 1], shuffle=False)[0].to_dict_list()
+assert len(parts[1].get(index=7)) == 1 and len(frames) == 10
+
+class Test:
+    def __init__(self, a: int):
+        self.a = a
+
+class TestHandler(MultiParameterHandler['TestHandler', 'Test']):
+    def __init__(self, x: int, test_list: List[Test]=None):
+        super().__init__(obj_type=Test, obj_list=test_list)
+        self.x = x
+        self.test_list = self.obj_list
+
+handler = TestHandler(x=1, test_list=[Test(a=i) for i in range(6)])
+sliced = handler[1:4]
+assert sliced.x == 1 and sliced.test_list is sliced.obj_list and [t.a for t in sliced] == [1, 2, 3]
+assert len(handler) == 6 and handler.test_list is handler.obj_list
+view = handler.view([5, 0])
+assert view.x == 1 and view.test_list is view.obj_list and view[0] is handler[5]
+view.append(Test(a=10))
+assert [t.a for t in view.test_list] == [5, 0, 10] and len(handler) == 6
+print('Handler View Test Passed')
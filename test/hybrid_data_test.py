@@ -93,4 +93,6 @@ for i in range(10):
 print(f'gt:\n{gt}')
 print(f'dt:\n{dt}')
 error = DistanceErrorList.from_gtdt(gt=gt, dt=dt, obj_type=DistanceError, always_positive=False)
-print(error)
\ No newline at end of file
+print(error)
+assert error.to_dict_list() == DistanceErrorList._from_gtdt_nested(gt=gt, dt=dt, obj_type=DistanceError, always_positive=False).to_dict_list()
+assert error.to_dict_list() == DistanceErrorList.from_gtdt(gt=gt, dt=dt, obj_type=DistanceError, num_workers=2, always_positive=False).to_dict_list()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import List
+import os
+import tempfile
+import numpy as np
+from common_utils.base.prediction import HybridData, HybridDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+
+class DistanceError(
+    HybridDatum['DistanceError'],
+    BasicLoadableObject['DistanceError']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, error: float):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.error = error
+
+class DistanceErrorList(
+    HybridData['DistanceErrorList', 'DistanceError'],
+    BasicLoadableHandler['DistanceErrorList', 'DistanceError'],
+    BasicHandler['DistanceErrorList', 'DistanceError']
+):
+    def __init__(self, obj_list: List[DistanceError]=None):
+        super().__init__(obj_type=DistanceError, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> DistanceErrorList:
+        return DistanceErrorList([DistanceError.from_dict(item_dict) for item_dict in dict_list])
+
+rng = np.random.default_rng(0)
+errors = DistanceErrorList()
+for test_idx in range(3):
+    for frame_idx in range(50):
+        for model_idx in range(4):
+            error = None if rng.random() < 0.1 else float(rng.normal(model_idx, 1 + test_idx))
+            errors.append(DistanceError(frame=f'{frame_idx}.jpg', test_name=f'test_{test_idx}', model_name=f'model_{model_idx}', error=error))
+errors.append(DistanceError(frame='0.jpg', test_name='test_0', model_name='model_4', error=None))
+
+def reference(handler: DistanceErrorList, by: List[str], percentiles: List[float]) -> dict:
+    result = {}
+    for datum in handler:
+        key = tuple([getattr(datum, attr_name) for attr_name in by])
+        result.setdefault(key, [])
+        if datum.error is not None:
+            result[key].append(datum.error)
+    summaries = {}
+    for key, values in result.items():
+        if len(values) == 0:
+            summaries[key] = {'count': 0}
+            continue
+        values = np.array(values)
+        summaries[key] = {
+            'count': len(values), 'mean': values.mean(), 'std': values.std(), 'rmse': np.sqrt(np.mean(values**2)),
+            'min': values.min(), 'max': values.max(), 'median': np.median(values),
+            **{f'p{q:g}': np.percentile(values, q) for q in percentiles}
+        }
+    return summaries
+
+def assert_close(summaries: dict, expected: dict):
+    assert set(summaries.keys()) == set(expected.keys())
+    for key, summary in summaries.items():
+        if expected[key]['count'] == 0:
+            assert summary['count'] == 0 and np.isnan(summary['mean']) and np.isnan(summary['median'])
+            continue
+        for name, value in expected[key].items():
+            assert np.isclose(summary[name], value), (key, name, summary[name], value)
+
+for by in [['model_name'], ['test_name', 'model_name'], ['frame'], []]:
+    expected = reference(errors, by, percentiles=[5, 99.5])
+    assert_close(errors.summarize('error', by=by, percentiles=[5, 99.5]), expected)
+
+histograms, edges = errors.histogram('error', by=['model_name'], bins=8)
+for (model_name,), counts in histograms.items():
+    values = [datum.error for datum in errors if datum.model_name == model_name and datum.error is not None]
+    assert counts.tolist() == np.histogram(values, bins=edges)[0].tolist()
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'errors.jsonl')
+    errors.save_to_path(path)
+    stats = DistanceErrorList.stats_from_path(path, 'error', by=['test_name', 'model_name'], percentiles=[90], bins=edges, chunk_size=37)
+    assert_close(stats.summary(), reference(errors, ['test_name', 'model_name'], percentiles=[90]))
+    for (test_name, model_name), counts in stats.histogram().items():
+        values = [datum.error for datum in errors.get(test_name=test_name, model_name=model_name) if datum.error is not None]
+        assert counts.tolist() == np.histogram(values, bins=edges)[0].tolist()
+    summaries = DistanceErrorList.stats_from_path(path, 'error', by=None, exact_quantiles=False, chunk_size=100).summary()
+    assert 'median' not in summaries[()]
+    assert np.isclose(summaries[()]['std'], reference(errors, [], [])[()]['std'])
+print('Hybrid Stats Test Passed')
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from typing import List
+from common_utils.base.basic import BasicLoadableIdObject, BasicLoadableIdHandler, \
+    BasicLoadableHandler, BasicHandler
+
+class Annotation(BasicLoadableIdObject['Annotation']):
+    def __init__(self, id: int, image_id: int, name: str):
+        super().__init__(id=id)
+        self.image_id = image_id
+        self.name = name
+
+class AnnotationHandler(
+    BasicLoadableIdHandler['AnnotationHandler', 'Annotation'],
+    BasicLoadableHandler['AnnotationHandler', 'Annotation'],
+    BasicHandler['AnnotationHandler', 'Annotation']
+):
+    def __init__(self, annotations: List[Annotation]=None):
+        super().__init__(obj_type=Annotation, obj_list=annotations)
+        self.annotations = self.obj_list
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> AnnotationHandler:
+        return AnnotationHandler([Annotation.from_dict(item_dict) for item_dict in dict_list])
+
+handler = AnnotationHandler([Annotation(id=i, image_id=i // 3, name=f'ann{i}') for i in range(20)])
+assert handler.get_obj_from_id(7).name == 'ann7'
+handler.append(Annotation(id=100, image_id=0, name='ann100'))
+handler.extend([Annotation(id=101, image_id=0, name='ann101')])
+assert handler.get_obj_from_id(100).name == 'ann100' and handler.get_obj_from_id(101).name == 'ann101'
+handler[0] = Annotation(id=200, image_id=0, name='ann200')
+assert handler.get_obj_from_id(200).name == 'ann200'
+del handler[3]
+assert handler.get_obj_from_id(4).name == 'ann4' and handler.get_obj_from_id(19).name == 'ann19'
+del handler[-1]
+handler[1:3] = [Annotation(id=300, image_id=0, name='ann300')]
+assert handler.get_obj_from_id(300).name == 'ann300'
+handler.shuffle()
+assert handler.get_obj_from_id(9).name == 'ann9'
+handler.sort('id', reverse=True)
+assert handler.get_obj_from_id(9).name == 'ann9'
+handler.annotations.append(Annotation(id=400, image_id=0, name='ann400'))
+assert handler.get_obj_from_id(400).name == 'ann400'
+for missing_id in [0, 3, 101]:
+    try:
+        handler.get_obj_from_id(missing_id)
+        assert False
+    except Exception:
+        pass
+print('Id Index Test Passed')
+
+found = handler.get_objs_from_ids([5, 300, 5, 400])
+assert [ann.name for ann in found] == ['ann5', 'ann300', 'ann5', 'ann400']
+columnar = handler.to_columnar()
+assert columnar.get_objs_from_ids([5, 300]).to_dict_list() == handler.get_objs_from_ids([5, 300]).to_dict_list()
+assert columnar.get_obj_from_id(9) == handler.get_obj_from_id(9)
+assert handler == AnnotationHandler(list(handler.annotations))
+print('Bulk Id Lookup Test Passed')
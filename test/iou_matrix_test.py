@@ -0,0 +1,41 @@
+import numpy as np
+from common_utils.common_types.bbox import BBox, BBoxArray, iou_matrix
+
+def giou(a: BBox, b: BBox) -> float:
+    enclosing = BBox(xmin=min(a.xmin, b.xmin), ymin=min(a.ymin, b.ymin), xmax=max(a.xmax, b.xmax), ymax=max(a.ymax, b.ymax))
+    intersection = a.intersect_with(b, check_valid=False)
+    union = a.area() + b.area() - (intersection.area() if intersection.is_valid() else 0.0)
+    return a.iou(b) - (enclosing.area() - union) / enclosing.area()
+
+def diou(a: BBox, b: BBox) -> float:
+    (ax, ay), (bx, by) = a.center(), b.center()
+    diagonal_sq = (max(a.xmax, b.xmax) - min(a.xmin, b.xmin))**2 + (max(a.ymax, b.ymax) - min(a.ymin, b.ymin))**2
+    return a.iou(b) - ((ax - bx)**2 + (ay - by)**2) / diagonal_sq
+
+def ios(a: BBox, b: BBox) -> float:
+    intersection = a.intersect_with(b, check_valid=False)
+    return intersection.area() / min(a.area(), b.area()) if intersection.is_valid() else 0.0
+
+rng = np.random.default_rng(0)
+def random_boxes(n: int) -> BBoxArray:
+    pmin = rng.uniform(0, 100, size=(n, 2))
+    return BBoxArray(np.concatenate([pmin, pmin + rng.uniform(1, 30, size=(n, 2))], axis=1))
+
+boxes_a, boxes_b = random_boxes(60), random_boxes(45)
+list_a, list_b = boxes_a.to_bbox_list(), boxes_b.to_bbox_list()
+# Touching and identical boxes
+list_b[0] = BBox(xmin=list_a[0].xmax, ymin=list_a[0].ymin, xmax=list_a[0].xmax + 5, ymax=list_a[0].ymax)
+list_b[1] = list_a[1].copy()
+boxes_b = BBoxArray.from_bbox_list(list_b)
+
+ious = iou_matrix(list_a, list_b)
+assert ious.shape == (60, 45)
+assert ious.tolist() == [[a.iou(b) for b in list_b] for a in list_a]
+assert ious[0, 0] == 0.0 and ious[1, 1] == 1.0
+assert np.array_equal(iou_matrix(boxes_a, boxes_b.boxes, block_size=7), ious)
+assert np.array_equal(boxes_a.iou_matrix(boxes_b), ious)
+assert np.allclose(iou_matrix(boxes_a, boxes_b, metric='giou'), [[giou(a, b) for b in list_b] for a in list_a])
+assert np.allclose(iou_matrix(boxes_a, boxes_b, metric='diou'), [[diou(a, b) for b in list_b] for a in list_a])
+assert np.allclose(iou_matrix(boxes_a, boxes_b, metric='ios', block_size=100), [[ios(a, b) for b in list_b] for a in list_a])
+assert iou_matrix(boxes_a, BBoxArray()).shape == (60, 0)
+print('IoU Matrix Test Passed')
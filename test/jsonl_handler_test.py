@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import List
+import os
+import tempfile
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+scores = ScoreList()
+for i in range(25):
+    scores.append(Score(frame=f'{i}.jpg', test_name=f'テスト_{i % 2}', model_name=f'model_{i % 3}', score=None if i % 7 == 0 else i / 4))
+
+tmp_dir = tempfile.mkdtemp()
+save_path = f'{tmp_dir}/scores.jsonl'
+scores.save_to_path(save_path)
+with open(save_path, 'r') as f:
+    assert len(f.readlines()) == len(scores)
+assert ScoreList.load_from_path(save_path).to_dict_list() == scores.to_dict_list()
+assert [obj.to_dict() for obj in ScoreList.iter_from_path(save_path, chunk_size=4)] == scores.to_dict_list()
+scores.to_columnar().save_to_path(save_path, overwrite=True)
+assert ScoreList.load_from_path(save_path).to_dict_list() == scores.to_dict_list()
+print('JSON Lines Save/Load Test Passed')
+
+writer_path = f'{tmp_dir}/written.jsonl'
+with ScoreList.get_writer(writer_path) as writer:
+    for score in scores[:10]:
+        writer.write(score)
+with ScoreList.get_writer(writer_path, append=True) as writer:
+    writer.write_all(scores[10:])
+    assert writer.count == len(scores) - 10
+assert writer.closed
+assert ScoreList.load_from_path(writer_path).to_dict_list() == scores.to_dict_list()
+json_path = f'{tmp_dir}/scores.json'
+scores.save_to_path(json_path)
+assert [obj.to_dict() for obj in ScoreList.iter_from_path(json_path)] == scores.to_dict_list()
+print('JSON Lines Writer Test Passed')
+
+for path in [save_path, writer_path, json_path]:
+    os.remove(path)
+os.rmdir(tmp_dir)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import List
+import os
+import tempfile
+import numpy as np
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from common_utils.base.lazy import LazyHandler
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+scores = ScoreList()
+for i in range(53):
+    scores.append(Score(frame=f'{i % 10}.jpg', test_name=f'テスト_{i // 10}', model_name=f'model_{i % 3}', score=None if i % 7 == 0 else i / 4))
+expected = scores.to_dict_list()
+
+tmp_dir = tempfile.mkdtemp()
+save_path = f'{tmp_dir}/scores.jsonl'
+scores.save_to_path(save_path)
+for cache_index in [True, True, False]:
+    with LazyHandler(save_path, handler_cls=ScoreList, cache_index=cache_index, chunk_size=8) as lazy:
+        assert len(lazy) == len(scores)
+        assert lazy[0].to_dict() == expected[0] and lazy[-1].to_dict() == expected[-1]
+        assert lazy.get_dict(5) == expected[5]
+        assert lazy[10:20:3].to_dict_list() == expected[10:20:3]
+        assert lazy[[4, 2, 4]].to_dict_list() == [expected[4], expected[2], expected[4]]
+        mask = np.arange(len(lazy)) % 5 == 0
+        assert lazy[mask].to_dict_list() == [item for item, keep in zip(expected, mask) if keep]
+        assert [obj.to_dict() for obj in lazy] == expected
+        assert lazy.to_handler().to_dict_list() == expected
+        for kwargs in [{'model_name': 'model_1'}, {'frame': ['1.jpg', '3.jpg'], 'test_name': 'テスト_2'}, {'score': None}]:
+            assert lazy.get(**kwargs).to_dict_list() == scores.get(**kwargs).to_dict_list()
+            assert lazy.get_indices(**kwargs).tolist() == scores.get_indices(**kwargs).tolist()
+        assert lazy.column('score') == [item['score'] for item in expected]
+    assert os.path.isfile(f'{save_path}.idx.npy')
+print('Lazy Handler Access Test Passed')
+
+# Appending to the file invalidates the cached index. Blank lines are skipped.
+with open(save_path, 'a') as f:
+    f.write('\n  \n')
+with ScoreList.get_writer(save_path, append=True) as writer:
+    writer.write(scores[0])
+with LazyHandler(save_path, handler_cls=ScoreList) as lazy:
+    assert len(lazy) == len(scores) + 1
+    assert lazy[-1].to_dict() == expected[0]
+empty_path = f'{tmp_dir}/empty.jsonl'
+ScoreList().save_to_path(empty_path)
+with LazyHandler(empty_path, handler_cls=ScoreList) as lazy:
+    assert len(lazy) == 0 and len(lazy.to_handler()) == 0
+print('Lazy Handler Index Test Passed')
+
+for path in [save_path, f'{save_path}.idx.npy', empty_path, f'{empty_path}.idx.npy']:
+    os.remove(path)
+os.rmdir(tmp_dir)
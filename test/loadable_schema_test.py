@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import List, Optional
+from common_utils.base.basic import ConstructorSchema, BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from common_utils.common_types.angle import EulerAngle, EulerAngleList
+
+class Pose(BasicLoadableObject['Pose']):
+    def __init__(self, name: str, angle: EulerAngle, history: EulerAngleList=None):
+        super().__init__()
+        self.name = name
+        self.angle = angle
+        self.history = history if history is not None else EulerAngleList()
+
+class ScoredPose(Pose):
+    def __init__(self, name: str, angle: EulerAngle, score: float, history: EulerAngleList=None):
+        super().__init__(name=name, angle=angle, history=history)
+        self.score = score
+
+schema = Pose.get_schema()
+assert schema.params == ['name', 'angle', 'history']
+assert schema.dict_fields == {'angle': EulerAngle}
+assert schema.dict_list_fields == {'history': EulerAngleList}
+assert Pose.get_schema() is schema
+assert ConstructorSchema._unwrap_optional(Optional[EulerAngle]) is EulerAngle
+assert ConstructorSchema._unwrap_optional(Optional[List[int]]) == List[int]
+
+sub_schema = ScoredPose.get_schema()
+assert sub_schema is not schema
+assert sub_schema.params == ['name', 'angle', 'score', 'history']
+assert Pose.get_schema() is schema
+print('Schema Test Passed')
+
+pose = ScoredPose(
+    name='a', angle=EulerAngle(1, 2, 3), score=0.5,
+    history=EulerAngleList([EulerAngle(0, 0, 0), EulerAngle(1, 1, 1)])
+)
+pose_dict = pose.to_dict()
+assert pose_dict == {
+    'name': 'a', 'angle': {'roll': 1, 'pitch': 2, 'yaw': 3},
+    'history': [{'roll': 0, 'pitch': 0, 'yaw': 0}, {'roll': 1, 'pitch': 1, 'yaw': 1}],
+    'score': 0.5
+}
+assert list(pose_dict.keys()) == list(pose.__dict__.keys())
+pose_copy = pose.copy()
+assert pose_copy == pose
+assert pose_copy.angle is not pose.angle
+assert EulerAngle.from_dict(EulerAngle(4, 5, 6).to_dict()) == EulerAngle(4, 5, 6)
+print('Serialization Test Passed')
+
+original_init = Pose.__init__
+def new_init(self, name: str, angle: EulerAngle):
+    original_init(self, name=name, angle=angle)
+Pose.__init__ = new_init
+assert Pose.get_constructor_params() == ['name', 'angle']
+Pose.__init__ = original_init
+assert Pose.get_constructor_params() == ['name', 'angle', 'history']
+print('Schema Invalidation Test Passed')
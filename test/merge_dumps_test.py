@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import List
+import os
+import random
+import tempfile
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from common_utils.base.merge import merge_prediction_dumps
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float=0.0):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+def expected_merge(handlers: List[ScoreList], keep: str) -> List[dict]:
+    records = {}
+    for handler in handlers:
+        for item_dict in handler.to_dict_list():
+            key = tuple([(item_dict[attr] is not None, item_dict[attr]) for attr in ['test_name', 'frame', 'model_name']])
+            if keep == 'last' or key not in records:
+                records[key] = item_dict
+    return [records[key] for key in sorted(records.keys())]
+
+random.seed(0)
+handlers = [
+    ScoreList([
+        Score(
+            frame=f'{random.randrange(30)}.png', test_name=random.choice(['test0', 'test1', None]),
+            model_name=f'model{random.randrange(2)}', score=worker * 1000 + i
+        )
+        for i in range(80)
+    ])
+    for worker in range(4)
+]
+with tempfile.TemporaryDirectory() as tmp_dir:
+    paths = [os.path.join(tmp_dir, f'worker{i}.{"json" if i == 3 else "jsonl"}') for i in range(len(handlers))]
+    for handler, path in zip(handlers, paths):
+        handler.save_to_path(path)
+    output_path = os.path.join(tmp_dir, 'merged.jsonl')
+    for keep in ['first', 'last']:
+        num_written = merge_prediction_dumps(paths, output_path, keep=keep, chunk_size=7, max_open_files=3, overwrite=True)
+        merged = ScoreList.load_from_path(output_path)
+        assert merged.to_dict_list() == expected_merge(handlers, keep=keep) and num_written == len(merged)
+
+    # Sorted inputs are merged directly.
+    sorted_paths = []
+    for i, handler in enumerate(handlers[:2]):
+        sorted_handler = ScoreList([datum for datum in handler if datum.test_name is not None])
+        sorted_handler.sort(['test_name', 'frame', 'model_name'])
+        sorted_paths.append(os.path.join(tmp_dir, f'sorted{i}.jsonl'))
+        sorted_handler.save_to_path(sorted_paths[-1])
+    merge_prediction_dumps(sorted_paths, output_path, presorted=True, overwrite=True)
+    expected = expected_merge([ScoreList.load_from_path(path) for path in sorted_paths], keep='first')
+    assert ScoreList.load_from_path(output_path).to_dict_list() == expected
+    try:
+        merge_prediction_dumps(paths[:1], output_path, presorted=True, overwrite=True)
+        assert False
+    except ValueError:
+        pass
+    try:
+        merge_prediction_dumps(paths, output_path, chunk_size=7, max_open_files=1, overwrite=True)
+        assert False
+    except ValueError:
+        pass
+print('Merge Dumps Test Passed')
@@ -0,0 +1,114 @@
+import numpy as np
+from common_utils.common_types.bbox import BBox, BBoxArray, iou_matrix
+from common_utils.common_types.nms import overlapping_pairs, nms, soft_nms, weighted_box_fusion
+
+def reference_nms(boxes: BBoxArray, scores: np.ndarray, iou_threshold: float, class_ids: np.ndarray=None) -> list:
+    ious = iou_matrix(boxes, boxes)
+    is_suppressed = np.zeros(len(boxes), dtype=bool)
+    keep = []
+    for i in np.argsort(-scores, kind='stable'):
+        if is_suppressed[i]:
+            continue
+        keep.append(i)
+        is_suppressed |= (ious[i] > iou_threshold) & (class_ids == class_ids[i] if class_ids is not None else True)
+    return keep
+
+def reference_soft_nms(boxes: BBoxArray, scores: np.ndarray, method: str, iou_threshold: float=0.3, sigma: float=0.5, score_threshold: float=0.001):
+    ious = iou_matrix(boxes, boxes)
+    scores = scores.copy()
+    remaining = list(range(len(boxes)))
+    selected, selected_scores = [], []
+    while len(remaining) > 0:
+        i = min(remaining, key=lambda j: (-scores[j], j))
+        if scores[i] < score_threshold:
+            break
+        remaining.remove(i)
+        selected.append(i)
+        selected_scores.append(scores[i])
+        for j in remaining:
+            if method == 'linear' and ious[i, j] > iou_threshold:
+                scores[j] *= 1 - ious[i, j]
+            elif method == 'gaussian' and ious[i, j] > 0:
+                scores[j] *= np.exp(-ious[i, j]**2 / sigma)
+    return selected, selected_scores
+
+def reference_fused_boxes(boxes: BBoxArray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    # Fused boxes of a single class, comparing every box with every cluster.
+    fused, weighted_sums, score_sums = [], [], []
+    for i in np.argsort(-scores, kind='stable').tolist():
+        box = boxes.boxes[i]
+        ious = iou_matrix(boxes.boxes[i:i + 1], np.array(fused).reshape(-1, 4))[0]
+        if len(fused) > 0 and ious.max() > iou_threshold:
+            cluster = int(ious.argmax())
+            weighted_sums[cluster] = weighted_sums[cluster] + scores[i] * box
+            score_sums[cluster] += scores[i]
+            fused[cluster] = weighted_sums[cluster] / score_sums[cluster]
+        else:
+            fused.append(box)
+            weighted_sums.append(scores[i] * box)
+            score_sums.append(scores[i])
+    # In order of creation, which is the order of weighted_box_fusion with conf_type='max'.
+    return np.array(fused).reshape(-1, 4)
+
+rng = np.random.default_rng(0)
+for trial in range(20):
+    num_boxes = int(rng.integers(1, 200))
+    pmin = rng.uniform(0, 300, size=(num_boxes, 2))
+    # Sizes from 1 to 150 pixels, so that the boxes end up in several levels of the grid
+    sizes = np.exp(rng.uniform(0, np.log(150), size=(num_boxes, 2)))
+    boxes = BBoxArray(np.concatenate([pmin, pmin + sizes], axis=1))
+    if trial == 0:
+        # Degenerate boxes never overlap anything.
+        boxes.boxes[:3, 2] = boxes.boxes[:3, 0]
+    scores = rng.random(num_boxes).round(2)
+    class_ids = rng.integers(0, 3, size=num_boxes)
+
+    first, second, ious = overlapping_pairs(boxes)
+    expected = iou_matrix(boxes, boxes)
+    assert sorted(zip(np.minimum(first, second).tolist(), np.maximum(first, second).tolist())) == \
+        list(zip(*np.nonzero(np.triu(expected > 0, 1))))
+    assert np.array_equal(ious, expected[first, second])
+
+    for iou_threshold in [0.1, 0.5, 0.8]:
+        assert nms(boxes, scores, iou_threshold=iou_threshold).tolist() == reference_nms(boxes, scores, iou_threshold)
+        assert nms(boxes.to_bbox_list(), scores, iou_threshold=iou_threshold, class_ids=class_ids).tolist() == \
+            reference_nms(boxes, scores, iou_threshold, class_ids=class_ids)
+    for method in ['linear', 'gaussian']:
+        selected, selected_scores = soft_nms(boxes, scores, method=method)
+        expected_selected, expected_scores = reference_soft_nms(boxes, scores, method=method)
+        assert selected.tolist() == expected_selected and np.allclose(selected_scores, expected_scores)
+
+# Long chain of overlapping boxes
+xmins = np.arange(2000, dtype=np.float64)
+chain = BBoxArray(np.stack([xmins, np.zeros(2000), xmins + 10, np.full(2000, 10.0)], axis=1))
+assert nms(chain, 1 - xmins / 2000, iou_threshold=0.5).tolist() == reference_nms(chain, 1 - xmins / 2000, 0.5)
+
+# Non-finite boxes have no positive IoU with anything.
+inf, nan = float('inf'), float('nan')
+boxes = BBoxArray([[0, 0, inf, 1], [0, 0, 1, 1], [-inf, 0, inf, 1], [0, nan, 1, 1], [0.5, 0, 1.5, 1]])
+scores = np.array([0.9, 0.8, 0.7, 0.6, 0.5])
+first, second, ious = overlapping_pairs(boxes)
+assert first.tolist() == [1] and second.tolist() == [4]
+assert nms(boxes, scores, iou_threshold=0.3).tolist() == [0, 1, 2, 3]
+assert soft_nms(boxes, scores)[0].tolist() == [0, 1, 2, 3, 4]
+
+# Weighted box fusion
+boxes = [BBox(0.0, 0.0, 10.0, 10.0), BBox(1.0, 1.0, 11.0, 11.0), BBox(50.0, 50.0, 60.0, 60.0), BBox(0.0, 0.0, 10.0, 10.0)]
+fused, fused_scores, fused_classes = weighted_box_fusion(boxes, [0.9, 0.3, 0.8, 0.7], class_ids=[0, 0, 0, 1], num_models=2)
+assert np.allclose(fused.boxes, [[0.25, 0.25, 10.25, 10.25], [50, 50, 60, 60], [0, 0, 10, 10]])
+assert np.allclose(fused_scores, [0.6, 0.4, 0.35]) and fused_classes.tolist() == [0, 0, 1]
+fused, fused_scores, _ = weighted_box_fusion(boxes[:2], [0.9, 0.3], conf_type='max')
+assert len(fused) == 1 and fused_scores.tolist() == [0.9]
+for trial in range(10):
+    num_boxes = 300
+    pmin = rng.uniform(0, 200, size=(num_boxes, 2))
+    sizes = np.exp(rng.uniform(0, np.log(150), size=(num_boxes, 1))) * rng.uniform(0.7, 1.3, size=(num_boxes, 2))
+    boxes = BBoxArray(np.concatenate([pmin, pmin + sizes], axis=1))
+    if trial == 0:
+        # Tiny boxes and a single box that covers all of them.
+        boxes = BBoxArray(np.concatenate([np.concatenate([pmin, pmin + 0.01], axis=1), [[0, 0, 300, 300]]]))
+    scores = rng.random(len(boxes)).round(2)
+    for iou_threshold in [0.1, 0.55, 0.9]:
+        fused, fused_scores, _ = weighted_box_fusion(boxes, scores, iou_threshold=iou_threshold, conf_type='max')
+        assert np.array_equal(fused.boxes, reference_fused_boxes(boxes, scores, iou_threshold))
+print('NMS Test Passed')
@@ -0,0 +1,61 @@
+from __future__ import annotations
+from typing import List
+import os
+import tempfile
+from common_utils.base.prediction import PredictionData, PredictionDatum, PredictionWriter
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float=0.0):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+def make(start: int, stop: int) -> List[Score]:
+    return [Score(frame=f'{i}.png', test_name='test0', model_name='model0', score=i / 10) for i in range(start, stop)]
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    for background in [True, False]:
+        path = os.path.join(tmp_dir, f'predictions_{background}.jsonl')
+        with PredictionWriter(path, batch_size=7, background=background) as writer:
+            writer.write_all(make(0, 50))
+            writer.flush()
+            assert ScoreList.load_from_path(path).to_dict_list() == ScoreList(make(0, 50)).to_dict_list()
+            writer.write_all(make(50, 60))
+        assert writer.closed and writer.count == 60
+        assert ScoreList.load_from_path(path).to_dict_list() == ScoreList(make(0, 60)).to_dict_list()
+        try:
+            PredictionWriter(path)
+            assert False
+        except Exception:
+            pass
+
+        # A crash in the middle of a record leaves an incomplete last line.
+        with open(path, 'a') as f:
+            f.write('{"frame": "60.png", "test_na')
+        with PredictionWriter(path, resume=True, background=background) as writer:
+            assert writer.num_resumed == 60 and writer.is_processed(test_name='test0', frame='59.png', model_name='model0')
+            assert not writer.is_processed(test_name='test0', frame='60.png', model_name='model0')
+            assert writer.processed_frames(test_name='test0', model_name='model0') == sorted([f'{i}.png' for i in range(60)])
+            for datum in make(55, 70):
+                if not writer.is_processed(test_name=datum.test_name, frame=datum.frame, model_name=datum.model_name):
+                    writer.write(datum)
+            assert writer.count == 10
+        loaded = ScoreList.load_from_path(path)
+        assert loaded.to_dict_list() == ScoreList(make(0, 70)).to_dict_list()
+        assert len(list(ScoreList.iter_from_path(path, chunk_size=16))) == 70
+print('Prediction Writer Test Passed')
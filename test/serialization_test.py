@@ -0,0 +1,68 @@
+import os
+import tempfile
+import datetime
+import uuid
+from enum import Enum, IntEnum
+from dataclasses import dataclass
+from common_utils.base.serialization import JsonBackends, YamlBackends, \
+    json_dumps, json_loads, yaml_dumps, yaml_loads, set_json_backend, get_json_backend
+from common_utils.common_types.angle import EulerAngle, EulerAngleList
+import yaml
+
+data = [
+    {'frame': f'{i}.jpg', 'test_name': 'テスト\t"1"', 'model_name': None, 'score': score, 'bbox': [i, i + 0.5, 1e-07, 1e+16]}
+    for i, score in enumerate([0.1, -0.0, 2**70, float('nan'), float('inf'), 1e-05, 3])
+]
+expected_json = json_dumps(data, backend=JsonBackends.STDLIB)
+expected_yaml = yaml_dumps(data, backend=YamlBackends.PYYAML)
+for backend in JsonBackends.get_available():
+    assert json_dumps(data, backend=backend) == expected_json
+    assert json_dumps(data[:3], backend=backend) == json_dumps(data[:3], backend=JsonBackends.STDLIB)
+    assert repr(json_loads(expected_json, backend=backend)) == repr(json_loads(expected_json, backend=JsonBackends.STDLIB))
+# Values that json.dumps rejects are rejected by every backend, and subclasses of supported types are written the same way.
+class Color(Enum):
+    RED = 'red'
+class Level(IntEnum):
+    LOW = 1
+class Name(str):
+    pass
+@dataclass
+class Item:
+    name: str
+for value in [datetime.datetime(2020, 1, 1), datetime.date(2020, 1, 1), uuid.uuid4(), Item('a'), Color.RED]:
+    for backend in JsonBackends.get_available():
+        for obj in [value, [0, {'key': value}]]:
+            try:
+                json_dumps(obj, backend=backend)
+                assert False, f'{backend}: {obj}'
+            except TypeError:
+                pass
+for obj in [{'level': Level.LOW, 'name': Name('a')}, {Name('a'): [Level.LOW]}]:
+    for backend in JsonBackends.get_available():
+        assert json_dumps(obj, backend=backend) == json_dumps(obj, backend=JsonBackends.STDLIB)
+# libyaml's emitter writes these differently from the pure Python one.
+yaml_edge_cases = [{'': ''}, {'text': 'line\tone "quoted"\n' * 20}]
+for backend in YamlBackends.get_available():
+    assert yaml_dumps(data, backend=backend) == expected_yaml
+    for obj in yaml_edge_cases:
+        assert yaml_dumps(obj, backend=backend) == yaml.dump(obj, allow_unicode=True)
+        assert yaml_loads(yaml_dumps(obj, backend=backend), backend=backend) == obj
+    assert repr(yaml_loads(expected_yaml, backend=backend)) == repr(yaml_loads(expected_yaml, backend=YamlBackends.PYYAML))
+print('Serialization Backend Test Passed')
+
+angles = EulerAngleList([EulerAngle(roll=i * 0.25, pitch=-i, yaw=i / 3) for i in range(10)])
+tmp_dir = tempfile.mkdtemp()
+for extension, backends in [('json', JsonBackends.get_available()), ('yaml', YamlBackends.get_available())]:
+    contents = []
+    for backend in backends:
+        save_path = f'{tmp_dir}/angles_{backend}.{extension}'
+        angles.save_to_path(save_path, backend=backend)
+        assert EulerAngleList.load_from_path(save_path, backend=backend).to_dict_list() == angles.to_dict_list()
+        contents.append(open(save_path, 'r').read())
+        os.remove(save_path)
+    assert all([content == contents[0] for content in contents])
+set_json_backend(JsonBackends.STDLIB)
+assert get_json_backend() == JsonBackends.STDLIB
+set_json_backend(JsonBackends.AUTO)
+os.rmdir(tmp_dir)
+print('Handler Backend Test Passed')
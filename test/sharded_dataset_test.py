@@ -0,0 +1,58 @@
+from __future__ import annotations
+from typing import List
+import os
+import json
+import tempfile
+from common_utils.base.prediction import PredictionData, PredictionDatum
+from common_utils.base.basic import BasicLoadableObject, BasicLoadableHandler, BasicHandler
+from common_utils.base.shards import ShardedDataset
+
+class Score(
+    PredictionDatum['Score'],
+    BasicLoadableObject['Score']
+):
+    def __init__(self, frame: str, test_name: str, model_name: str, score: float=0.0):
+        super().__init__(frame=frame, test_name=test_name, model_name=model_name)
+        self.score = score
+
+class ScoreList(
+    PredictionData['ScoreList', 'Score'],
+    BasicLoadableHandler['ScoreList', 'Score'],
+    BasicHandler['ScoreList', 'Score']
+):
+    def __init__(self, obj_list: List[Score]=None):
+        super().__init__(obj_type=Score, obj_list=obj_list)
+
+    @classmethod
+    def from_dict_list(cls, dict_list: List[dict]) -> ScoreList:
+        return ScoreList([Score.from_dict(item_dict) for item_dict in dict_list])
+
+scores = ScoreList([
+    Score(frame=f'{i % 25:03d}.png', test_name=f'test{i // 25}', model_name=f'model{i % 2}', score=i / 10)
+    for i in range(100)
+])
+with tempfile.TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'scores')
+    for extension in ['jsonl', 'npz']:
+        dataset = ShardedDataset.save(scores, path, shard_size=30, extension=extension, overwrite=True)
+        assert len(dataset) == 100 and dataset.num_shards == 4 and sorted(os.listdir(path))[-1] == 'shard-00003.' + extension
+        manifest = json.load(open(os.path.join(path, 'manifest.json')))
+        assert [shard['count'] for shard in manifest['shards']] == [30, 30, 30, 10]
+        assert manifest['shards'][1]['ranges'] == {'frame': ['000.png', '024.png'], 'test_name': ['test1', 'test2']}
+
+        dataset = ShardedDataset(path, handler_cls=ScoreList, num_workers=2)
+        assert dataset.load().to_dict_list() == scores.to_dict_list()
+        assert dataset.load(num_workers=1).to_dict_list() == scores.to_dict_list()
+        assert dataset.prune(test_name='test0') == [0] and dataset.prune(test_name=['test0', 'test3']) == [0, 2, 3]
+        assert dataset.prune(test_name='test9') == [] and dataset.prune(test_name=None, model_name='model1') == [0, 1, 2, 3]
+        for kwargs in [{'test_name': 'test2', 'model_name': 'model1'}, {'test_name': ['test0', 'test3']}, {'frame': '007.png'}]:
+            assert dataset.get(**kwargs).to_dict_list() == scores.get(**kwargs).to_dict_list()
+        assert len(dataset.get(test_name='test9')) == 0
+        assert [len(shard) for shard in dataset.iter_shards()] == [30, 30, 30, 10]
+    try:
+        ShardedDataset.save(scores, path)
+        assert False
+    except Exception:
+        pass
+    assert len(ShardedDataset.save(ScoreList(), os.path.join(tmp_dir, 'empty')).load()) == 0
+print('Sharded Dataset Test Passed')